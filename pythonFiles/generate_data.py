@@ -1,9 +1,16 @@
 import bpy
 import json
+import sys
 from pathlib import Path
 
+include_dir = Path(__file__).parent / "include"
+sys.path.append(str(include_dir))
+
+from blender_vscode import rna_export
+
 output_dir = Path(__file__).parent.parent / "generated"
 enums_output_path = output_dir / "enums.json"
+rna_output_dir = output_dir / "rna"
 
 
 def insert_enum_data(data, identifier):
@@ -15,11 +22,7 @@ def insert_enum_data(data, identifier):
 def enum_prop_to_dict(type_name, prop_name):
     type = getattr(bpy.types, type_name)
     prop = type.bl_rna.properties[prop_name]
-    return enum_items_to_dict(prop.enum_items)
-
-
-def enum_items_to_dict(items):
-    return [{"identifier": item.identifier, "name": item.name, "description": item.description} for item in items]
+    return rna_export.enum_items_to_list(prop.enum_items)
 
 
 data = {}
@@ -27,3 +30,10 @@ insert_enum_data(data, "Area.type")
 
 with open(enums_output_path, "w") as f:
     f.write(json.dumps(data, indent=2))
+
+# usage: blender -b --python generate_data.py -- [--force]
+script_args = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+if "--force" in script_args:
+    rna_export.export(rna_output_dir)
+else:
+    rna_export.export_if_outdated(rna_output_dir)
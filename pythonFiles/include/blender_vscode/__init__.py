@@ -2,7 +2,7 @@ import sys
 from pprint import pformat
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 import bpy
 
@@ -17,29 +17,99 @@ class AddonInfo:
     module_name: str
 
 
-def startup(editor_address, addons_to_load: List[AddonInfo]):
+def parse_addons_to_load(infos: List[Dict]) -> List[AddonInfo]:
+    addons_to_load = []
+    for info in infos:
+        addon_info = AddonInfo(**info)
+        addon_info.load_dir = Path(addon_info.load_dir)
+        addons_to_load.append(addon_info)
+    return addons_to_load
+
+
+def startup(editor_address, addons_to_load: List[AddonInfo], standby: bool = False):
+    """Prepare Blender for development. In standby mode addons are assigned later with `assign_addons`."""
     if bpy.app.version < (2, 80, 34):
         handle_fatal_error("Please use a newer version of Blender")
 
     from . import installation
 
+    from .environment import NO_DEBUG
+
     # blender 2.80 'ssl' module is compiled with 'OpenSSL 1.1.0h' what breaks with requests >2.29.0
-    installation.ensure_packages_are_installed(["debugpy", "requests<=2.29.0", "werkzeug<=3.0.3", "flask<=3.0.3"])
+    packages = ["requests<=2.29.0", "werkzeug<=3.0.3", "flask<=3.0.3"]
+    if not NO_DEBUG:
+        packages.insert(0, "debugpy")
+    installation.ensure_packages_are_installed(packages)
 
     from . import load_addons
 
-    path_mappings = load_addons.setup_addon_links(addons_to_load)
+    path_mappings = [] if standby else load_addons.setup_addon_links(addons_to_load)
 
     from . import communication
 
-    communication.setup(editor_address, path_mappings)
+    communication.setup(editor_address, path_mappings, standby=standby)
+
+    from . import leak_guard, operators, ui
 
-    from . import operators, ui
+    # before any addon is enabled, so that its timers, draw handlers and msgbus subscriptions are tracked
+    if leak_guard.is_enabled():
+        leak_guard.install()
 
     ui.register()
     operators.register()
 
+    if not standby:
+        load_addons.load(addons_to_load)
+
+    # timers do not tick in background mode, the main thread would always look stalled
+    if not bpy.app.background:
+        bpy.app.timers.register(start_stall_watchdog)
+
+    # opt-in, the export is only written once per Blender version and build
+    from .environment import RNA_EXPORT_DIR
+
+    if RNA_EXPORT_DIR is not None:
+        bpy.app.timers.register(export_rna_if_outdated, first_interval=1.0)
+
+
+def assign_addons(addons_to_load: List[AddonInfo]) -> List[Dict]:
+    """Link and enable addons in an instance that was started in standby mode."""
+    from . import load_addons
+
+    path_mappings = load_addons.setup_addon_links(addons_to_load)
     load_addons.load(addons_to_load)
+    return path_mappings
+
+
+def serve_in_background():
+    """Timers do not run in background mode, execute the main thread queue here until Blender is stopped."""
+    if not bpy.app.background:
+        return
+    from .utils import always, background_stop
+
+    LOG.info("Running in background mode, serving requests until stopped.")
+    while not background_stop.is_set():
+        background_stop.wait(always())
+
+
+def export_rna_if_outdated():
+    from . import rna_export
+    from .environment import RNA_EXPORT_DIR
+
+    try:
+        rna_export.export_if_outdated(Path(RNA_EXPORT_DIR).expanduser())
+    except Exception:
+        LOG.exception("Failed to export RNA data for the editor.")
+    return None
+
+
+def start_stall_watchdog():
+    from . import watchdog
+    from .environment import STALL_THRESHOLD
+
+    # started from a timer, Blender's own startup is not reported as stall
+    watchdog.start(STALL_THRESHOLD)
+    return None
 
 
 def handle_fatal_error(message):
@@ -0,0 +1,147 @@
+"""Timing of `draw`, `execute`, `invoke`, `modal` and `poll` of the classes registered by `auto_load`.
+
+The classes are found in `<addon>.auto_load.ordered_classes`. Methods defined on a class are replaced by
+timing wrappers with `setattr`, Blender looks them up by name on every call. The original attributes are
+kept and set again when timing is disabled or before the addon is disabled.
+Only count, total and maximum are recorded per method, so a wrapped `draw` stays cheap.
+"""
+
+import functools
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from . import log
+
+LOG = log.getLogger()
+
+DEFAULT_TOP = 10
+PANEL_TOP = 5
+METHOD_NAMES = ("draw", "execute", "invoke", "modal", "poll")
+
+_enabled = False
+_module_names: List[str] = []
+# (class, method name) -> original attribute from the class dict
+_originals: Dict[Tuple[type, str], object] = {}
+# (qualified class name, method name) -> [count, total, max], kept when classes are reloaded
+_stats: Dict[Tuple[str, str], List] = {}
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(module_names: List[str]):
+    """Wrap the methods of the classes registered by the given addons, also after they are reloaded."""
+    global _enabled
+    _enabled = True
+    _module_names[:] = module_names
+    for module_name in module_names:
+        wrap_addon(module_name)
+    LOG.info(f"Timing registered classes of {', '.join(module_names)}")
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    for cls in {cls for cls, _ in _originals}:
+        unwrap_class(cls)
+    _module_names.clear()
+
+
+def reset():
+    _stats.clear()
+
+
+def get_registered_classes(module_name: str) -> List[type]:
+    auto_load = sys.modules.get(module_name + ".auto_load")
+    classes = getattr(auto_load, "ordered_classes", None)
+    return list(classes) if classes else []
+
+
+def wrap_addon(module_name: str):
+    if not _enabled or module_name not in _module_names:
+        return
+    classes = get_registered_classes(module_name)
+    if not classes:
+        LOG.debug(f"{module_name} has no auto_load.ordered_classes, nothing to time")
+    for cls in classes:
+        wrap_class(cls)
+
+
+def unwrap_addon(module_name: str):
+    for cls in get_registered_classes(module_name):
+        unwrap_class(cls)
+    # classes that are no longer in ordered_classes (e.g. the auto_load module was purged)
+    for cls in {cls for cls, _ in _originals}:
+        if cls.__module__ == module_name or cls.__module__.startswith(module_name + "."):
+            unwrap_class(cls)
+
+
+def wrap_class(cls: type):
+    class_name = f"{cls.__module__}.{cls.__qualname__}"
+    for name in METHOD_NAMES:
+        # inherited methods are timed on the class that defines them
+        original = cls.__dict__.get(name)
+        if original is None or (cls, name) in _originals:
+            continue
+        stats = _stats.get((class_name, name))
+        if stats is None:
+            stats = _stats[(class_name, name)] = [0, 0.0, 0.0]
+        if isinstance(original, classmethod):
+            wrapped = classmethod(wrap_function(original.__func__, stats))
+        elif callable(original):
+            wrapped = wrap_function(original, stats)
+        else:
+            continue
+        _originals[(cls, name)] = original
+        setattr(cls, name, wrapped)
+
+
+def unwrap_class(cls: type):
+    for name in METHOD_NAMES:
+        original = _originals.pop((cls, name), None)
+        if original is not None:
+            setattr(cls, name, original)
+
+
+def wrap_function(function, stats: List):
+    @functools.wraps(function)
+    def timed_method(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            stats[0] += 1
+            stats[1] += duration
+            if duration > stats[2]:
+                stats[2] = duration
+
+    return timed_method
+
+
+def get_entries() -> List[Dict]:
+    """Timed methods sorted by the total time spent in them."""
+    entries = [
+        {
+            "class": class_name,
+            "method": name,
+            "count": count,
+            "total": total,
+            "mean": total / count if count else 0.0,
+            "max": max_duration,
+        }
+        for (class_name, name), (count, total, max_duration) in list(_stats.items())
+    ]
+    entries.sort(key=lambda item: -item["total"])
+    return entries
+
+
+def get_report(top: Optional[int] = DEFAULT_TOP) -> Dict:
+    entries = get_entries()
+    return {
+        "enabled": _enabled,
+        "addons": list(_module_names),
+        "methods": entries if top is None else entries[:top],
+    }
@@ -1,39 +1,65 @@
+import atexit
 import logging
 import random
 import threading
 import time
-from functools import partial
-from typing import Callable, Dict
+from typing import Callable, Dict, Hashable, Optional
 
-import debugpy
 import flask
 import requests
-from werkzeug.serving import make_server
 
-from . import log
-from .environment import (LOG_FLASK, VSCODE_IDENTIFIER, blender_path,
-                          python_path, scripts_folder)
-from .utils import run_in_main_thread
+from . import control_server, jobs, log, metrics, transport
+from .environment import (
+    EDITOR_SOCKET,
+    HANDLER_TIMEOUT,
+    LOG_FLASK,
+    MAX_REQUEST_SIZE,
+    NO_DEBUG,
+    UNIX_SOCKETS,
+    VSCODE_IDENTIFIER,
+    blender_path,
+    python_path,
+    scripts_folder,
+)
+from .utils import PRIORITY_DEFAULT, execution_queue
 
 LOG = log.getLogger()
 
 EDITOR_ADDRESS = None
+EDITOR_SOCKET_PATH = None
 OWN_SERVER_PORT = None
+OWN_SOCKET_PATH = None
 DEBUGPY_PORT = None
 
 SERVER = flask.Flask("Blender Server")
 SERVER.logger.setLevel(logging.DEBUG if LOG_FLASK else logging.ERROR)
+SERVER.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_SIZE
 POST_HANDLERS = {}
+QUERY_TIMEOUT_SECONDS = 10
 
 
-def setup(address: str, path_mappings):
-    global EDITOR_ADDRESS, OWN_SERVER_PORT, DEBUGPY_PORT
+def setup(address: str, path_mappings, standby: bool = False):
+    global EDITOR_ADDRESS, EDITOR_SOCKET_PATH, OWN_SERVER_PORT, OWN_SOCKET_PATH, DEBUGPY_PORT
     EDITOR_ADDRESS = address
+    EDITOR_SOCKET_PATH = EDITOR_SOCKET if transport.SUPPORTED else None
 
     OWN_SERVER_PORT = start_own_server()
-    DEBUGPY_PORT = start_debug_server()
+    OWN_SOCKET_PATH = start_own_socket_server() if UNIX_SOCKETS and transport.SUPPORTED else None
+    # debugpy is imported only when it is used, it installs tracing hooks
+    DEBUGPY_PORT = None if NO_DEBUG else start_debug_server()
 
-    send_connection_information(path_mappings)
+    send_connection_information(path_mappings, standby)
+
+    if NO_DEBUG:
+        LOG.info("Started without debugger.")
+        return
+
+    if standby:
+        # the editor attaches the debugger once addons are assigned
+        LOG.info("Started in standby mode, waiting for addons.")
+        return
+
+    import debugpy
 
     LOG.info("Waiting for debug client.")
     debugpy.wait_for_client()
@@ -49,7 +75,7 @@ def start_own_server():
         for _attempt in range(10):
             port = get_random_port()
             try:
-                httpd = make_server("127.0.0.1", port, SERVER)
+                httpd = control_server.ControlServer("127.0.0.1", port, SERVER)
 
                 # Startup was successful — signal and continue
                 result["port"] = port
@@ -87,7 +113,37 @@ def start_own_server():
     raise TimeoutError(f"Falsk server did not start within {timeout} seconds.")
 
 
+def listen_for_debugger() -> int:
+    """Start debugpy at runtime, e.g. in an instance that was started without debugger. Returns its port."""
+    global DEBUGPY_PORT
+    # debugpy can listen only once per process, it keeps listening after the editor detached
+    if DEBUGPY_PORT is None:
+        from . import installation
+
+        # not installed on startup when Blender was started without debugger
+        installation.ensure_packages_are_installed(["debugpy"])
+        DEBUGPY_PORT = start_debug_server()
+    return DEBUGPY_PORT
+
+
+def start_own_socket_server() -> Optional[str]:
+    """Serve the control server on a Unix domain socket as well. Returns None if that fails, TCP still works."""
+    path = transport.create_socket_path()
+    try:
+        httpd = control_server.ControlServer("unix://" + path, 0, SERVER)
+    except Exception as e:
+        LOG.warning(f"Could not serve on Unix socket {path}, using TCP only: {e}")
+        transport.remove_socket(path)
+        return None
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    atexit.register(transport.remove_socket, path)
+    LOG.debug(f"Flask server listens on {path}")
+    return path
+
+
 def start_debug_server():
+    import debugpy
+
     # retry on port conflicts, todo catch only specific exceptions
     # note debugpy changed exception types between versions, todo investigate
     last_exception = None
@@ -112,15 +168,29 @@ def start_debug_server():
 
 @SERVER.route("/", methods=["POST"])
 def handle_post():
+    start = time.perf_counter()
     data = flask.request.get_json()
     LOG.debug(f"Got POST: {data}")
 
-    if data["type"] in POST_HANDLERS:
-        return POST_HANDLERS[data["type"]](data)
-    else:
-        LOG.warning(f"Unhandled POST: {data}")
-
-    return "OK"
+    type = data["type"] if data["type"] in POST_HANDLERS else "unknown"
+    metrics.REQUESTS.inc(type)
+    try:
+        if type == "unknown":
+            LOG.warning(f"Unhandled POST: {data}")
+            return "OK"
+        handler, timeout = POST_HANDLERS[type]
+        try:
+            return control_server.run_handler(flask.copy_current_request_context(lambda: handler(data)), timeout)
+        except TimeoutError as e:
+            metrics.HANDLER_TIMEOUTS.inc(type)
+            LOG.warning(f"{type}: {e}")
+            return flask.jsonify({"error": str(e)}), 504
+        except control_server.HandlersBusy as e:
+            metrics.REJECTED_REQUESTS.inc()
+            LOG.warning(f"{type}: {e}")
+            return flask.jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    finally:
+        metrics.REQUEST_DURATION.observe(time.perf_counter() - start, type)
 
 
 @SERVER.route("/ping", methods=["GET"])
@@ -129,28 +199,125 @@ def handle_get_ping():
     return "OK"
 
 
-def register_post_handler(type: str, handler: Callable):
+@SERVER.route("/metrics", methods=["GET"])
+def handle_get_metrics():
+    return flask.Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@SERVER.route("/metrics.json", methods=["GET"])
+def handle_get_metrics_json():
+    return flask.jsonify(metrics.to_dict())
+
+
+@SERVER.route("/queue", methods=["GET"])
+def handle_get_queue():
+    return flask.jsonify(execution_queue.get_stats())
+
+
+@SERVER.route("/jobs", methods=["GET"])
+def handle_get_jobs():
+    return flask.jsonify([job.to_dict() for job in jobs.get_jobs()])
+
+
+@SERVER.route("/jobs/<job_id>", methods=["GET"])
+def handle_get_job(job_id: str):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return flask.jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return flask.jsonify(job.to_dict())
+
+
+def register_post_handler(type: str, handler: Callable, timeout: Optional[float] = HANDLER_TIMEOUT):
+    """Handle requests of this type in the server. Requests are answered with 504 after `timeout` seconds."""
     assert type not in POST_HANDLERS, POST_HANDLERS
-    POST_HANDLERS[type] = handler
+    POST_HANDLERS[type] = (handler, timeout)
+
 
+def register_post_action(
+    type: str,
+    handler: Callable,
+    priority: int = PRIORITY_DEFAULT,
+    coalesce: Optional[Callable[[Dict], Hashable]] = None,
+    merge: Optional[Callable[[Dict, Dict], Dict]] = None,
+):
+    """Run handler in Blender's main thread. Responds with the id of the queued job.
+
+    `coalesce` maps request data to a key. Requests with the same key as a still queued job
+    are folded into that job (optionally combining the data with `merge`).
+    """
 
-def register_post_action(type: str, handler: Callable):
     def request_handler_wrapper(data):
-        run_in_main_thread(partial(handler, data))
-        return "OK"
+        coalesce_key = None if coalesce is None else (type, coalesce(data))
+        job = jobs.submit(
+            type,
+            data,
+            handler,
+            on_finish=send_job_finished,
+            priority=priority,
+            coalesce_key=coalesce_key,
+            merge=merge,
+        )
+        return flask.jsonify({"jobId": job.id})
 
     register_post_handler(type, request_handler_wrapper)
 
 
+def register_post_query(
+    type: str,
+    handler: Callable,
+    timeout: float = QUERY_TIMEOUT_SECONDS,
+    validate: Optional[Callable[[Dict], None]] = None,
+):
+    """Run handler in Blender's main thread and respond with its result.
+
+    The handler may return JSON compatible data or a `flask.Response` (e.g. for binary payloads).
+    When the result is not ready within `timeout`, the response contains the job id to poll.
+    `validate` runs in the server thread, a `ValueError` is answered with 400 without queueing a job.
+    """
+
+    def request_handler_wrapper(data):
+        if validate is not None:
+            try:
+                validate(data)
+            except ValueError as e:
+                return flask.jsonify({"error": str(e)}), 400
+        job = jobs.submit(type, data, handler)
+        if not job.wait(timeout):
+            if job.cancel():
+                return flask.jsonify({"error": f"Query was not started within {timeout}s.", "job": job.to_dict()}), 504
+            return flask.jsonify({"error": f"Query did not finish within {timeout}s.", "jobId": job.id}), 504
+        if job.state == jobs.FAILED:
+            return flask.jsonify({"error": job.error, "jobId": job.id}), 500
+        if isinstance(job.result, flask.Response):
+            return job.result
+        return flask.jsonify(job.result)
+
+    # the wrapper answers with 504 itself when the job takes too long
+    register_post_handler(type, request_handler_wrapper, timeout=None)
+
+
+def cancel_job_handler(data):
+    job = jobs.get_job(str(data["jobId"]))
+    if job is None:
+        return flask.jsonify({"error": f"Unknown job: {data['jobId']}"}), 404
+    return flask.jsonify({"cancelled": job.cancel(), "job": job.to_dict()})
+
+
+register_post_handler("cancelJob", cancel_job_handler)
+
+
 # Sending Data
 ###############################
 
 
-def send_connection_information(path_mappings: Dict):
+def send_connection_information(path_mappings: Dict, standby: bool = False):
     send_dict_as_json(
         {
             "type": "setup",
+            "standby": standby,
+            "noDebug": NO_DEBUG,
             "blenderPort": OWN_SERVER_PORT,
+            "blenderSocket": OWN_SOCKET_PATH,
             "debugpyPort": DEBUGPY_PORT,
             "blenderPath": str(blender_path),
             "scriptsFolder": str(scripts_folder),
@@ -160,9 +327,31 @@ def send_connection_information(path_mappings: Dict):
     )
 
 
+def send_job_finished(job: "jobs.Job"):
+    # job ids are only unique within one Blender process
+    send_dict_as_json({"type": "jobFinished", "vscodeIdentifier": VSCODE_IDENTIFIER, "job": job.to_dict()})
+
+
 def send_dict_as_json(data):
+    global EDITOR_SOCKET_PATH
     LOG.debug(f"Sending: {data}")
-    requests.post(EDITOR_ADDRESS, json=data)
+    if EDITOR_SOCKET_PATH is not None:
+        try:
+            status, _ = transport.post_json(EDITOR_SOCKET_PATH, data)
+        except OSError as e:
+            LOG.warning(f"Editor socket {EDITOR_SOCKET_PATH} failed, using TCP from now on: {e}")
+            EDITOR_SOCKET_PATH = None
+        else:
+            if status >= 400:
+                metrics.SEND_FAILURES.inc()
+            return
+    try:
+        response = requests.post(EDITOR_ADDRESS, json=data)
+    except requests.RequestException:
+        metrics.SEND_FAILURES.inc()
+        raise
+    if not response.ok:
+        metrics.SEND_FAILURES.inc()
 
 
 # Utils
@@ -177,6 +366,10 @@ def get_blender_port():
     return OWN_SERVER_PORT
 
 
+def get_blender_socket():
+    return OWN_SOCKET_PATH
+
+
 def get_debugpy_port():
     return DEBUGPY_PORT
 
@@ -0,0 +1,220 @@
+"""HTTP server of the control plane with a bounded worker pool.
+
+Connections are accepted by the server thread and handled by a fixed number of worker threads.
+A few triage threads peek at new connections and answer `GET /ping` directly, so the editor sees a
+responsive instance even when all workers are busy, and the accepting thread never waits for a client.
+Connections beyond the triage threads and their backlog are answered with `503` by the accepting thread,
+which waits at most `PEEK_TIMEOUT` for their request. When the workers and their backlog are full, new requests get `503` instead of waiting. Slow clients are
+limited by a socket timeout, large bodies by `MAX_CONTENT_LENGTH` of the Flask app and slow handlers by
+`run_handler`. Handlers that timed out keep their thread until they return, when all handler threads are
+taken further requests get `503` as well.
+"""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from . import log, metrics
+from .environment import HANDLER_TIMEOUT, SERVER_WORKERS
+
+LOG = log.getLogger()
+
+# requests that wait for a free worker, more are rejected
+BACKLOG = 16
+# threads that peek at new connections, a peek takes at most PEEK_TIMEOUT_WHEN_BUSY
+TRIAGE_WORKERS = 4
+# connections that wait for a triage thread, more are rejected without peeking
+TRIAGE_BACKLOG = 8
+# slow or stuck clients do not keep a worker forever
+READ_TIMEOUT = 10.0
+# the request line of a ping usually arrives together with the connection
+PEEK_TIMEOUT = 0.05
+PEEK_TIMEOUT_WHEN_BUSY = 1.0
+
+PING_REQUEST = b"GET /ping "
+PING_RESPONSE = (
+    b"HTTP/1.0 200 OK\r\n"
+    b"Content-Type: text/html; charset=utf-8\r\n"
+    b"Content-Length: 2\r\n"
+    b"Connection: close\r\n\r\n"
+    b"OK"
+)
+BUSY_RESPONSE = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 34\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n\r\n"
+    b'{"error": "All workers are busy."}'
+)
+
+
+class HandlersBusy(Exception):
+    """All handler threads are taken, e.g. by handlers that timed out and are still running."""
+
+
+class HandlerPool:
+    """Threads in which request handlers run, so that a worker can answer with a timeout while a stuck handler
+    keeps running. A thread is only free again when its handler returned."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.slots = threading.BoundedSemaphore(size)
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="blender_vscode handler")
+        # handlers that were answered with a timeout but did not return yet
+        self.overdue = 0
+        self._lock = threading.Lock()
+
+    def run(self, handler: Callable[[], object], timeout: Optional[float]):
+        if not self.slots.acquire(blocking=False):
+            raise HandlersBusy(
+                f"All {self.size} handler threads are busy, {self.overdue} of them with timed out handlers"
+            )
+        try:
+            future = self.executor.submit(self._run, handler)
+        except BaseException:
+            self.slots.release()
+            raise
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.overdue += 1
+            future.add_done_callback(self._overdue_finished)
+            raise TimeoutError(f"Handler did not finish within {timeout}s") from None
+
+    def _run(self, handler: Callable[[], object]):
+        try:
+            return handler()
+        finally:
+            self.slots.release()
+
+    def _overdue_finished(self, future):
+        with self._lock:
+            self.overdue -= 1
+
+
+_handler_pool = HandlerPool(SERVER_WORKERS)
+
+
+class ControlRequestHandler(WSGIRequestHandler):
+    # one request per connection, idle keep-alive connections would occupy workers
+    protocol_version = "HTTP/1.0"
+    timeout = READ_TIMEOUT
+
+
+class ControlServer(BaseWSGIServer):
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, workers: int = SERVER_WORKERS, backlog: int = BACKLOG):
+        super().__init__(host, port, app, handler=ControlRequestHandler)
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blender_vscode server")
+        self.triage_pool = ThreadPoolExecutor(max_workers=TRIAGE_WORKERS, thread_name_prefix="blender_vscode triage")
+        self.triage_slots = threading.BoundedSemaphore(TRIAGE_WORKERS + TRIAGE_BACKLOG)
+        self.slots = threading.BoundedSemaphore(workers + backlog)
+        self.active = 0
+        self._active_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        # peeking and answering inline wait for the client, the accepting thread hands the connection over
+        # and only waits itself (at most PEEK_TIMEOUT) when it rejects a connection
+        if not self.triage_slots.acquire(blocking=False):
+            # e.g. a burst of idle connections, pings are rejected as well
+            metrics.REJECTED_REQUESTS.inc()
+            LOG.warning("Control server is busy triaging connections, request rejected")
+            self.respond_inline(request, BUSY_RESPONSE, timeout=PEEK_TIMEOUT)
+            return
+        try:
+            self.triage_pool.submit(self.triage_request_in_slot, request, client_address)
+        except BaseException:
+            self.triage_slots.release()
+            raise
+
+    def triage_request_in_slot(self, request, client_address):
+        try:
+            self.triage_request(request, client_address)
+        finally:
+            self.triage_slots.release()
+
+    def triage_request(self, request, client_address):
+        has_slot = self.slots.acquire(blocking=False)
+        if self.is_ping(request, PEEK_TIMEOUT if has_slot else PEEK_TIMEOUT_WHEN_BUSY):
+            if has_slot:
+                self.slots.release()
+            self.respond_inline(request, PING_RESPONSE)
+            return
+        if not has_slot:
+            metrics.REJECTED_REQUESTS.inc()
+            LOG.warning("Control server is busy, request rejected")
+            self.respond_inline(request, BUSY_RESPONSE)
+            return
+        self.pool.submit(self.process_request_in_worker, request, client_address)
+
+    def process_request_in_worker(self, request, client_address):
+        with self._active_lock:
+            self.active += 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+            with self._active_lock:
+                self.active -= 1
+
+    def is_ping(self, request, timeout: float) -> bool:
+        try:
+            request.settimeout(timeout)
+            start = request.recv(len(PING_REQUEST), socket.MSG_PEEK)
+        except OSError:
+            return False
+        finally:
+            request.settimeout(None)
+        return start == PING_REQUEST
+
+    def respond_inline(self, request, response: bytes, timeout: float = PEEK_TIMEOUT_WHEN_BUSY):
+        try:
+            request.settimeout(timeout)
+            read_request_head(request, timeout=timeout)
+            request.sendall(response)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        if hasattr(self, "pool"):
+            self.pool.shutdown(wait=False)
+            self.triage_pool.shutdown(wait=False)
+
+
+def read_request_head(request, limit: int = 65536, timeout: float = PEEK_TIMEOUT_WHEN_BUSY):
+    """Consume the request line and headers, the client may not read the response otherwise."""
+    data = b""
+    deadline = time.perf_counter() + timeout
+    while b"\r\n\r\n" not in data and len(data) < limit and time.perf_counter() < deadline:
+        chunk = request.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+
+
+def run_handler(handler: Callable[[], object], timeout: Optional[float] = HANDLER_TIMEOUT):
+    """Run a request handler in the handler pool. Raises `TimeoutError` when it did not finish in time
+    and `HandlersBusy` when no handler thread is free.
+
+    The handler keeps running after a timeout, it cannot be interrupted.
+    """
+    return _handler_pool.run(handler, timeout)
+
+
+def get_overdue_handlers() -> int:
+    return _handler_pool.overdue
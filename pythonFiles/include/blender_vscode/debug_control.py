@@ -0,0 +1,72 @@
+"""Switching the debugger on and off while Blender runs.
+
+`suspend` stops tracing of the main thread, where operators, drawing and handlers run, so timings are
+not distorted by debugpy. `resume` turns it on again, breakpoints work as before.
+`listen` starts debugpy (also when Blender was started without debugger) and asks the editor to attach.
+There is no detach: after `pydevd.stoptrace` tracing cannot be turned on again in the same process.
+All functions have to be called in the main thread. Every change is sent to the editor as `debuggerState`.
+"""
+
+import sys
+from typing import Dict
+
+from . import log
+
+LOG = log.getLogger()
+
+DISABLED = "disabled"
+LISTENING = "listening"
+ATTACHED = "attached"
+SUSPENDED = "suspended"
+
+_main_thread_tracing = True
+
+
+def get_state() -> str:
+    from .communication import get_debugpy_port
+
+    if get_debugpy_port() is None:
+        return DISABLED
+    if not is_client_connected():
+        return LISTENING
+    return ATTACHED if _main_thread_tracing else SUSPENDED
+
+
+def is_client_connected() -> bool:
+    debugpy = sys.modules.get("debugpy")
+    return debugpy is not None and debugpy.is_client_connected()
+
+
+def to_dict() -> Dict:
+    from .communication import get_debugpy_port
+
+    return {"state": get_state(), "port": get_debugpy_port(), "mainThreadTracing": _main_thread_tracing}
+
+
+def suspend():
+    global _main_thread_tracing
+    import debugpy
+
+    debugpy.trace_this_thread(False)
+    _main_thread_tracing = False
+    LOG.info("Debugger tracing of the main thread suspended")
+
+
+def resume():
+    global _main_thread_tracing
+    import debugpy
+
+    debugpy.trace_this_thread(True)
+    _main_thread_tracing = True
+    LOG.info("Debugger tracing of the main thread resumed")
+
+
+def listen() -> int:
+    """Start debugpy if it is not running yet. Returns the port the editor attaches to."""
+    global _main_thread_tracing
+    from .communication import listen_for_debugger
+
+    port = listen_for_debugger()
+    _main_thread_tracing = True
+    LOG.info(f"Debugger listens at port {port}")
+    return port
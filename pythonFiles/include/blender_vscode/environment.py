@@ -2,7 +2,7 @@ import logging
 import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from typing import Tuple
 
 import addon_utils
@@ -28,6 +28,24 @@ def _parse_log(env_var_name: str) -> Tuple[int, bool]:
         return logging.WARNING, False
 
 
+def _parse_flag(env_var_name: str) -> bool:
+    return os.environ.get(env_var_name, "").lower() not in ("", "0", "false", "no", "off")
+
+
+_Number = TypeVar("_Number", int, float)
+
+
+def _parse_number(env_var_name: str, default: _Number, parse: Callable[[str], _Number] = float) -> _Number:
+    value = os.environ.get(env_var_name, "")
+    if not value:
+        return default
+    try:
+        return parse(value)
+    except ValueError:
+        logging.warning(f"Invalid value for {env_var_name}: {value!r}, using {default}")
+        return default
+
+
 # binary_path_python was removed in blender 2.92
 # but it is the most reliable way of getting python path for older versions
 # https://github.com/JacquesLucke/blender_vscode/issues/80
@@ -42,6 +60,32 @@ addon_directories = tuple(map(Path, addon_utils.paths()))
 EXTENSIONS_REPOSITORY: Optional[str] = os.environ.get("VSCODE_EXTENSIONS_REPOSITORY", "user_default") or "user_default"
 LOG_LEVEL, LOG_FLASK = _parse_log("VSCODE_LOG_LEVEL")
 VSCODE_IDENTIFIER: Optional[str] = os.environ.get("VSCODE_IDENTIFIER", "") or ""
+# hot reload and script running only: debugpy is neither imported nor listening, so nothing is traced
+NO_DEBUG = _parse_flag("VSCODE_NO_DEBUG")
+# in standby mode addons are not loaded on startup, they are assigned later by the editor
+STANDBY = _parse_flag("VSCODE_STANDBY")
+# main thread stalls longer than this (seconds) are reported to the editor, 0 disables the watchdog
+STALL_THRESHOLD = _parse_number("VSCODE_STALL_THRESHOLD", 1.0)
+# tracemalloc based memory report for every addon reload, can be toggled at runtime as well
+RELOAD_MEMORY_REPORT = _parse_flag("VSCODE_RELOAD_MEMORY_REPORT")
+# report callbacks and modules of purged addons that are still alive after a reload
+RELOAD_LEAK_GUARD = _parse_flag("VSCODE_RELOAD_LEAK_GUARD")
+# remove handlers, timers, draw handlers and msgbus subscriptions that point into purged addon modules
+RELOAD_REMOVE_STALE_CALLBACKS = _parse_flag("VSCODE_RELOAD_REMOVE_STALE_CALLBACKS")
+# reloads of changed function bodies replace their code instead of disabling and enabling the addon
+HOT_PATCH = _parse_flag("VSCODE_HOT_PATCH")
+# opt-in RNA export for the editor and other tools, written on startup when the Blender build changed
+RNA_EXPORT_DIR: Optional[str] = os.environ.get("VSCODE_RNA_EXPORT_DIR", "") or None
+# serve the control server on a Unix domain socket as well (Linux and macOS), see transport.py
+UNIX_SOCKETS = _parse_flag("VSCODE_UNIX_SOCKETS")
+# Unix domain socket of the editor, messages fall back to EDITOR_PORT when it does not work
+EDITOR_SOCKET: Optional[str] = os.environ.get("EDITOR_SOCKET", "") or None
+# worker threads of the control server, requests beyond those and a small backlog get 503
+SERVER_WORKERS = max(1, _parse_number("VSCODE_SERVER_WORKERS", 8, int))
+# larger request bodies are rejected with 413
+MAX_REQUEST_SIZE = _parse_number("VSCODE_MAX_REQUEST_SIZE", 64 * 1024 * 1024, int)
+# seconds until a request handler is answered with 504, queries have their own timeout
+HANDLER_TIMEOUT = _parse_number("VSCODE_HANDLER_TIMEOUT", 30.0)
 
 logging.getLogger("werkzeug").setLevel(logging.DEBUG if LOG_FLASK else logging.ERROR)
 # to mute all logs, disable also those logs. Be careful, the libs are extremely popular and it will mute logs for everyone!
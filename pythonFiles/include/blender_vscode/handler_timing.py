@@ -0,0 +1,189 @@
+"""Timing of the `bpy.app.handlers` callbacks of the developed addons.
+
+While enabled, callbacks of those addons are replaced by wrappers in the handler lists. The wrappers compare
+and hash like the callback, so an addon can still find and remove its callback in the list. Blender only keeps
+functions marked with `@persistent` on file load, so the callbacks are unwrapped in `load_pre` and wrapped again
+in `load_post`. Before an addon is disabled its callbacks are unwrapped as well, nothing is left behind on reload.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+
+from . import log, metrics
+from .leak_guard import get_defining_module, is_in_module
+
+LOG = log.getLogger()
+
+DEFAULT_TOP = 10
+
+_enabled = False
+_module_names: List[str] = []
+# (handler list name, callback name) -> statistics, kept when callbacks are unwrapped and wrapped again
+_stats: Dict[Tuple[str, str], "CallbackStats"] = {}
+
+
+class CallbackStats:
+    __slots__ = ("handler", "callback", "count", "total", "max")
+
+    def __init__(self, handler: str, callback: str):
+        self.handler = handler
+        self.callback = callback
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def to_dict(self) -> Dict:
+        return {
+            "handler": self.handler,
+            "callback": self.callback,
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class TimedCallback:
+    """Calls the callback and records its duration. Other attributes are those of the callback."""
+
+    def __init__(self, callback, list_name: str, callback_name: str, stats: CallbackStats):
+        self.__wrapped__ = callback
+        self.list_name = list_name
+        self.callback_name = callback_name
+        self.stats = stats
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.__wrapped__(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            self.stats.add(duration)
+            metrics.HANDLER_DURATION.observe(duration, self.list_name, self.callback_name)
+
+    def __getattr__(self, name):
+        return getattr(self.__wrapped__, name)
+
+    # `handlers.remove(callback)` and `callback in handlers` of the addon must find the wrapper
+    def __eq__(self, other):
+        if isinstance(other, TimedCallback):
+            other = other.__wrapped__
+        return self.__wrapped__ == other
+
+    def __hash__(self):
+        return hash(self.__wrapped__)
+
+    def __repr__(self):
+        return f"<timed {self.__wrapped__!r}>"
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(module_names: List[str]):
+    """Wrap the handler callbacks defined in the given addon modules, also after they are reloaded."""
+    global _enabled
+    _enabled = True
+    _module_names[:] = module_names
+    for module_name in module_names:
+        wrap_addon(module_name)
+    add_load_handlers()
+    LOG.info(f"Timing app handlers of {', '.join(module_names)}")
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    for module_name in _module_names:
+        unwrap_addon(module_name)
+    _module_names.clear()
+    remove_load_handlers()
+
+
+def reset():
+    _stats.clear()
+
+
+def wrap_addon(module_name: str):
+    if not _enabled or module_name not in _module_names:
+        return
+    for list_name, handlers in iter_handler_lists():
+        for index, callback in enumerate(handlers):
+            if is_timed(callback) or not is_in_module(get_defining_module(callback), module_name):
+                continue
+            handlers[index] = wrap_callback(list_name, callback)
+
+
+def unwrap_addon(module_name: str):
+    for _, handlers in iter_handler_lists():
+        for index, callback in enumerate(handlers):
+            if is_timed(callback) and is_in_module(get_defining_module(callback.__wrapped__), module_name):
+                handlers[index] = callback.__wrapped__
+
+
+def unwrap_before_load(*args):
+    # wrappers are no functions, Blender would drop them even when the callback is persistent
+    for module_name in _module_names:
+        unwrap_addon(module_name)
+
+
+def wrap_after_load(*args):
+    for module_name in _module_names:
+        wrap_addon(module_name)
+
+
+# same mark as `bpy.app.handlers.persistent` sets
+unwrap_before_load._bpy_persistent = None
+wrap_after_load._bpy_persistent = None
+
+
+def add_load_handlers():
+    handlers = bpy.app.handlers
+    for handler_list, function in ((handlers.load_pre, unwrap_before_load), (handlers.load_post, wrap_after_load)):
+        if function not in handler_list:
+            handler_list.append(function)
+
+
+def remove_load_handlers():
+    handlers = bpy.app.handlers
+    for handler_list, function in ((handlers.load_pre, unwrap_before_load), (handlers.load_post, wrap_after_load)):
+        if function in handler_list:
+            handler_list.remove(function)
+
+
+def iter_handler_lists():
+    for name in dir(bpy.app.handlers):
+        handlers = getattr(bpy.app.handlers, name)
+        if not name.startswith("_") and isinstance(handlers, list):
+            yield name, handlers
+
+
+def is_timed(callback) -> bool:
+    return isinstance(callback, TimedCallback)
+
+
+def wrap_callback(list_name: str, callback):
+    callback_name = f"{get_defining_module(callback)}.{getattr(callback, '__qualname__', repr(callback))}"
+    stats = _stats.get((list_name, callback_name))
+    if stats is None:
+        stats = _stats[(list_name, callback_name)] = CallbackStats(list_name, callback_name)
+    return TimedCallback(callback, list_name, callback_name, stats)
+
+
+def get_report(top: Optional[int] = DEFAULT_TOP) -> Dict:
+    """Callbacks sorted by the total time spent in them."""
+    stats = sorted((stats.to_dict() for stats in list(_stats.values())), key=lambda item: -item["total"])
+    return {
+        "enabled": _enabled,
+        "addons": list(_module_names),
+        "callbacks": stats if top is None else stats[:top],
+    }
@@ -0,0 +1,233 @@
+"""In-place patching of changed function bodies, a lighter alternative to reloading an addon.
+
+A reload disables and enables the addon, so all classes are unregistered and runtime state is lost.
+The sources of the addon modules are remembered when the addon is enabled. When changed files differ
+from them only in the bodies of module level functions and methods of module level classes, the
+`__code__` of the existing function objects is replaced and every reference sees the new body.
+Changed signatures, decorators, class attributes, imports or other module level statements need a
+full reload. Functions whose body did not change get new code as well, their line numbers may have moved.
+"""
+
+import ast
+import copy
+import inspect
+import os
+import sys
+import tokenize
+import types
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import log
+from .environment import HOT_PATCH
+
+LOG = log.getLogger()
+
+FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+# decorators that keep the original in `__wrapped__`, e.g. the timing wrappers
+MAX_WRAPPERS = 10
+
+_enabled = HOT_PATCH
+# normalized file path -> (module name, source when the addon was enabled)
+_sources: Dict[str, Tuple[str, str]] = {}
+
+
+class PatchNotPossible(Exception):
+    """The change needs a full reload, the message contains the reason."""
+
+
+class FunctionPatch:
+    def __init__(self, qualname: str, function: types.FunctionType, code: types.CodeType, doc: Optional[str]):
+        self.qualname = qualname
+        self.function = function
+        self.code = code
+        self.doc = doc
+
+
+class FilePatch:
+    def __init__(self, path: str, module_name: str, source: str):
+        self.path = path
+        self.module_name = module_name
+        self.source = source
+        self.changed: List[FunctionPatch] = []
+        # only moved, their code is replaced so that line numbers stay correct
+        self.unchanged: List[FunctionPatch] = []
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    _sources.clear()
+
+
+def remember_addon(module_name: str):
+    """Remember the sources of the loaded modules of an addon, changed files are compared against them."""
+    if not _enabled:
+        return
+    prefix = module_name + "."
+    for path, (name, _) in list(_sources.items()):
+        if name == module_name or name.startswith(prefix):
+            del _sources[path]
+    for name, module in list(sys.modules.items()):
+        if module is None or not (name == module_name or name.startswith(prefix)):
+            continue
+        path = getattr(module, "__file__", None)
+        if not path or not path.endswith(".py"):
+            continue
+        try:
+            _sources[_normalize_path(path)] = (name, read_source(path))
+        except (OSError, SyntaxError):
+            continue
+
+
+def try_patch(files: Iterable[str]) -> List[str]:
+    """Replace the code of the functions in the changed files. Returns the qualified names of changed functions.
+
+    Raises `PatchNotPossible` when any file needs a full reload, nothing is patched then.
+    """
+    file_patches = [plan_file(path) for path in files]
+    patched = []
+    for file_patch in file_patches:
+        for function_patch in file_patch.unchanged:
+            function_patch.function.__code__ = function_patch.code
+        for function_patch in file_patch.changed:
+            function_patch.function.__code__ = function_patch.code
+            function_patch.function.__doc__ = function_patch.doc
+            patched.append(f"{file_patch.module_name}.{function_patch.qualname}")
+        _sources[_normalize_path(file_patch.path)] = (file_patch.module_name, file_patch.source)
+    LOG.info(f"Hot patched {', '.join(patched) or 'nothing'}")
+    return patched
+
+
+def plan_file(path: str) -> FilePatch:
+    remembered = _sources.get(_normalize_path(path))
+    if remembered is None:
+        raise PatchNotPossible(f"{path} is not a module of a loaded addon")
+    module_name, old_source = remembered
+    module = sys.modules.get(module_name)
+    if module is None or _normalize_path(getattr(module, "__file__", None) or "") != _normalize_path(path):
+        raise PatchNotPossible(f"Module {module_name} is not loaded")
+
+    try:
+        new_source = read_source(path)
+        new_tree = ast.parse(new_source, path)
+        code = compile(new_source, module.__file__, "exec", dont_inherit=True)
+    except (OSError, SyntaxError, ValueError) as e:
+        raise PatchNotPossible(f"{path} cannot be compiled: {e}") from None
+    old_tree = ast.parse(old_source)
+    if get_layout(old_tree) != get_layout(new_tree):
+        raise PatchNotPossible(f"{path} changed outside of function bodies")
+
+    old_functions, _ = get_functions(old_tree)
+    new_functions, ambiguous = get_functions(new_tree)
+    codes, ambiguous_codes = get_code_objects(code)
+    ambiguous |= ambiguous_codes
+
+    file_patch = FilePatch(path, module_name, new_source)
+    for qualname, node in new_functions.items():
+        changed = ast.dump(node) != ast.dump(old_functions[qualname])
+        function = find_function(module, qualname)
+        new_code = codes.get(qualname)
+        if qualname in ambiguous or function is None or new_code is None:
+            if changed:
+                raise PatchNotPossible(f"{module_name}.{qualname} cannot be found")
+            continue
+        if function.__code__.co_freevars != new_code.co_freevars:
+            if changed:
+                raise PatchNotPossible(f"{module_name}.{qualname} uses different closure variables")
+            continue
+        function_patch = FunctionPatch(qualname, function, new_code, ast.get_docstring(node, clean=False))
+        (file_patch.changed if changed else file_patch.unchanged).append(function_patch)
+    return file_patch
+
+
+def get_layout(tree: ast.Module) -> str:
+    """Dump of the module without the bodies of the functions that can be patched."""
+    tree = copy.deepcopy(tree)
+    for _, node in iter_functions(tree):
+        node.body = []
+    return ast.dump(tree)
+
+
+def iter_functions(tree: ast.Module) -> Iterator[Tuple[str, ast.AST]]:
+    """Module level functions and methods of module level classes with their qualified names."""
+    for node in tree.body:
+        if isinstance(node, FUNCTION_TYPES):
+            yield node.name, node
+        elif isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, FUNCTION_TYPES):
+                    yield f"{node.name}.{child.name}", child
+
+
+def get_functions(tree: ast.Module) -> Tuple[Dict[str, ast.AST], Set[str]]:
+    """Function nodes by qualified name and the names that are defined more than once (e.g. property setters)."""
+    functions = {}
+    ambiguous = set()
+    for qualname, node in iter_functions(tree):
+        if qualname in functions:
+            ambiguous.add(qualname)
+        functions[qualname] = node
+    return functions, ambiguous
+
+
+def get_code_objects(module_code: types.CodeType) -> Tuple[Dict[str, types.CodeType], Set[str]]:
+    """Code of the functions that `iter_functions` finds, taken from the constants of the module code."""
+    codes = {}
+    ambiguous = set()
+
+    def add(qualname: str, code: types.CodeType):
+        if qualname in codes:
+            ambiguous.add(qualname)
+        codes[qualname] = code
+
+    for const in module_code.co_consts:
+        if not isinstance(const, types.CodeType):
+            continue
+        if const.co_flags & inspect.CO_OPTIMIZED:
+            add(const.co_name, const)
+        else:
+            # class body
+            for child in const.co_consts:
+                if isinstance(child, types.CodeType) and child.co_flags & inspect.CO_OPTIMIZED:
+                    add(f"{const.co_name}.{child.co_name}", child)
+    return codes, ambiguous
+
+
+def find_function(module: types.ModuleType, qualname: str) -> Optional[types.FunctionType]:
+    """The function object defined for `qualname` in the module, behind decorators that set `__wrapped__`."""
+    class_name, _, name = qualname.rpartition(".")
+    if class_name:
+        cls = vars(module).get(class_name)
+        value = vars(cls).get(name) if isinstance(cls, type) else None
+    else:
+        value = vars(module).get(name)
+
+    for _ in range(MAX_WRAPPERS):
+        if isinstance(value, (staticmethod, classmethod)):
+            value = value.__func__
+        if isinstance(value, types.FunctionType) and value.__code__.co_name == name:
+            if _normalize_path(value.__code__.co_filename) == _normalize_path(module.__file__):
+                return value
+        value = getattr(value, "__wrapped__", None)
+        if value is None:
+            return None
+    return None
+
+
+def read_source(path: str) -> str:
+    # respects encoding declarations like the import system
+    with tokenize.open(path) as f:
+        return f.read()
+
+
+def _normalize_path(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
@@ -1,5 +1,6 @@
 import sys
 import subprocess
+import tempfile
 
 import bpy
 
@@ -7,6 +8,7 @@ from pathlib import Path
 
 from . import handle_fatal_error
 from . import log
+from . import wheelhouse
 from .environment import python_path
 
 LOG = log.getLogger()
@@ -28,26 +30,59 @@ def install_packages(package_names):
     if not module_can_be_imported("pip"):
         install_pip()
 
-    for name in package_names:
-        ensure_package_is_installed(name)
+    missing = [name for name in package_names if not module_can_be_imported(name)]
+    if missing and not install_from_wheelhouse(missing):
+        install_package_batch(missing)
 
-    assert packages_are_installed(package_names)
+    for name in missing:
+        if not module_can_be_imported(name):
+            handle_fatal_error(f"could not install {name}")
 
 
-def ensure_package_is_installed(name: str):
-    if not module_can_be_imported(name):
-        install_package(name)
+def install_from_wheelhouse(package_names) -> bool:
+    """Install from the local wheelhouse without network access, see `wheelhouse.py`."""
+    directory = wheelhouse.get_wheelhouse_directory()
+    if directory is None or not directory.is_dir():
+        return False
+    try:
+        wheels = wheelhouse.get_verified_wheels(directory)
+    except ValueError as e:
+        LOG.warning(f"Not using wheelhouse: {e}")
+        return False
+    if not wheels:
+        return False
 
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        requirements_path = Path(tmp_dir) / "requirements.txt"
+        wheelhouse.write_requirements(wheels, requirements_path)
+        command = [
+            str(python_path),
+            "-m",
+            "pip",
+            "install",
+            "--no-index",
+            "--find-links",
+            str(directory),
+            "--require-hashes",
+            "-r",
+            str(requirements_path),
+            "--target",
+            get_package_install_directory(),
+        ]
+        LOG.info(f"Execute: {' '.join(command)}")
+        result = subprocess.run(command, cwd=_CWD_FOR_SUBPROCESSES)
+    if result.returncode != 0:
+        LOG.warning(f"Installing from wheelhouse {directory} failed, falling back to package index")
+        return False
+    return all(module_can_be_imported(name) for name in package_names)
 
-def install_package(name: str):
+
+def install_package_batch(package_names):
     target = get_package_install_directory()
-    command = [str(python_path), "-m", "pip", "install", name, "--target", target]
+    command = [str(python_path), "-m", "pip", "install", *package_names, "--target", target]
     LOG.info(f"Execute: {' '.join(command)}")
     subprocess.run(command, cwd=_CWD_FOR_SUBPROCESSES)
 
-    if not module_can_be_imported(name):
-        handle_fatal_error(f"could not install {name}")
-
 
 def install_pip():
     # try ensurepip before get-pip.py
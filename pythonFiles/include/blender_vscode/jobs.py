@@ -0,0 +1,231 @@
+import itertools
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from . import log, metrics
+from .utils import PRIORITY_DEFAULT, execution_queue, run_in_main_thread
+
+LOG = log.getLogger()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# finished jobs are kept this long so that the editor can still query their status
+JOB_TTL_SECONDS = 300
+
+_JOBS: Dict[str, "Job"] = {}
+_LOCK = threading.Lock()
+_ID_COUNTER = itertools.count(1)
+
+
+class Job:
+    """Unit of work requested by the editor and executed in Blender's main thread."""
+
+    def __init__(self, type: str, data: Dict, handler: Callable, on_finish: Optional[Callable] = None):
+        # assigned by `submit` once the job is queued, coalesced requests do not use up ids
+        self.id: Optional[str] = None
+        self.type = type
+        self.data = data
+        self.handler = handler
+        self.on_finish = on_finish
+        self.state = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.queued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.coalesced = 0
+        self.queue_entry = None
+        self._run_start: Optional[float] = None
+        self._finished = threading.Event()
+
+    def run(self):
+        with _LOCK:
+            if self.state != QUEUED:
+                return
+            self.state = RUNNING
+            self.started_at = time.time()
+        metrics.JOB_WAIT.observe(self.started_at - self.queued_at, self.type)
+        self._run_start = time.perf_counter()
+        try:
+            result = self.handler(self.data)
+        except Exception:
+            traceback.print_exc()
+            self._finish_run(FAILED, error=traceback.format_exc())
+        else:
+            if isinstance(result, Deferred):
+                # keeps running until the handler's work calls back
+                result.attach(self)
+                return
+            self._finish_run(DONE, result=result)
+
+    def _finish_run(self, state: str, result: Any = None, error: Optional[str] = None):
+        if state == FAILED:
+            metrics.JOB_FAILURES.inc(self.type)
+        metrics.JOB_DURATION.observe(time.perf_counter() - self._run_start, self.type)
+        self._finish(state, result=result, error=error)
+
+    def cancel(self) -> bool:
+        """Cancel the job. Only jobs that did not start yet can be cancelled."""
+        with _LOCK:
+            if self.state != QUEUED:
+                return False
+            self.state = CANCELLED
+            # under the same lock as `submit`, so that no request is coalesced into the cancelled entry
+            if self.queue_entry is not None:
+                execution_queue.cancel(self.queue_entry)
+        self._finish(CANCELLED)
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def _finish(self, state: str, result: Any = None, error: Optional[str] = None):
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self.state = state
+        self._finished.set()
+        if self.on_finish is not None:
+            try:
+                self.on_finish(self)
+            except Exception:
+                LOG.exception(f"Failed to report finished job {self.id}")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "state": self.state,
+            "queuedAt": self.queued_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "waitTime": None if self.started_at is None else self.started_at - self.queued_at,
+            "runTime": (
+                None if self.started_at is None or self.finished_at is None else self.finished_at - self.started_at
+            ),
+            "result": _to_json_compatible(self.result),
+            "error": self.error,
+            "coalesced": self.coalesced,
+        }
+
+
+class Deferred:
+    """Returned by a handler whose work goes on after it returned, e.g. in timer callbacks.
+
+    The job stays running until `resolve`, `reject` or `cancel` is called (in the main thread).
+    """
+
+    def __init__(self):
+        self.job: Optional[Job] = None
+        self.outcome: Optional[Tuple[str, Any, Optional[str]]] = None
+
+    def resolve(self, result: Any = None):
+        self._settle(DONE, result, None)
+
+    def reject(self, error: str):
+        self._settle(FAILED, None, error)
+
+    def cancel(self):
+        self._settle(CANCELLED, None, None)
+
+    def attach(self, job: Job):
+        self.job = job
+        if self.outcome is not None:
+            job._finish_run(*self.outcome)
+
+    def _settle(self, state: str, result: Any, error: Optional[str]):
+        if self.outcome is not None:
+            return
+        self.outcome = (state, result, error)
+        if self.job is not None:
+            self.job._finish_run(state, result, error)
+
+
+def submit(
+    type: str,
+    data: Dict,
+    handler: Callable,
+    on_finish: Optional[Callable] = None,
+    priority: int = PRIORITY_DEFAULT,
+    coalesce_key: Optional[Hashable] = None,
+    merge: Optional[Callable[[Dict, Dict], Dict]] = None,
+) -> Job:
+    """Create a job and queue it for execution in the main thread.
+
+    When a job with the same `coalesce_key` is still queued, no new job is created. The queued job
+    is returned instead and its data is replaced by `merge(queued_data, data)` (or just `data`).
+    """
+    job = Job(type, data, handler, on_finish)
+    with _LOCK:
+        _evict_finished_jobs(JOB_TTL_SECONDS)
+        entry = run_in_main_thread(job.run, priority=priority, coalesce_key=coalesce_key, owner=job)
+        if entry.owner is not job:
+            pending: Job = entry.owner
+            pending.data = data if merge is None else merge(pending.data, data)
+            pending.coalesced += 1
+            LOG.debug(f"Coalesced {type} request into pending job {pending.id}")
+            return pending
+        # `Job.run` takes the lock first, the id is set before the job can start
+        job.id = str(next(_ID_COUNTER))
+        job.queue_entry = entry
+        _JOBS[job.id] = job
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    with _LOCK:
+        _evict_finished_jobs(JOB_TTL_SECONDS)
+        return _JOBS.get(job_id)
+
+
+def cancel_job(job_id: str) -> bool:
+    job = get_job(job_id)
+    if job is None:
+        return False
+    return job.cancel()
+
+
+def get_jobs() -> List[Job]:
+    with _LOCK:
+        _evict_finished_jobs(JOB_TTL_SECONDS)
+        return list(_JOBS.values())
+
+
+def evict_finished_jobs(ttl: float = JOB_TTL_SECONDS):
+    with _LOCK:
+        _evict_finished_jobs(ttl)
+
+
+def _evict_finished_jobs(ttl: float):
+    # the caller holds _LOCK
+    deadline = time.time() - ttl
+    expired = [
+        job_id
+        for job_id, job in _JOBS.items()
+        if job.is_finished and job.finished_at is not None and job.finished_at < deadline
+    ]
+    for job_id in expired:
+        del _JOBS[job_id]
+
+
+def _to_json_compatible(value):
+    # handlers usually return None or blender operator results like {"FINISHED"}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (set, frozenset, tuple, list)):
+        return [_to_json_compatible(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _to_json_compatible(item) for key, item in value.items()}
+    return repr(value)
@@ -0,0 +1,288 @@
+"""Detection of modules and callbacks that survive an addon reload.
+
+`bpy.app.handlers` can be inspected directly. Timers, draw handlers and msgbus subscriptions can not be listed
+with the Blender API, so their registration functions are wrapped by `install` to keep track of them.
+The guard is opt-in, Blender's functions are only wrapped while it is enabled.
+"""
+
+import functools
+import gc
+import inspect
+import sys
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+import bpy
+
+from . import log
+from .environment import RELOAD_LEAK_GUARD, RELOAD_REMOVE_STALE_CALLBACKS
+
+LOG = log.getLogger()
+
+_enabled = RELOAD_LEAK_GUARD or RELOAD_REMOVE_STALE_CALLBACKS
+_remove_stale_callbacks = RELOAD_REMOVE_STALE_CALLBACKS
+# (owner, attribute, original value) of the wrapped registration functions
+_originals: List[Tuple[object, str, object]] = []
+
+
+class Registration:
+    """Callback registered through a wrapped Blender API.
+
+    The callback is referenced weakly, timers that finished by returning `None` must not keep their module alive.
+    """
+
+    def __init__(self, kind: str, callback, remove: Callable, is_active: Optional[Callable] = None, token=None):
+        self.kind = kind
+        self._callback = weak_callable(callback)
+        self._remove = remove
+        self._is_active = is_active
+        # draw handler handle or msgbus owner, used to forget the registration when it is removed
+        self.token = token
+
+    @property
+    def callback(self):
+        return self._callback()
+
+    def is_active(self) -> bool:
+        callback = self.callback
+        if callback is None:
+            return False
+        return self._is_active is None or self._is_active(callback)
+
+    def remove(self):
+        callback = self.callback
+        if callback is not None:
+            self._remove(callback)
+        forget_registrations(lambda registration: registration is self)
+
+
+_registrations: List[Registration] = []
+
+
+def weak_callable(callback) -> Callable:
+    try:
+        if inspect.ismethod(callback):
+            return weakref.WeakMethod(callback)
+        return weakref.ref(callback)
+    except TypeError:
+        return lambda: callback
+
+
+def forget_registrations(predicate: Callable[[Registration], bool]):
+    _registrations[:] = [registration for registration in _registrations if not predicate(registration)]
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    """Check reloads from now on. Only callbacks registered after this are tracked, apart from handlers."""
+    global _enabled
+    _enabled = True
+    install()
+
+
+def disable():
+    global _enabled, _remove_stale_callbacks
+    _enabled = False
+    _remove_stale_callbacks = False
+    uninstall()
+
+
+def set_remove_stale_callbacks(value: bool):
+    global _remove_stale_callbacks
+    _remove_stale_callbacks = value
+    if value:
+        enable()
+
+
+def get_remove_stale_callbacks() -> bool:
+    return _remove_stale_callbacks
+
+
+# Wrap registration functions
+#########################################
+
+
+def install():
+    """Keep track of timers, draw handlers and msgbus subscriptions registered from now on."""
+    if _originals:
+        return
+    for install_function in (install_timers, install_draw_handlers, install_msgbus):
+        try:
+            install_function()
+        except (AttributeError, KeyError, TypeError) as e:
+            LOG.warning(f"Leak guard can not track {install_function.__name__[len('install_'):]}: {e}")
+
+
+def uninstall():
+    """Restore the registration functions of Blender and forget the tracked registrations."""
+    for owner, name, original in reversed(_originals):
+        setattr(owner, name, original)
+    _originals.clear()
+    _registrations.clear()
+
+
+def replace(owner, name: str, value, original):
+    _originals.append((owner, name, original))
+    setattr(owner, name, value)
+
+
+def install_timers():
+    timers = bpy.app.timers
+    original_register = timers.register
+
+    @functools.wraps(original_register)
+    def register(function, *args, **kwargs):
+        result = original_register(function, *args, **kwargs)
+        _registrations.append(Registration("timer", function, remove=timers.unregister, is_active=timers.is_registered))
+        return result
+
+    replace(timers, "register", register, original_register)
+
+
+def install_draw_handlers():
+    original_add = bpy.types.Space.__dict__["draw_handler_add"]
+    original_remove = bpy.types.Space.__dict__["draw_handler_remove"]
+
+    def draw_handler_add(cls, callback, args, region_type, draw_type):
+        handle = original_add.__get__(None, cls)(callback, args, region_type, draw_type)
+        _registrations.append(
+            Registration(
+                f"drawHandler:{cls.__name__}",
+                callback,
+                remove=lambda _: original_remove.__get__(None, cls)(handle, region_type),
+                token=handle,
+            )
+        )
+        return handle
+
+    def draw_handler_remove(cls, handle, region_type):
+        forget_registrations(lambda registration: registration.token is handle)
+        return original_remove.__get__(None, cls)(handle, region_type)
+
+    replace(bpy.types.Space, "draw_handler_add", classmethod(draw_handler_add), original_add)
+    replace(bpy.types.Space, "draw_handler_remove", classmethod(draw_handler_remove), original_remove)
+
+
+def install_msgbus():
+    msgbus = bpy.msgbus
+    original_subscribe = msgbus.subscribe_rna
+    original_clear = msgbus.clear_by_owner
+
+    def subscribe_rna(*, key, owner, args, notify, **kwargs):
+        result = original_subscribe(key=key, owner=owner, args=args, notify=notify, **kwargs)
+        _registrations.append(Registration("msgbus", notify, remove=lambda _: clear_by_owner(owner), token=owner))
+        return result
+
+    def clear_by_owner(owner):
+        forget_registrations(lambda registration: registration.kind == "msgbus" and registration.token is owner)
+        return original_clear(owner)
+
+    replace(msgbus, "subscribe_rna", subscribe_rna, original_subscribe)
+    replace(msgbus, "clear_by_owner", clear_by_owner, original_clear)
+
+
+# Checks
+#########################################
+
+
+def watch_modules(module_name: str) -> Dict[str, weakref.ref]:
+    """Weak references to the modules of an addon, taken before they are purged."""
+    prefix = module_name + "."
+    return {
+        name: weakref.ref(module)
+        for name, module in list(sys.modules.items())
+        if (name == module_name or name.startswith(prefix)) and module is not None
+    }
+
+
+def check(module_name: str, module_refs: Dict[str, weakref.ref], remove: Optional[bool] = None) -> Dict:
+    """Find callbacks and modules of a purged addon that are still alive.
+
+    Must be called after the addon was disabled and its modules were purged, but before it is enabled again.
+    Then every callback defined in the addon is a leftover of the previous version.
+    """
+    if remove is None:
+        remove = _remove_stale_callbacks
+    stale_callbacks = find_stale_callbacks(module_name)
+    if remove:
+        for callback in stale_callbacks:
+            callback["remove"]()
+    gc.collect()
+    stale_modules = sorted(name for name, ref in module_refs.items() if ref() is not None)
+
+    for callback in stale_callbacks:
+        action = "Removed" if remove else "Found"
+        LOG.warning(f"{action} stale {callback['kind']} callback {callback['callback']} of purged addon {module_name}")
+    if stale_modules:
+        LOG.warning(f"Modules of {module_name} are still referenced after reload: {', '.join(stale_modules)}")
+
+    return {
+        "module": module_name,
+        "staleModules": stale_modules,
+        "staleCallbacks": [
+            {"kind": callback["kind"], "callback": callback["callback"], "module": callback["module"]}
+            for callback in stale_callbacks
+        ],
+        "removed": bool(remove and stale_callbacks),
+    }
+
+
+def find_stale_callbacks(module_name: str) -> List[Dict]:
+    forget_registrations(lambda registration: not registration.is_active())
+    found = []
+    for name in dir(bpy.app.handlers):
+        handlers = getattr(bpy.app.handlers, name)
+        if name.startswith("_") or not isinstance(handlers, list):
+            continue
+        for callback in list(handlers):
+            defining_module = get_defining_module(callback)
+            if is_in_module(defining_module, module_name):
+                found.append(
+                    {
+                        "kind": f"handler:{name}",
+                        "callback": describe_callback(callback),
+                        "module": defining_module,
+                        "remove": functools.partial(_remove_from_list, handlers, callback),
+                    }
+                )
+    for registration in list(_registrations):
+        callback = registration.callback
+        defining_module = get_defining_module(callback)
+        if is_in_module(defining_module, module_name):
+            found.append(
+                {
+                    "kind": registration.kind,
+                    "callback": describe_callback(callback),
+                    "module": defining_module,
+                    "remove": registration.remove,
+                }
+            )
+    return found
+
+
+def _remove_from_list(handlers: list, callback):
+    if callback in handlers:
+        handlers.remove(callback)
+
+
+def get_defining_module(callback) -> Optional[str]:
+    while isinstance(callback, functools.partial):
+        callback = callback.func
+    callback = getattr(callback, "__func__", callback)
+    module_globals = getattr(callback, "__globals__", None)
+    if module_globals is not None:
+        return module_globals.get("__name__")
+    return getattr(type(callback), "__module__", None)
+
+
+def is_in_module(name: Optional[str], module_name: str) -> bool:
+    return name is not None and (name == module_name or name.startswith(module_name + "."))
+
+
+def describe_callback(callback) -> str:
+    while isinstance(callback, functools.partial):
+        callback = callback.func
+    return getattr(callback, "__qualname__", None) or repr(callback)
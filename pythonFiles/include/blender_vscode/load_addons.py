@@ -2,12 +2,13 @@ import os
 import subprocess
 import sys
 import traceback
+import types
 from pathlib import Path
-from typing import List, Union, Optional, Dict
+from typing import Iterable, List, Union, Optional, Dict, Set, Tuple
 
 import bpy
 
-from . import AddonInfo, log
+from . import AddonInfo, hot_patch, log
 from .communication import send_dict_as_json
 from .environment import addon_directories, EXTENSIONS_REPOSITORY
 from .utils import is_addon_legacy, addon_has_bl_info
@@ -20,6 +21,11 @@ else:
     _EXTENSIONS_DEFAULT_DIR = None
 _ADDONS_DEFAULT_DIR = Path(bpy.utils.user_resource("SCRIPTS", path="addons"))
 
+# addons passed to the last call of `load`
+LOADED_ADDONS: List[AddonInfo] = []
+# development and load directories of the linked addons -> addon name, see `find_addon_of_file`
+_ADDON_DIRECTORY_INDEX: Dict[str, str] = {}
+
 
 def setup_addon_links(addons_to_load: List[AddonInfo]) -> List[Dict]:
     path_mappings: List[Dict] = []
@@ -30,6 +36,7 @@ def setup_addon_links(addons_to_load: List[AddonInfo]) -> List[Dict]:
     if str(_ADDONS_DEFAULT_DIR) not in sys.path:
         sys.path.append(str(_ADDONS_DEFAULT_DIR))
 
+    _ADDON_DIRECTORY_INDEX.clear()
     remove_broken_addon_links()
     if bpy.app.version >= (4, 2, 0):
         ensure_extension_repo_exists(EXTENSIONS_REPOSITORY)
@@ -49,6 +56,8 @@ Path "{e.filename}" can not be removed. **Please remove it manually!** Most like
             raise e
         else:
             path_mappings.append({"src": str(addon_info.load_dir), "load": str(load_path)})
+            index_addon_directory(addon_info.load_dir, addon_info.module_name)
+            index_addon_directory(load_path, addon_info.module_name)
 
     return path_mappings
 
@@ -207,24 +216,130 @@ def remove_broken_extension_links():
 
 
 def load(addons_to_load: List[AddonInfo]):
+    LOADED_ADDONS[:] = addons_to_load
     for addon_info in addons_to_load:
-        if is_addon_legacy(Path(addon_info.load_dir)):
-            bpy.ops.preferences.addon_refresh()
-            addon_name = addon_info.module_name
-        elif addon_has_bl_info(addon_info.load_dir) and is_in_any_addon_directory(addon_info.load_dir):
-            # this addon is compatible with legacy addons and extensions
-            # but user is developing it in addon directory. Treat it as addon.
-            bpy.ops.preferences.addon_refresh()
-            addon_name = addon_info.module_name
-        else:
+        addon_name = get_addon_module_name(addon_info)
+        if addon_name.startswith("bl_ext."):
             bpy.ops.extensions.repo_refresh_all()
-            addon_name = "bl_ext." + EXTENSIONS_REPOSITORY + "." + addon_info.module_name
+        else:
+            bpy.ops.preferences.addon_refresh()
 
         try:
             bpy.ops.preferences.addon_enable(module=addon_name)
         except Exception:
             traceback.print_exc()
             send_dict_as_json({"type": "enableFailure", "addonPath": str(addon_info.load_dir)})
+            continue
+        hot_patch.remember_addon(addon_name)
+
+
+def get_loaded_addon_module_names() -> List[str]:
+    return [get_addon_module_name(addon_info) for addon_info in LOADED_ADDONS]
+
+
+def get_addon_module_name(addon_info: AddonInfo) -> str:
+    if is_addon_legacy(Path(addon_info.load_dir)):
+        return addon_info.module_name
+    elif addon_has_bl_info(addon_info.load_dir) and is_in_any_addon_directory(addon_info.load_dir):
+        # this addon is compatible with legacy addons and extensions
+        # but user is developing it in addon directory. Treat it as addon.
+        return addon_info.module_name
+    else:
+        return "bl_ext." + EXTENSIONS_REPOSITORY + "." + addon_info.module_name
+
+
+def _normalize_path(path: Union[str, os.PathLike]) -> str:
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def index_addon_directory(path: Union[str, os.PathLike], addon_name: str):
+    """Files below `path` belong to the addon, e.g. its load directory or the source directory of the editor."""
+    _ADDON_DIRECTORY_INDEX[_normalize_path(path)] = addon_name
+
+
+def find_addon_of_file(path: Union[str, os.PathLike]) -> Optional[str]:
+    """Return the name of the linked addon that contains `path`, the innermost one for nested addons."""
+    current = _normalize_path(path)
+    while True:
+        addon_name = _ADDON_DIRECTORY_INDEX.get(current)
+        if addon_name is not None:
+            return addon_name
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def find_affected_addons(files: Iterable[str], addon_modules: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Find addons that have to be reloaded after `files` changed.
+
+    `addon_modules` maps addon names to their module names in `sys.modules`.
+    Returns the names of addons that contain a changed file or import a changed module and
+    the names of loaded modules outside of addons (e.g. shared libraries) that are defined by a changed file.
+    Addons come before the addons that import them, so those import the reloaded versions.
+    """
+    changed_addons: Set[str] = set()
+    outside_files: Set[str] = set()
+    for path in files:
+        addon_name = find_addon_of_file(path)
+        if addon_name is None:
+            outside_files.add(_normalize_path(path))
+        else:
+            changed_addons.add(addon_name)
+
+    changed_modules: List[str] = []
+    if outside_files:
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None)
+            if module_file and _normalize_path(module_file) in outside_files:
+                changed_modules.append(name)
+
+    changed_prefixes = [addon_modules[name] for name in changed_addons if name in addon_modules] + changed_modules
+    affected = [
+        name
+        for name, module_name in addon_modules.items()
+        if name in changed_addons or _imports_any(module_name, changed_prefixes)
+    ]
+    return _order_by_imports(affected, addon_modules), changed_modules
+
+
+def _order_by_imports(names: List[str], addon_modules: Dict[str, str]) -> List[str]:
+    """Order addons so that imported addons come first, otherwise keep the order. Cycles keep the order as well."""
+    imports = {
+        name: {other for other in names if other != name and _imports_any(addon_modules[name], [addon_modules[other]])}
+        for name in names
+    }
+    ordered: List[str] = []
+    remaining = list(names)
+    while remaining:
+        ready = [name for name in remaining if imports[name].issubset(ordered)]
+        # an import cycle, the first remaining addon goes next
+        for name in ready or remaining[:1]:
+            ordered.append(name)
+            remaining.remove(name)
+    return ordered
+
+
+def _imports_any(module_name: str, module_prefixes: List[str]) -> bool:
+    """Check whether modules of an addon reference other modules, classes or functions from `module_prefixes`."""
+    if not module_prefixes:
+        return False
+    own_prefix = module_name + "."
+    for name, module in list(sys.modules.items()):
+        if module is None or not (name == module_name or name.startswith(own_prefix)):
+            continue
+        for value in list(vars(module).values()):
+            if isinstance(value, types.ModuleType):
+                referenced = value.__name__
+            elif isinstance(value, (type, types.FunctionType)):
+                referenced = value.__module__
+            else:
+                continue
+            if referenced is None or referenced == module_name or referenced.startswith(own_prefix):
+                continue
+            if any(referenced == prefix or referenced.startswith(prefix + ".") for prefix in module_prefixes):
+                return True
+    return False
 
 
 def create_link_in_user_addon_directory(directory: Union[str, os.PathLike], link_path: Union[str, os.PathLike]):
@@ -0,0 +1,146 @@
+"""Memory report for addon reloads, based on tracemalloc and the objects tracked by the garbage collector.
+
+The report is opt-in (`VSCODE_RELOAD_MEMORY_REPORT` or at runtime). Only while it is enabled, tracemalloc traces
+allocations and every reload takes a snapshot and counts objects before and after it, which slows down allocations
+and adds a few garbage collections to each reload. Disabling stops tracemalloc only if this module started it,
+tracing that was started by someone else is left running.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+from . import log
+from .environment import RELOAD_MEMORY_REPORT
+
+LOG = log.getLogger()
+
+TRACEBACK_FRAMES = 1
+TOP_ENTRIES = 20
+
+_enabled = False
+# tracing that was started by someone else is left running
+_started_tracing = False
+_session_snapshot: Optional[tracemalloc.Snapshot] = None
+_session_object_counts: Optional[Counter] = None
+_session_module_count = 0
+_reload_count = 0
+
+
+class ReloadState:
+    def __init__(self):
+        gc.collect()
+        self.time = time.perf_counter()
+        self.snapshot = take_snapshot()
+        # collecting again untracks the tuples of the snapshot, so that they are not counted below
+        gc.collect()
+        self.object_counts = count_objects_by_type()
+        self.module_count = len(sys.modules)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled, _session_snapshot, _session_object_counts, _session_module_count, _reload_count
+    global _started_tracing
+    if _enabled:
+        return
+    _started_tracing = not tracemalloc.is_tracing()
+    if _started_tracing:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    _enabled = True
+    _reload_count = 0
+    state = ReloadState()
+    _session_snapshot = state.snapshot
+    _session_object_counts = state.object_counts
+    _session_module_count = state.module_count
+    LOG.info("Memory report for addon reloads enabled.")
+
+
+def disable():
+    global _enabled, _session_snapshot, _session_object_counts, _started_tracing
+    if not _enabled:
+        return
+    _enabled = False
+    _session_snapshot = None
+    _session_object_counts = None
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    LOG.info("Memory report for addon reloads disabled.")
+
+
+def before_reload() -> Optional[ReloadState]:
+    if not _enabled:
+        return None
+    return ReloadState()
+
+
+def after_reload(state: Optional[ReloadState], module_name: str) -> Optional[Dict]:
+    """Compare memory to the state before the reload and to the start of the session."""
+    global _reload_count
+    if state is None or not _enabled:
+        return None
+    _reload_count += 1
+    after = ReloadState()
+    report = {
+        "module": module_name,
+        "reloadCount": _reload_count,
+        "reload": compare_states(state.snapshot, state.object_counts, state.module_count, after),
+        "session": compare_states(_session_snapshot, _session_object_counts, _session_module_count, after),
+    }
+    LOG.info(
+        f"Memory after reload of {module_name}: {report['reload']['sizeDiff'] / 1024:+.1f} KiB, "
+        f"session total {report['session']['sizeDiff'] / 1024:+.1f} KiB"
+    )
+    return report
+
+
+def compare_states(snapshot, object_counts: Counter, module_count: int, after: ReloadState) -> Dict:
+    statistics = after.snapshot.compare_to(snapshot, "lineno")
+    object_delta = Counter(after.object_counts)
+    object_delta.subtract(object_counts)
+    return {
+        "sizeDiff": sum(stat.size_diff for stat in statistics),
+        "countDiff": sum(stat.count_diff for stat in statistics),
+        "topGrowth": [stat_to_dict(stat) for stat in statistics[:TOP_ENTRIES] if stat.size_diff > 0],
+        "objectTypeDeltas": [
+            {"type": name, "delta": delta}
+            for name, delta in sorted(object_delta.items(), key=lambda item: -abs(item[1]))[:TOP_ENTRIES]
+            if delta != 0
+        ],
+        "moduleCountDiff": after.module_count - module_count,
+    }
+
+
+def stat_to_dict(stat: tracemalloc.StatisticDiff) -> Dict:
+    frame = stat.traceback[0]
+    return {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "sizeDiff": stat.size_diff,
+        "countDiff": stat.count_diff,
+        "size": stat.size,
+    }
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+    )
+
+
+def count_objects_by_type() -> Counter:
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+if RELOAD_MEMORY_REPORT:
+    enable()
@@ -0,0 +1,294 @@
+"""Counters and histograms of the control server, rendered in the Prometheus text format or as JSON.
+
+Recording is an increment under a lock. Gauges are computed only when the metrics are requested.
+"""
+
+import abc
+import bisect
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_METRICS: List["Metric"] = []
+
+
+class Metric(abc.ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        _METRICS.append(self)
+
+    @abc.abstractmethod
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        pass
+
+    @abc.abstractmethod
+    def to_dict(self) -> Dict:
+        pass
+
+    def _labels(self, values: Tuple) -> Dict[str, str]:
+        return dict(zip(self.label_names, values))
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help, label_names)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+    def to_dict(self):
+        return {
+            "type": self.type,
+            "values": [{"labels": labels, "value": value} for _, labels, value in self.samples()],
+        }
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (last is +Inf), sum]
+        self._values: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", {**labels, "le": format_value(bound)}, cumulative))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, cumulative))
+        return samples
+
+    def to_dict(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        return {
+            "type": self.type,
+            "buckets": list(self.buckets),
+            "values": [
+                {"labels": self._labels(key), "counts": counts, "sum": total, "count": sum(counts)}
+                for key, counts, total in items
+            ],
+        }
+
+
+class Gauge(Metric):
+    """Value computed by `function` when the metrics are requested. `None` results are skipped."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, function: Callable[[], Optional[float]]):
+        super().__init__(name, help)
+        self.function = function
+
+    def samples(self):
+        value = self.function()
+        return [] if value is None else [(self.name, {}, value)]
+
+    def to_dict(self):
+        return {"type": self.type, "values": [{"labels": {}, "value": value} for _, _, value in self.samples()]}
+
+
+def unregister(metric: Metric):
+    """Remove a metric from the output, e.g. one that was created for a test."""
+    if metric in _METRICS:
+        _METRICS.remove(metric)
+
+
+# Output
+#########################################
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in list(_METRICS):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def to_dict() -> Dict:
+    return {metric.name: metric.to_dict() for metric in list(_METRICS)}
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        key + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Process
+#########################################
+
+
+def get_rss_bytes() -> Optional[int]:
+    """Current resident set size of the Blender process."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return None
+    if sys.platform == "win32":
+        return _get_rss_bytes_windows()
+    return None
+
+
+def get_max_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _get_rss_bytes_windows() -> Optional[int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+
+# Control server metrics
+#########################################
+
+REQUESTS = Counter("blender_vscode_requests_total", "Requests received by the control server.", ["type"])
+REQUEST_DURATION = Histogram(
+    "blender_vscode_request_duration_seconds", "Time spent in the HTTP handler of a request.", ["type"]
+)
+JOB_WAIT = Histogram("blender_vscode_job_wait_seconds", "Time a job waited for the main thread.", ["type"])
+JOB_DURATION = Histogram(
+    "blender_vscode_job_duration_seconds", "Run time of a job in the main thread (e.g. reload, script).", ["type"]
+)
+JOB_FAILURES = Counter("blender_vscode_job_failures_total", "Jobs that raised an exception.", ["type"])
+SEND_FAILURES = Counter("blender_vscode_send_failures_total", "Messages that could not be delivered to the editor.")
+REJECTED_REQUESTS = Counter(
+    "blender_vscode_rejected_requests_total",
+    "Requests answered with 503 because all server workers or handler threads were busy.",
+)
+HANDLER_TIMEOUTS = Counter(
+    "blender_vscode_handler_timeouts_total", "Requests answered with 504 because the handler was too slow.", ["type"]
+)
+HANDLER_DURATION = Histogram(
+    "blender_vscode_app_handler_duration_seconds",
+    "Run time of timed bpy.app.handlers callbacks of the developed addons.",
+    ["handler", "callback"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+)
+ADDON_UPDATES = Counter(
+    "blender_vscode_addon_updates_total", "Addon updates by method (hotPatch or reload).", ["method"]
+)
+STALLS = Counter("blender_vscode_main_thread_stalls_total", "Main thread stalls longer than the threshold.")
+STALL_DURATION = Histogram(
+    "blender_vscode_main_thread_stall_seconds",
+    "Duration of main thread stalls.",
+    buckets=(1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+def _queue_stat(key: str) -> Callable[[], float]:
+    def get():
+        from .utils import execution_queue
+
+        return execution_queue.get_stats()[key]
+
+    return get
+
+
+Gauge("blender_vscode_queue_depth", "Entries waiting for the main thread.", _queue_stat("depth"))
+Gauge("blender_vscode_queue_max_depth", "Highest number of waiting entries.", _queue_stat("maxDepth"))
+Gauge("blender_vscode_queue_last_wait_seconds", "Wait time of the last executed entry.", _queue_stat("lastWaitTime"))
+Gauge("blender_vscode_queue_max_wait_seconds", "Longest wait time of an entry.", _queue_stat("maxWaitTime"))
+Gauge("blender_vscode_process_resident_memory_bytes", "Resident set size of the Blender process.", get_rss_bytes)
+Gauge("blender_vscode_process_max_resident_memory_bytes", "Peak resident set size.", get_max_rss_bytes)
+
+
+def _get_overdue_handlers() -> int:
+    from .control_server import get_overdue_handlers
+
+    return get_overdue_handlers()
+
+
+Gauge(
+    "blender_vscode_overdue_handlers",
+    "Request handlers that were answered with 504 and still occupy a handler thread.",
+    _get_overdue_handlers,
+)
@@ -1,11 +1,27 @@
+from . import addon_assign
 from . import addon_update
+from . import data_query
+from . import debugger
+from . import pytest_action
+from . import reset_blender
+from . import rna
+from . import sampling_profiler
 from . import script_runner
 from . import stop_blender
+from . import timing
 
 modules = (
+    addon_assign,
     addon_update,
+    data_query,
+    debugger,
+    pytest_action,
+    reset_blender,
+    rna,
+    sampling_profiler,
     script_runner,
     stop_blender,
+    timing,
 )
 
 
@@ -0,0 +1,17 @@
+from .. import assign_addons, parse_addons_to_load
+from ..communication import register_post_action, send_dict_as_json
+from ..environment import VSCODE_IDENTIFIER
+from ..utils import PRIORITY_RELOAD
+
+
+def assign_addons_action(data):
+    """Load addons into an instance started in standby mode. `addons` uses the `ADDONS_TO_LOAD` format."""
+    path_mappings = assign_addons(parse_addons_to_load(data["addons"]))
+    send_dict_as_json(
+        {"type": "addonsAssigned", "addonPathMappings": path_mappings, "vscodeIdentifier": VSCODE_IDENTIFIER}
+    )
+    return path_mappings
+
+
+def register():
+    register_post_action("assignAddons", assign_addons_action, priority=PRIORITY_RELOAD)
@@ -1,15 +1,17 @@
-import sys
 import traceback
 from pathlib import Path
 
 import bpy
 from bpy.props import *
 
+from .. import class_timing, handler_timing, hot_patch, leak_guard, log, memory_report, metrics
 from ..environment import EXTENSIONS_REPOSITORY
 from ..utils import addon_has_bl_info
-from ..load_addons import is_in_any_addon_directory
+from ..load_addons import find_affected_addons, index_addon_directory, is_in_any_addon_directory
 from ..communication import send_dict_as_json, register_post_action
-from ..utils import is_addon_legacy, redraw_all
+from ..utils import PRIORITY_RELOAD, is_addon_legacy, purge_modules, redraw_all
+
+LOG = log.getLogger()
 
 
 class UpdateAddonOperator(bpy.types.Operator):
@@ -19,6 +21,10 @@ class UpdateAddonOperator(bpy.types.Operator):
     module_name: StringProperty()
 
     def execute(self, context):
+        memory_state = memory_report.before_reload()
+        # the addon has to find its own callbacks when it removes them
+        handler_timing.unwrap_addon(self.module_name)
+        class_timing.unwrap_addon(self.module_name)
         try:
             bpy.ops.preferences.addon_disable(module=self.module_name)
         except Exception:
@@ -26,9 +32,14 @@ class UpdateAddonOperator(bpy.types.Operator):
             send_dict_as_json({"type": "disableFailure"})
             return {"CANCELLED"}
 
-        for name in list(sys.modules.keys()):
-            if name == self.module_name or name.startswith(self.module_name + "."):
-                del sys.modules[name]
+        if leak_guard.is_enabled():
+            module_refs = leak_guard.watch_modules(self.module_name)
+            purge_modules(self.module_name)
+            leak_report = leak_guard.check(self.module_name, module_refs)
+            if leak_report["staleModules"] or leak_report["staleCallbacks"]:
+                send_dict_as_json({"type": "leakReport", **leak_report})
+        else:
+            purge_modules(self.module_name)
 
         try:
             bpy.ops.preferences.addon_enable(module=self.module_name)
@@ -37,28 +48,106 @@ class UpdateAddonOperator(bpy.types.Operator):
             send_dict_as_json({"type": "enableFailure"})
             return {"CANCELLED"}
 
+        handler_timing.wrap_addon(self.module_name)
+        class_timing.wrap_addon(self.module_name)
+        hot_patch.remember_addon(self.module_name)
+        metrics.ADDON_UPDATES.inc("reload")
         send_dict_as_json({"type": "addonUpdated"})
 
+        report = memory_report.after_reload(memory_state, self.module_name)
+        if report is not None:
+            send_dict_as_json({"type": "memoryReport", **report})
+
         redraw_all()
         return {"FINISHED"}
 
 
 def reload_addon_action(data):
-    module_names = []
+    """Reload addons. With `files`, only addons that contain or import one of the changed files are reloaded."""
+    module_names = {}
     for name, dir in zip(data["names"], data["dirs"]):
         if is_addon_legacy(Path(dir)):
-            module_names.append(name)
+            module_names[name] = name
         elif addon_has_bl_info(Path(dir)) and is_in_any_addon_directory(Path(dir)):
             # this addon is compatible with legacy addons and extensions
             # but user is developing it in addon directory. Treat it as addon.
-            module_names.append(name)
+            module_names[name] = name
         else:
-            module_names.append("bl_ext." + EXTENSIONS_REPOSITORY + "." + name)
+            module_names[name] = "bl_ext." + EXTENSIONS_REPOSITORY + "." + name
+        # the editor sends saved files from the source directory, which may differ from the load directory
+        index_addon_directory(dir, name)
+
+    if data.get("files") is not None:
+        affected, changed_modules = find_affected_addons(data["files"], module_names)
+        LOG.debug(f"Changed files {data['files']} affect addons {affected} and modules {changed_modules}")
+        if affected and hot_patch.is_enabled() and patch_in_place(data["files"]):
+            return []
+        if affected:
+            # shared modules outside of the addons are imported again by the reloaded addons
+            for name in changed_modules:
+                purge_modules(name)
+        module_names = {name: module_names[name] for name in affected}
+
+    for module_name in module_names.values():
+        bpy.ops.dev.update_addon(module_name=module_name)
+    return list(module_names.keys())
+
+
+def patch_in_place(files) -> bool:
+    """Try to replace changed function bodies without reloading, see `hot_patch.py`. Reports the path taken."""
+    try:
+        functions = hot_patch.try_patch(files)
+    except hot_patch.PatchNotPossible as e:
+        LOG.info(f"Hot patch not possible, reloading: {e}")
+        send_dict_as_json({"type": "hotPatch", "applied": False, "reason": str(e)})
+        return False
+    metrics.ADDON_UPDATES.inc("hotPatch")
+    send_dict_as_json({"type": "hotPatch", "applied": True, "functions": functions})
+    redraw_all()
+    return True
+
+
+def memory_report_action(data):
+    """Toggle the tracemalloc based memory report that is sent after each reload."""
+    if data.get("enabled", True):
+        memory_report.enable()
+    else:
+        memory_report.disable()
+    return {"enabled": memory_report.is_enabled()}
+
+
+def leak_guard_action(data):
+    """Toggle the leak check on reload (`enabled`) and whether stale callbacks are removed (`removeStaleCallbacks`)."""
+    if "enabled" in data:
+        if data["enabled"]:
+            leak_guard.enable()
+        else:
+            leak_guard.disable()
+    if "removeStaleCallbacks" in data:
+        leak_guard.set_remove_stale_callbacks(bool(data["removeStaleCallbacks"]))
+    return {"enabled": leak_guard.is_enabled(), "removeStaleCallbacks": leak_guard.get_remove_stale_callbacks()}
+
+
+def get_reloaded_addons_key(data):
+    return frozenset(data["names"])
+
 
-    for name in module_names:
-        bpy.ops.dev.update_addon(module_name=name)
+def merge_reload_data(pending, data):
+    """Combine changed files of reloads that wait in the queue, a reload without files reloads everything."""
+    if pending.get("files") is None or data.get("files") is None:
+        return {**data, "files": None}
+    return {**data, "files": sorted(set(pending["files"]) | set(data["files"]))}
 
 
 def register():
     bpy.utils.register_class(UpdateAddonOperator)
-    register_post_action("reload", reload_addon_action)
+    # reloads requested while the same addons are waiting to be reloaded are redundant
+    register_post_action(
+        "reload",
+        reload_addon_action,
+        priority=PRIORITY_RELOAD,
+        coalesce=get_reloaded_addons_key,
+        merge=merge_reload_data,
+    )
+    register_post_action("memoryReport", memory_report_action)
+    register_post_action("leakGuard", leak_guard_action)
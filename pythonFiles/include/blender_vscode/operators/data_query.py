@@ -0,0 +1,235 @@
+import array
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+import flask
+
+from ..communication import register_post_query
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10000
+
+# attribute data type -> (foreach_get key, components per element, array typecode, numpy dtype)
+_ATTRIBUTE_LAYOUTS: Dict[str, Tuple[str, int, Optional[str], str]] = {
+    "FLOAT": ("value", 1, "f", "float32"),
+    "INT": ("value", 1, "i", "int32"),
+    "INT8": ("value", 1, "i", "int32"),
+    "BOOLEAN": ("value", 1, None, "bool"),
+    "FLOAT2": ("vector", 2, "f", "float32"),
+    "INT32_2D": ("value", 2, "i", "int32"),
+    "FLOAT_VECTOR": ("vector", 3, "f", "float32"),
+    "FLOAT_COLOR": ("color", 4, "f", "float32"),
+    "BYTE_COLOR": ("color", 4, "f", "float32"),
+    "QUATERNION": ("value", 4, "f", "float32"),
+    "FLOAT4X4": ("value", 16, "f", "float32"),
+}
+
+
+# query -> keys the request has to contain
+_REQUIRED_KEYS: Dict[str, Tuple[str, ...]] = {
+    "list": ("collection",),
+    "attributeSummary": ("mesh",),
+    "attributeData": ("mesh", "attribute"),
+}
+
+
+def validate_query(data):
+    """Runs in the server thread, invalid requests are answered with 400."""
+    query = data.get("query")
+    if query not in _REQUIRED_KEYS:
+        raise ValueError(f"Unknown query: {query}")
+    for key in _REQUIRED_KEYS[query]:
+        if not isinstance(data.get(key), str):
+            raise ValueError(f"'{key}' has to be a string")
+    if query == "list":
+        check_page(*get_page(data))
+    attribute_names = data.get("attributes")
+    if attribute_names is not None and not (
+        isinstance(attribute_names, list) and all(isinstance(name, str) for name in attribute_names)
+    ):
+        raise ValueError("'attributes' has to be a list of strings")
+
+
+def query_action(data):
+    query = data.get("query")
+    if query == "list":
+        return list_collection(data["collection"], *get_page(data))
+    if query == "attributeSummary":
+        return summarize_attributes(data["mesh"], data.get("attributes"))
+    if query == "attributeData":
+        return export_attribute(data["mesh"], data["attribute"])
+    raise ValueError(f"Unknown query: {query}")
+
+
+def get_page(data) -> Tuple[int, int]:
+    return to_int(data, "offset", 0), to_int(data, "limit", DEFAULT_PAGE_SIZE)
+
+
+def to_int(data, key: str, default: int) -> int:
+    value = data.get(key, default)
+    # int(True) would silently be 1
+    if isinstance(value, bool):
+        raise ValueError(f"'{key}' has to be an integer: {value!r}")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' has to be an integer: {value!r}") from None
+
+
+def not_found(message: str) -> flask.Response:
+    # built by hand, flask.jsonify needs an app context which the main thread does not have
+    return flask.Response(json.dumps({"error": message}), status=404, mimetype="application/json")
+
+
+# Listings
+###############################
+
+
+def check_page(offset: int, limit: int):
+    # negative offsets would index from the end
+    if offset < 0:
+        raise ValueError(f"offset must not be negative: {offset}")
+    if limit <= 0:
+        raise ValueError(f"limit must be positive: {limit}")
+
+
+def list_collection(collection_name: str, offset: int, limit: int) -> Dict:
+    check_page(offset, limit)
+    collection = get_data_collection(collection_name)
+    limit = min(limit, MAX_PAGE_SIZE)
+    total = len(collection)
+    items = [describe_id(collection[index]) for index in range(offset, min(offset + limit, total))]
+    return {
+        "collection": collection_name,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "items": items,
+    }
+
+
+def get_data_collection(collection_name: str):
+    collection = getattr(bpy.data, collection_name, None)
+    if collection is None or not isinstance(collection, bpy.types.bpy_prop_collection):
+        raise ValueError(f"Not a collection in bpy.data: {collection_name}")
+    return collection
+
+
+def describe_id(id_data) -> Dict:
+    info = {"name": id_data.name, "users": id_data.users}
+    if isinstance(id_data, bpy.types.Object):
+        info["type"] = id_data.type
+        info["data"] = id_data.data.name if id_data.data is not None else None
+    elif isinstance(id_data, bpy.types.Mesh):
+        info["vertices"] = len(id_data.vertices)
+        info["edges"] = len(id_data.edges)
+        info["polygons"] = len(id_data.polygons)
+        info["attributes"] = [attribute.name for attribute in id_data.attributes]
+    return info
+
+
+# Attributes
+###############################
+
+
+def summarize_attributes(mesh_name: str, attribute_names: Optional[List[str]] = None):
+    mesh = bpy.data.meshes.get(mesh_name)
+    if mesh is None:
+        return not_found(f"Unknown mesh: {mesh_name}")
+    summaries = []
+    for attribute in mesh.attributes:
+        if attribute_names is not None and attribute.name not in attribute_names:
+            continue
+        if attribute.data_type not in _ATTRIBUTE_LAYOUTS:
+            summaries.append({"name": attribute.name, "dataType": attribute.data_type, "domain": attribute.domain})
+            continue
+        values, length, components = read_attribute(attribute)
+        summary = {
+            "name": attribute.name,
+            "dataType": attribute.data_type,
+            "domain": attribute.domain,
+            "length": length,
+            "components": components,
+        }
+        summary.update(compute_statistics(values, length, components))
+        summaries.append(summary)
+    return {"mesh": mesh.name, "attributes": summaries}
+
+
+def export_attribute(mesh_name: str, attribute_name: str) -> flask.Response:
+    """Return raw attribute values, the layout is described in the `X-Blender-Data-Layout` header."""
+    mesh = bpy.data.meshes.get(mesh_name)
+    if mesh is None:
+        return not_found(f"Unknown mesh: {mesh_name}")
+    attribute = mesh.attributes.get(attribute_name)
+    if attribute is None:
+        return not_found(f"Unknown attribute of mesh {mesh_name}: {attribute_name}")
+    values, length, components = read_attribute(attribute)
+    if numpy is not None:
+        body = values.tobytes()
+        dtype = str(values.dtype)
+    elif isinstance(values, array.array):
+        body = values.tobytes()
+        dtype = "float32" if values.typecode == "f" else "int32"
+    else:
+        body = bytes(values)
+        dtype = "bool"
+    layout = {
+        "mesh": mesh_name,
+        "attribute": attribute_name,
+        "dataType": attribute.data_type,
+        "domain": attribute.domain,
+        "dtype": dtype,
+        "shape": [length, components],
+        "byteOrder": sys.byteorder,
+    }
+    response = flask.Response(body, mimetype="application/octet-stream")
+    response.headers["X-Blender-Data-Layout"] = json.dumps(layout)
+    return response
+
+
+def read_attribute(attribute):
+    """Read attribute values into a contiguous flat buffer with a single `foreach_get` call."""
+    key, components, typecode, dtype = _ATTRIBUTE_LAYOUTS[attribute.data_type]
+    length = len(attribute.data)
+    size = length * components
+    if numpy is not None:
+        values = numpy.empty(size, dtype=dtype)
+    elif typecode is not None:
+        values = array.array(typecode, bytes(size * array.array(typecode).itemsize))
+    else:
+        values = [False] * size
+    attribute.data.foreach_get(key, values)
+    return values, length, components
+
+
+def compute_statistics(values, length: int, components: int) -> Dict:
+    if length == 0:
+        return {"min": None, "max": None, "mean": None}
+    if numpy is not None:
+        matrix = values.reshape(length, components)
+        if matrix.dtype == numpy.bool_:
+            matrix = matrix.astype(numpy.int32)
+        return {
+            "min": matrix.min(axis=0).tolist(),
+            "max": matrix.max(axis=0).tolist(),
+            "mean": matrix.mean(axis=0, dtype=numpy.float64).tolist(),
+        }
+    # strided slices of the flat buffer keep the reductions in C
+    columns = [values[component::components] for component in range(components)]
+    return {
+        "min": [min(column) for column in columns],
+        "max": [max(column) for column in columns],
+        "mean": [sum(column) / length for column in columns],
+    }
+
+
+def register():
+    register_post_query("query", query_action, validate=validate_query)
@@ -0,0 +1,33 @@
+from .. import debug_control
+from ..communication import register_post_query, send_dict_as_json
+from ..environment import VSCODE_IDENTIFIER
+from ..utils import redraw_all
+
+
+def debugger_action(data):
+    """`action`: `suspend`, `resume`, `listen` or `state` (default). Returns the new state.
+
+    The state is also sent as `debuggerState`, after `listen` the editor attaches the debugger.
+    """
+    action = data.get("action", "state")
+    if action in ("suspend", "resume") and debug_control.get_state() == debug_control.DISABLED:
+        raise ValueError("debugpy is not running, use the listen action first")
+    if action == "suspend":
+        debug_control.suspend()
+    elif action == "resume":
+        debug_control.resume()
+    elif action == "listen":
+        debug_control.listen()
+    elif action != "state":
+        raise ValueError(f"Unknown action: {action}")
+
+    state = debug_control.to_dict()
+    send_dict_as_json(
+        {"type": "debuggerState", "vscodeIdentifier": VSCODE_IDENTIFIER, "attach": action == "listen", **state}
+    )
+    redraw_all()
+    return state
+
+
+def register():
+    register_post_query("debugger", debugger_action)
@@ -0,0 +1,17 @@
+from .. import pytest_runner
+from ..communication import register_post_action
+from ..utils import PRIORITY_SCRIPT
+
+
+def run_tests_action(data):
+    """`args` are passed to pytest, `nodeIds` limits the run to these tests and `collectOnly` only lists them."""
+    return pytest_runner.run_tests(
+        data.get("args", []),
+        node_ids=data.get("nodeIds"),
+        collect_only=data.get("collectOnly", False),
+        run_id=data.get("runId"),
+    )
+
+
+def register():
+    register_post_action("runTests", run_tests_action, priority=PRIORITY_SCRIPT)
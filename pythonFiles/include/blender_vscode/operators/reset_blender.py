@@ -0,0 +1,66 @@
+import time
+import traceback
+
+import bpy
+
+from .. import class_timing, handler_timing, log, stepped_scripts
+from ..communication import register_post_action, send_dict_as_json
+from ..load_addons import LOADED_ADDONS, get_addon_module_name, load, setup_addon_links
+from ..utils import PRIORITY_RELOAD, purge_modules, redraw_all
+
+LOG = log.getLogger()
+
+
+def reset_action(data):
+    """Reload the startup file in place and load the developed addons again.
+
+    The control server, timers and an attached debugger keep running, so this is much faster than a restart.
+    Running stepped scripts are cancelled first, the data they work on is replaced.
+    `factory` (default true) loads the factory startup file instead of the user's startup file.
+    """
+    use_factory_startup = data.get("factory", True)
+    addons = list(LOADED_ADDONS)
+    timings = {}
+
+    start = time.perf_counter()
+    cancelled_scripts = stepped_scripts.stop_all()
+    if cancelled_scripts:
+        LOG.info(f"Cancelled {len(cancelled_scripts)} running scripts before the reset")
+    timings["stopScripts"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for addon_info in addons:
+        module_name = get_addon_module_name(addon_info)
+        handler_timing.unwrap_addon(module_name)
+        class_timing.unwrap_addon(module_name)
+        try:
+            bpy.ops.preferences.addon_disable(module=module_name)
+        except Exception:
+            traceback.print_exc()
+        purge_modules(module_name)
+    timings["disableAddons"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bpy.ops.wm.read_homefile(use_factory_startup=use_factory_startup)
+    timings["readHomefile"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    path_mappings = setup_addon_links(addons)
+    timings["linkAddons"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load(addons)
+    timings["loadAddons"] = time.perf_counter() - start
+    for addon_info in addons:
+        handler_timing.wrap_addon(get_addon_module_name(addon_info))
+        class_timing.wrap_addon(get_addon_module_name(addon_info))
+
+    redraw_all()
+    timings["total"] = sum(timings.values())
+    LOG.info(f"Reset finished in {timings['total']:.3f}s")
+    send_dict_as_json({"type": "resetFinished", "timings": timings, "addonPathMappings": path_mappings})
+    return timings
+
+
+def register():
+    register_post_action("reset", reset_action, priority=PRIORITY_RELOAD, coalesce=lambda data: "reset")
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from .. import rna_export
+from ..communication import register_post_action
+from ..environment import RNA_EXPORT_DIR
+
+
+def export_rna_action(data):
+    """Export RNA to `outputDir` (default: `VSCODE_RNA_EXPORT_DIR`), `force` exports even when it is up to date."""
+    output_dir = data.get("outputDir") or RNA_EXPORT_DIR
+    if not output_dir:
+        raise ValueError("No output directory, pass outputDir or set blender.addon.rnaExportDirectory")
+    output_dir = Path(output_dir).expanduser()
+    if data.get("force", False):
+        rna_export.export(output_dir)
+        exported = True
+    else:
+        exported = rna_export.export_if_outdated(output_dir)
+    return {"exported": exported, "directory": str(output_dir / rna_export.get_version_name())}
+
+
+def register():
+    register_post_action("exportRna", export_rna_action)
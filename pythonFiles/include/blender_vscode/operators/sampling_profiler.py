@@ -0,0 +1,47 @@
+import flask
+
+from .. import log, profiler
+from ..communication import register_post_handler
+
+LOG = log.getLogger()
+
+# Both handlers run in the server thread, they must work while the main thread is busy.
+
+
+def profiler_start_handler(data):
+    try:
+        rate = float(data.get("rate", profiler.DEFAULT_RATE))
+    except (TypeError, ValueError):
+        return flask.jsonify({"error": f"rate has to be a number: {data.get('rate')!r}"}), 400
+    # NaN fails this comparison as well
+    if not rate > 0:
+        return flask.jsonify({"error": f"rate has to be positive: {rate}"}), 400
+    started = profiler.start(rate)
+    if not started:
+        return flask.jsonify({"error": "Profiler is already running."}), 409
+    return flask.jsonify({"running": True})
+
+
+def profiler_stop_handler(data):
+    try:
+        top = int(data.get("top", profiler.DEFAULT_TOP))
+    except (TypeError, ValueError):
+        return flask.jsonify({"error": f"top has to be an integer: {data.get('top')!r}"}), 400
+    result = profiler.stop(top, bool(data.get("includeIdle", False)))
+    if result is None:
+        return flask.jsonify({"error": "Profiler is not running."}), 409
+    if data.get("path"):
+        # can be opened with flamegraph.pl or speedscope
+        try:
+            with open(data["path"], "w") as f:
+                f.write(result["folded"])
+        except (OSError, TypeError) as e:
+            # the profile is only in memory, still return it
+            LOG.warning(f"Could not write profile to {data['path']}: {e}")
+            result["error"] = f"Could not write profile to {data['path']}: {e}"
+    return flask.jsonify(result)
+
+
+def register():
+    register_post_handler("profilerStart", profiler_start_handler)
+    register_post_handler("profilerStop", profiler_stop_handler)
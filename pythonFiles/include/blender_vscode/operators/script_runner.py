@@ -1,11 +1,14 @@
 import re
 import bpy
 import runpy
+import flask
+import traceback
+from typing import Optional
 from pprint import pformat
 from bpy.props import *
-from ..utils import redraw_all
-from ..communication import register_post_action
-from .. import log
+from ..utils import PRIORITY_SCRIPT, redraw_all
+from ..communication import register_post_action, register_post_handler, send_job_finished
+from .. import jobs, log, script_cache, stepped_scripts
 
 LOG = log.getLogger()
 
@@ -15,31 +18,98 @@ class RunScriptOperator(bpy.types.Operator):
     bl_label = "Run Script"
 
     filepath: StringProperty()
+    # compiled script uploaded by the editor, see `script_cache.py`
+    script_hash: StringProperty()
+    budget: FloatProperty(default=stepped_scripts.DEFAULT_BUDGET)
 
     def execute(self, context):
-        ctx = prepare_script_context(self.filepath)
+        script = None
+        if self.script_hash:
+            script = script_cache.get(self.script_hash)
+            if script is None:
+                self.report({"ERROR"}, f"Unknown script {self.script_hash}")
+                return {"CANCELLED"}
+        ctx = prepare_script_context(self.filepath, None if script is None else script.source)
         LOG.info(f'Run script: "{self.filepath}"')
         LOG.debug(f"Run script context override: {pformat(ctx)}")
-        runpy.run_path(self.filepath, init_globals={"CTX": ctx})
+        if script is None:
+            script_globals = runpy.run_path(self.filepath, init_globals={"CTX": ctx})
+        else:
+            script_globals = script.run({"CTX": ctx})
+        entry_point = stepped_scripts.get_entry_point(script_globals)
+        if entry_point is not None:
+            stepped_scripts.start(self.filepath, entry_point, self.budget, ctx)
         redraw_all()
         return {"FINISHED"}
 
 
 def run_script_action(data):
-    path = data["path"]
-    context = prepare_script_context(path)
-
-    if bpy.app.version < (4, 0, 0):
-        bpy.ops.dev.run_script(context, filepath=path)
-        return
-
-    with bpy.context.temp_override(**context):
-        bpy.ops.dev.run_script(filepath=path)
-
-
-def prepare_script_context(filepath):
-    with open(filepath) as fs:
-        text = fs.read()
+    """Run the script at `path`. A `steps` generator of the script is advanced `budget` seconds per timer tick."""
+    return run_script(data["path"], float(data.get("budget", stepped_scripts.DEFAULT_BUDGET)))
+
+
+def run_script_content_action(data):
+    script = script_cache.get(data["hash"])
+    if script is None:
+        raise KeyError(f"Script {data['hash']} is not cached anymore")
+    return run_script(script.path, float(data.get("budget", stepped_scripts.DEFAULT_BUDGET)), script)
+
+
+def run_script(path: str, budget: float, script: Optional[script_cache.CachedScript] = None):
+    """Returns a deferred result for scripts that run in steps, their job finishes with the last step."""
+    context = prepare_script_context(path, None if script is None else script.source)
+    script_hash = "" if script is None else script.hash
+
+    with stepped_scripts.collect_started() as started:
+        if bpy.app.version < (4, 0, 0):
+            bpy.ops.dev.run_script(context, filepath=path, script_hash=script_hash, budget=budget)
+        else:
+            with bpy.context.temp_override(**context):
+                bpy.ops.dev.run_script(filepath=path, script_hash=script_hash, budget=budget)
+    return stepped_scripts.wait_for(started)
+
+
+def script_content_handler(data):
+    """Run an unsaved script. Runs in the server thread, only the execution is queued.
+
+    The request contains the `hash` of the script and its `source` when Blender may not know it yet.
+    An unknown hash without source is answered with 404, the editor sends the source then.
+    Scripts that can not be compiled are answered with 400 and the error.
+    """
+    path = data.get("path") or "<script>"
+    try:
+        if "source" in data:
+            script = script_cache.put(data["source"], path, data.get("hash"))
+        else:
+            script = script_cache.get(data["hash"])
+            if script is None:
+                return flask.jsonify({"error": "Unknown script hash", "unknownHash": data["hash"]}), 404
+            if script.path != path:
+                # same buffer saved under another name, tracebacks must show the new path
+                script = script_cache.put(script.source, path, script.hash)
+    except (SyntaxError, ValueError):
+        error = traceback.format_exc(limit=0)
+        LOG.warning(f"Script {path} can not be run:\n{error}")
+        return flask.jsonify({"error": error}), 400
+    job_data = {key: value for key, value in data.items() if key != "source"}
+    job_data["hash"] = script.hash
+    job = jobs.submit(
+        "scriptContent", job_data, run_script_content_action, on_finish=send_job_finished, priority=PRIORITY_SCRIPT
+    )
+    return flask.jsonify({"jobId": job.id, "hash": script.hash})
+
+
+def cancel_script_handler(data):
+    """Runs in the server thread, the scripts stop before their next step in the main thread."""
+    return flask.jsonify(
+        {"cancelled": stepped_scripts.cancel(data.get("id")), "running": stepped_scripts.get_running()}
+    )
+
+
+def prepare_script_context(filepath, text: Optional[str] = None):
+    if text is None:
+        with open(filepath) as fs:
+            text = fs.read()
 
     area_type = "VIEW_3D"
     region_type = "WINDOW"
@@ -77,4 +147,6 @@ def get_region_in_area(area, region_type):
 
 def register():
     bpy.utils.register_class(RunScriptOperator)
-    register_post_action("script", run_script_action)
+    register_post_action("script", run_script_action, priority=PRIORITY_SCRIPT)
+    register_post_handler("scriptContent", script_content_handler)
+    register_post_handler("cancelScript", cancel_script_handler)
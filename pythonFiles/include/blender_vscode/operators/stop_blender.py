@@ -1,10 +1,15 @@
 import bpy
 from ..communication import register_post_action
+from ..utils import PRIORITY_STOP, background_stop
 
 
 def stop_action(data):
+    if bpy.app.background:
+        # quit_blender needs the event loop, the loop of `serve_in_background` ends instead
+        background_stop.set()
+        return
     bpy.ops.wm.quit_blender()
 
 
 def register():
-    register_post_action("stop", stop_action)
+    register_post_action("stop", stop_action, priority=PRIORITY_STOP)
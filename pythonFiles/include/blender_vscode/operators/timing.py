@@ -0,0 +1,38 @@
+from .. import class_timing, handler_timing
+from ..communication import register_post_query
+from ..load_addons import get_loaded_addon_module_names
+from ..utils import redraw_all
+
+
+def handler_timing_action(data):
+    """`action`: `enable`, `disable`, `reset` or `report` (default). All of them return the report."""
+    action = data.get("action", "report")
+    if action == "enable":
+        handler_timing.enable(data.get("addons") or get_loaded_addon_module_names())
+    elif action == "disable":
+        handler_timing.disable()
+    elif action == "reset":
+        handler_timing.reset()
+    elif action != "report":
+        raise ValueError(f"Unknown action: {action}")
+    return handler_timing.get_report(data.get("top", handler_timing.DEFAULT_TOP))
+
+
+def class_timing_action(data):
+    """Same actions as `handlerTiming`, for the classes registered by `auto_load` of the addons."""
+    action = data.get("action", "report")
+    if action == "enable":
+        class_timing.enable(data.get("addons") or get_loaded_addon_module_names())
+    elif action == "disable":
+        class_timing.disable()
+    elif action == "reset":
+        class_timing.reset()
+    elif action != "report":
+        raise ValueError(f"Unknown action: {action}")
+    redraw_all()
+    return class_timing.get_report(data.get("top", class_timing.DEFAULT_TOP))
+
+
+def register():
+    register_post_query("handlerTiming", handler_timing_action)
+    register_post_query("classTiming", class_timing_action)
@@ -0,0 +1,149 @@
+"""Sampling profiler for Blender's main thread.
+
+A background thread reads the main thread's current frame via `sys._current_frames()` at a fixed rate
+and counts the collapsed stacks. The main thread itself is not instrumented.
+The result is returned in the folded format of flamegraph.pl / speedscope (`frame;frame;frame count`).
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from . import log
+
+LOG = log.getLogger()
+
+DEFAULT_RATE = 200
+MAX_RATE = 2000
+DEFAULT_TOP = 20
+MAX_DEPTH = 256
+IDLE_FRAME = "<idle>"
+
+_profiler: Optional["SamplingProfiler"] = None
+_lock = threading.Lock()
+
+
+class SamplingProfiler(threading.Thread):
+    def __init__(self, rate: float):
+        super().__init__(name="blender_vscode sampling profiler", daemon=True)
+        self.interval = 1.0 / rate
+        self.rate = rate
+        self.main_thread_id = threading.main_thread().ident
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.idle_count = 0
+        self.started_at = time.perf_counter()
+        self.stopped_at: Optional[float] = None
+        self._labels: Dict[object, str] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            self.sample()
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                # fell behind, do not try to catch up with a burst of samples
+                next_sample = time.perf_counter()
+        self.stopped_at = time.perf_counter()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def sample(self):
+        frame = sys._current_frames().get(self.main_thread_id)
+        self.sample_count += 1
+        if frame is None:
+            # the main thread is in Blender's C code (e.g. the event loop) and runs no Python
+            self.idle_count += 1
+            return
+        labels = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(self.get_label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        self.stacks[";".join(labels)] += 1
+
+    def get_label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # one label per function, not per line, keeps the number of distinct stacks small
+            label = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    def get_result(self, top: int = DEFAULT_TOP, include_idle: bool = False) -> Dict:
+        stacks = Counter(self.stacks)
+        if include_idle and self.idle_count:
+            stacks[IDLE_FRAME] += self.idle_count
+        end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        return {
+            "rate": self.rate,
+            "duration": end - self.started_at,
+            "samples": self.sample_count,
+            "idleSamples": self.idle_count,
+            "folded": to_folded(stacks),
+            "top": get_top_functions(stacks, sum(stacks.values()), top),
+        }
+
+
+def to_folded(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def get_top_functions(stacks: Counter, total: int, top: int) -> List[Dict]:
+    """Functions with the most samples, `self` counts samples where the function was the innermost frame."""
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        # recursive functions are counted once per sample
+        for frame in set(frames):
+            total_counts[frame] += count
+    return [
+        {
+            "function": function,
+            "self": self_counts[function],
+            "total": total_counts[function],
+            "selfPercent": 100.0 * self_counts[function] / total if total else 0.0,
+            "totalPercent": 100.0 * total_counts[function] / total if total else 0.0,
+        }
+        for function, _ in self_counts.most_common(top)
+    ]
+
+
+def start(rate: float = DEFAULT_RATE) -> bool:
+    """Start sampling. Returns False if the profiler is already running."""
+    global _profiler
+    rate = max(1.0, min(float(rate), MAX_RATE))
+    with _lock:
+        if _profiler is not None:
+            return False
+        _profiler = SamplingProfiler(rate)
+        _profiler.start()
+    LOG.info(f"Sampling profiler started at {rate} Hz")
+    return True
+
+
+def stop(top: int = DEFAULT_TOP, include_idle: bool = False) -> Optional[Dict]:
+    """Stop sampling and return the result, None if the profiler is not running."""
+    global _profiler
+    with _lock:
+        profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    profiler.stop()
+    result = profiler.get_result(top, include_idle)
+    LOG.info(f"Sampling profiler stopped after {result['samples']} samples")
+    return result
+
+
+def is_running() -> bool:
+    return _profiler is not None
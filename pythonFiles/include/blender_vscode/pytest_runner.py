@@ -0,0 +1,121 @@
+"""Running pytest inside Blender, so that the tests of an addon can use the real `bpy`.
+
+Every finished test is sent as `testResult` while the run continues. The whole run is the result
+of the `runTests` job. `nodeIds` limits a run to some of the collected tests, this is how
+`shard_tests.py` distributes a suite over several Blender processes.
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from . import log
+from .communication import send_dict_as_json
+
+LOG = log.getLogger()
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+ERROR = "error"
+
+
+class ResultReporter:
+    """pytest plugin that reports results per test instead of per phase."""
+
+    def __init__(self, run_id: Optional[str], node_ids: Optional[Iterable[str]] = None):
+        self.run_id = run_id
+        self.node_ids = None if node_ids is None else set(node_ids)
+        self.rootdir: Optional[Path] = None
+        self.collected: List[str] = []
+        self.results: Dict[str, Dict] = {}
+        self._pending: Dict[str, Dict] = {}
+
+    def pytest_configure(self, config):
+        self.rootdir = Path(str(config.rootdir))
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        if self.node_ids is not None:
+            selected = [item for item in items if item.nodeid in self.node_ids]
+            deselected = [item for item in items if item.nodeid not in self.node_ids]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+        self.collected = [item.nodeid for item in items]
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.report({"nodeid": report.nodeid, "outcome": ERROR, "duration": 0.0, "longrepr": str(report.longrepr)})
+
+    def pytest_runtest_logreport(self, report):
+        result = self._pending.get(report.nodeid)
+        if result is None:
+            result = self._pending[report.nodeid] = {
+                "nodeid": report.nodeid,
+                "outcome": PASSED,
+                "duration": 0.0,
+                "longrepr": None,
+            }
+        result["duration"] += report.duration
+        if report.failed and result["outcome"] not in (FAILED, ERROR):
+            # failures in setup or teardown are errors of the fixtures, not of the test
+            result["outcome"] = FAILED if report.when == "call" else ERROR
+            result["longrepr"] = str(report.longrepr)
+        elif report.skipped and result["outcome"] == PASSED:
+            result["outcome"] = SKIPPED
+        if report.when == "teardown":
+            self.report(self._pending.pop(report.nodeid))
+
+    def report(self, result: Dict):
+        self.results[result["nodeid"]] = result
+        try:
+            send_dict_as_json({"type": "testResult", "runId": self.run_id, **result})
+        except Exception as e:
+            LOG.warning(f"Could not send result of {result['nodeid']}: {e}")
+
+
+def run_tests(
+    args: List[str], node_ids: Optional[List[str]] = None, collect_only: bool = False, run_id: Optional[str] = None
+) -> Dict:
+    from . import installation
+
+    installation.ensure_packages_are_installed(["pytest"])
+    import pytest
+
+    reporter = ResultReporter(run_id, node_ids)
+    modules_before = set(sys.modules)
+    args = list(args) + (["--collect-only", "-q"] if collect_only else [])
+    LOG.info(f"Run pytest {' '.join(args)}" + ("" if node_ids is None else f" ({len(node_ids)} selected tests)"))
+    try:
+        exit_code = pytest.main(args, plugins=[reporter])
+    finally:
+        purge_test_modules(modules_before, reporter.rootdir)
+
+    counts = Counter(result["outcome"] for result in reporter.results.values())
+    return {
+        "runId": run_id,
+        "exitCode": int(exit_code),
+        "collected": reporter.collected if collect_only else len(reporter.collected),
+        "counts": dict(counts),
+        "durations": {nodeid: result["duration"] for nodeid, result in reporter.results.items()},
+    }
+
+
+def purge_test_modules(modules_before: Iterable[str], rootdir: Optional[Path]):
+    """Forget the modules imported from the test directory, the next run imports the changed files."""
+    if rootdir is None:
+        return
+    modules_before = set(modules_before)
+    for name in [name for name in sys.modules if name not in modules_before]:
+        file = getattr(sys.modules[name], "__file__", None)
+        if file is not None and is_relative_to(Path(file), rootdir):
+            del sys.modules[name]
+
+
+def is_relative_to(path: Path, directory: Path) -> bool:
+    try:
+        path.resolve().relative_to(directory.resolve())
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,213 @@
+"""Export of Blender's RNA (types, properties, enum items and operators) for use in the editor.
+
+Every Blender version gets its own directory:
+
+    <output_dir>/<version>/meta.json    version, build hash and format of the export
+    <output_dir>/<version>/entries.jsonl one compact JSON object per line (type or operator)
+    <output_dir>/<version>/index.json   {"types": {name: [offset, length]}, "operators": {idname: [offset, length]}}
+
+Readers load the small index and read only the byte range of the entry they need.
+The export is opt-in: on startup into `VSCODE_RNA_EXPORT_DIR` (setting `blender.addon.rnaExportDirectory`)
+or on demand with the `exportRna` action.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import bpy
+
+from . import log
+
+LOG = log.getLogger()
+
+FORMAT_VERSION = 1
+
+
+def get_version_name() -> str:
+    return ".".join(str(number) for number in bpy.app.version)
+
+
+def get_build_hash() -> str:
+    build_hash = getattr(bpy.app, "build_hash", b"")
+    if isinstance(build_hash, bytes):
+        build_hash = build_hash.decode(errors="replace")
+    return build_hash
+
+
+def get_meta() -> Dict:
+    return {
+        "formatVersion": FORMAT_VERSION,
+        "version": get_version_name(),
+        "buildHash": get_build_hash(),
+    }
+
+
+def is_export_outdated(output_dir: Path) -> bool:
+    meta_path = output_dir / get_version_name() / "meta.json"
+    try:
+        with open(meta_path) as f:
+            existing = json.load(f)
+    except (OSError, ValueError):
+        return True
+    expected = get_meta()
+    return any(existing.get(key) != value for key, value in expected.items())
+
+
+def export_if_outdated(output_dir: Path) -> bool:
+    """Export RNA for the running Blender unless an export for this version and build already exists."""
+    if not is_export_outdated(output_dir):
+        LOG.debug(f"RNA export for Blender {get_version_name()} is up to date")
+        return False
+    export(output_dir)
+    return True
+
+
+def export(output_dir: Path):
+    start = time.perf_counter()
+    version_dir = output_dir / get_version_name()
+    # write to a temporary directory first, readers never see a partial export
+    tmp_dir = output_dir / (get_version_name() + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    index: Dict[str, Dict[str, Tuple[int, int]]] = {"types": {}, "operators": {}}
+    with open(tmp_dir / "entries.jsonl", "wb") as f:
+        for kind, name, entry in iter_entries():
+            line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+            index[kind][name] = (f.tell(), len(line))
+            f.write(line)
+
+    with open(tmp_dir / "index.json", "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    meta = get_meta()
+    meta["typeCount"] = len(index["types"])
+    meta["operatorCount"] = len(index["operators"])
+    with open(tmp_dir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(tmp_dir, version_dir)
+    LOG.info(f"Exported RNA of Blender {meta['version']} to {version_dir} in {time.perf_counter() - start:.2f}s")
+
+
+# version directory -> (meta of the export the index belongs to, parsed index)
+_index_cache: Dict[Path, Tuple[Dict, Dict]] = {}
+
+
+def load_index(version_dir: Path) -> Dict:
+    """Parsed index of an export, reparsed only when meta.json changes (e.g. a new build was exported)."""
+    with open(version_dir / "meta.json") as f:
+        meta = json.load(f)
+    cached = _index_cache.get(version_dir)
+    if cached is not None and cached[0] == meta:
+        return cached[1]
+    with open(version_dir / "index.json") as f:
+        index = json.load(f)
+    _index_cache[version_dir] = (meta, index)
+    return index
+
+
+def read_entry(version_dir: Path, kind: str, name: str) -> Optional[Dict]:
+    """Read a single exported type or operator without parsing the whole export."""
+    location = load_index(version_dir)[kind].get(name)
+    if location is None:
+        return None
+    offset, length = location
+    with open(version_dir / "entries.jsonl", "rb") as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+# Walk RNA
+#########################################
+
+
+def iter_entries() -> Iterator[Tuple[str, str, Dict]]:
+    for name in sorted(dir(bpy.types)):
+        rna = getattr(getattr(bpy.types, name, None), "bl_rna", None)
+        if rna is None:
+            continue
+        try:
+            yield "types", name, type_to_dict(name, rna)
+        except Exception as e:
+            LOG.warning(f"Skipping RNA type {name}: {e}")
+
+    for module_name in sorted(dir(bpy.ops)):
+        if module_name.startswith("_"):
+            continue
+        module = getattr(bpy.ops, module_name)
+        for operator_name in sorted(dir(module)):
+            if operator_name.startswith("_"):
+                continue
+            idname = f"{module_name}.{operator_name}"
+            try:
+                rna = getattr(module, operator_name).get_rna_type()
+                yield "operators", idname, operator_to_dict(idname, rna)
+            except Exception as e:
+                LOG.warning(f"Skipping operator {idname}: {e}")
+
+
+def type_to_dict(name: str, rna) -> Dict:
+    return {
+        "name": name,
+        "label": rna.name,
+        "description": rna.description,
+        "base": rna.base.identifier if rna.base else None,
+        "properties": [property_to_dict(prop) for prop in rna.properties if prop.identifier != "rna_type"],
+        "functions": [function_to_dict(function) for function in rna.functions],
+    }
+
+
+def operator_to_dict(idname: str, rna) -> Dict:
+    return {
+        "idname": idname,
+        "label": rna.name,
+        "description": rna.description,
+        "properties": [property_to_dict(prop) for prop in rna.properties if prop.identifier != "rna_type"],
+    }
+
+
+def function_to_dict(function) -> Dict:
+    return {
+        "identifier": function.identifier,
+        "description": function.description,
+        "parameters": [parameter_to_dict(parameter) for parameter in function.parameters if not parameter.is_output],
+        "returns": [parameter_to_dict(parameter) for parameter in function.parameters if parameter.is_output],
+    }
+
+
+def parameter_to_dict(parameter) -> Dict:
+    data = property_to_dict(parameter)
+    data["required"] = parameter.is_required
+    return data
+
+
+def property_to_dict(prop) -> Dict:
+    data = {
+        "identifier": prop.identifier,
+        "name": prop.name,
+        "description": prop.description,
+        "type": prop.type,
+    }
+    if prop.subtype != "NONE":
+        data["subtype"] = prop.subtype
+    if prop.is_readonly:
+        data["readonly"] = True
+    array_length = getattr(prop, "array_length", 0)
+    if array_length:
+        data["arrayLength"] = array_length
+    if prop.type in ("POINTER", "COLLECTION"):
+        data["fixedType"] = prop.fixed_type.identifier
+    elif prop.type == "ENUM":
+        data["enumItems"] = enum_items_to_list(prop.enum_items)
+        if prop.is_enum_flag:
+            data["enumFlag"] = True
+    return data
+
+
+def enum_items_to_list(items) -> List[Dict]:
+    return [{"identifier": item.identifier, "name": item.name, "description": item.description} for item in items]
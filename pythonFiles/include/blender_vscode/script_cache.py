@@ -0,0 +1,70 @@
+"""Compiled scripts uploaded by the editor, addressed by the SHA-256 hash of their source.
+
+The editor sends the source of a script only when Blender does not know its hash yet. Running an
+unchanged buffer again transfers only the hash and reuses the compiled code.
+"""
+
+import builtins
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+MAX_ENTRIES = 32
+
+
+class CachedScript:
+    def __init__(self, hash: str, source: str, path: str):
+        self.hash = hash
+        self.source = source
+        self.path = path
+        # compiled with the editor path as filename, so tracebacks and breakpoints point to the buffer
+        self.code = compile(source, path, "exec", dont_inherit=True)
+
+    def run(self, init_globals: Optional[Dict] = None) -> Dict:
+        """Execute the script like `runpy.run_path` does and return its globals."""
+        script_globals = {
+            "__name__": "__main__",
+            "__file__": self.path,
+            "__builtins__": builtins,
+            **(init_globals or {}),
+        }
+        exec(self.code, script_globals)
+        return script_globals
+
+
+_CACHE: "OrderedDict[str, CachedScript]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def get(hash: str) -> Optional[CachedScript]:
+    with _LOCK:
+        script = _CACHE.get(hash)
+        if script is not None:
+            _CACHE.move_to_end(hash)
+        return script
+
+
+def put(source: str, path: str, hash: Optional[str] = None) -> CachedScript:
+    """Compile and cache the source. Raises `ValueError` if `hash` does not match and `SyntaxError`."""
+    actual_hash = get_hash(source)
+    if hash is not None and hash != actual_hash:
+        raise ValueError(f"Hash mismatch: expected {hash}, source has {actual_hash}")
+    script = get(actual_hash)
+    if script is not None and script.path == path:
+        return script
+    script = CachedScript(actual_hash, source, path)
+    with _LOCK:
+        _CACHE[actual_hash] = script
+        while len(_CACHE) > MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+    return script
+
+
+def clear():
+    with _LOCK:
+        _CACHE.clear()
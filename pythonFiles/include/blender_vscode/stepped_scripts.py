@@ -0,0 +1,230 @@
+"""Scripts that run in steps instead of blocking the main thread until they are done.
+
+A script that defines a generator function named `steps` is started by the script runner and then
+advanced from a `bpy.app.timers` callback. Each tick runs steps until its time budget is used up, so
+Blender keeps handling events between ticks. A step may yield its progress as a number between 0 and 1.
+Progress is sent to the editor as `scriptProgress` and the end of the script as `scriptFinished`.
+Scripts can be cancelled between two steps. The job that started a script finishes together with it.
+"""
+
+import contextlib
+import inspect
+import itertools
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Iterator, List, Optional
+
+import bpy
+
+from . import jobs, log
+from .communication import send_dict_as_json
+from .utils import redraw_all
+
+LOG = log.getLogger()
+
+ENTRY_POINT = "steps"
+DEFAULT_BUDGET = 0.02
+TICK_INTERVAL = 0.01
+PROGRESS_INTERVAL = 0.25
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_SCRIPTS: Dict[str, "SteppedScript"] = {}
+_LOCK = threading.Lock()
+_ID_COUNTER = itertools.count(1)
+# scripts started inside `collect_started`
+_collector: Optional[List["SteppedScript"]] = None
+
+
+class SteppedScript:
+    def __init__(self, path: str, generator, budget: float, context: Optional[Dict] = None):
+        self.id = str(next(_ID_COUNTER))
+        self.path = path
+        self.generator = generator
+        self.budget = budget
+        self.context = context
+        self.state = RUNNING
+        self.steps = 0
+        self.ticks = 0
+        self.progress: Optional[float] = None
+        self.error: Optional[str] = None
+        self.started_at = time.perf_counter()
+        self.last_report = self.started_at
+        self.cancel_requested = False
+        self.on_finish: List[Callable[["SteppedScript"], None]] = []
+        # timers are looked up by identity, a new bound method would not be found
+        self.timer = self.tick
+
+    def tick(self) -> Optional[float]:
+        """Timer callback, returns None once the script is finished."""
+        if self.context is not None and bpy.app.version >= (4, 0, 0):
+            try:
+                with bpy.context.temp_override(**self.context):
+                    finished = self.run_steps()
+            except (TypeError, ReferenceError):
+                # the overridden area or window does not exist anymore
+                self.context = None
+                finished = self.run_steps()
+        else:
+            finished = self.run_steps()
+        if finished:
+            redraw_all()
+            return None
+        now = time.perf_counter()
+        if now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            self.send("scriptProgress")
+        return TICK_INTERVAL
+
+    def run_steps(self) -> bool:
+        self.ticks += 1
+        deadline = time.perf_counter() + self.budget
+        # at least one step per tick, also when a single step takes longer than the budget
+        while True:
+            if self.cancel_requested:
+                self.close()
+                return True
+            try:
+                value = next(self.generator)
+            except StopIteration:
+                self.progress = 1.0
+                self.finish(DONE)
+                return True
+            except Exception:
+                traceback.print_exc()
+                self.finish(FAILED, traceback.format_exc())
+                return True
+            self.steps += 1
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.progress = min(max(float(value), 0.0), 1.0)
+            if time.perf_counter() >= deadline:
+                return False
+
+    def cancel(self) -> bool:
+        if self.state != RUNNING:
+            return False
+        self.cancel_requested = True
+        return True
+
+    def close(self):
+        """Stop the generator now. The script fails when its cleanup raises."""
+        try:
+            self.generator.close()
+        except Exception:
+            traceback.print_exc()
+            self.finish(FAILED, traceback.format_exc())
+        else:
+            self.finish(CANCELLED)
+
+    def finish(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.error = error
+        with _LOCK:
+            _SCRIPTS.pop(self.id, None)
+        LOG.info(f'Script "{self.path}" {state} after {self.steps} steps in {self.ticks} ticks')
+        self.send("scriptFinished")
+        for callback in self.on_finish:
+            try:
+                callback(self)
+            except Exception:
+                LOG.exception(f'Failed to finish script "{self.path}"')
+
+    def send(self, type: str):
+        try:
+            send_dict_as_json({"type": type, **self.to_dict()})
+        except Exception as e:
+            LOG.warning(f"Could not send {type}: {e}")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "path": self.path,
+            "state": self.state,
+            "steps": self.steps,
+            "ticks": self.ticks,
+            "progress": self.progress,
+            "elapsed": time.perf_counter() - self.started_at,
+            "error": self.error,
+        }
+
+
+def get_entry_point(script_globals: Dict) -> Optional[Callable]:
+    entry_point = script_globals.get(ENTRY_POINT)
+    return entry_point if inspect.isgeneratorfunction(entry_point) else None
+
+
+def start(path: str, entry_point: Callable, budget: float = DEFAULT_BUDGET, context: Optional[Dict] = None):
+    script = SteppedScript(path, entry_point(), max(budget, 0.001), context)
+    with _LOCK:
+        _SCRIPTS[script.id] = script
+    if _collector is not None:
+        _collector.append(script)
+    # persistent, a file load would silently remove the timer and the script would never finish
+    bpy.app.timers.register(script.timer, first_interval=0.0, persistent=True)
+    LOG.info(f'Run script "{path}" in steps with a budget of {script.budget * 1000:.0f} ms per tick')
+    return script
+
+
+@contextlib.contextmanager
+def collect_started() -> Iterator[List[SteppedScript]]:
+    """Collect the scripts that are started in this block, e.g. by running the script operator."""
+    global _collector
+    previous, _collector = _collector, []
+    try:
+        yield _collector
+    finally:
+        _collector = previous
+
+
+def wait_for(scripts: List[SteppedScript]) -> Optional[jobs.Deferred]:
+    """Deferred job result that is settled when all scripts finished, None if there are none."""
+    if not scripts:
+        return None
+    deferred = jobs.Deferred()
+    pending = set(script.id for script in scripts)
+
+    def on_finish(script: SteppedScript):
+        pending.discard(script.id)
+        if script.state == FAILED:
+            deferred.reject(script.error or "Script failed")
+        elif script.state == CANCELLED:
+            deferred.cancel()
+        elif not pending:
+            deferred.resolve([finished.to_dict() for finished in scripts])
+
+    for script in scripts:
+        if script.state == RUNNING:
+            script.on_finish.append(on_finish)
+        else:
+            on_finish(script)
+    return deferred
+
+
+def cancel(script_id: Optional[str] = None) -> List[str]:
+    """Cancel one or all running scripts. They stop before their next step."""
+    with _LOCK:
+        scripts = list(_SCRIPTS.values())
+    return [script.id for script in scripts if (script_id is None or script.id == script_id) and script.cancel()]
+
+
+def stop_all() -> List[str]:
+    """Stop all running scripts right away instead of before their next step.
+
+    Used before the file that the scripts work on is replaced, e.g. when Blender is reset.
+    """
+    with _LOCK:
+        scripts = list(_SCRIPTS.values())
+    for script in scripts:
+        if bpy.app.timers.is_registered(script.timer):
+            bpy.app.timers.unregister(script.timer)
+        script.close()
+    return [script.id for script in scripts]
+
+
+def get_running() -> List[Dict]:
+    with _LOCK:
+        return [script.to_dict() for script in _SCRIPTS.values()]
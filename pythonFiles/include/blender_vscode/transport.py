@@ -0,0 +1,72 @@
+"""Unix domain socket transport for the traffic between the editor and Blender.
+
+Both sides keep their TCP server. The sockets are created in private temporary directories (mode 0700),
+so other local users cannot connect, and there are no port collisions. Blender advertises its socket in
+the `setup` message, the editor its own one in `EDITOR_SOCKET`. When a socket does not work, the
+sender falls back to TCP.
+"""
+
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+SUPPORTED = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+SOCKET_NAME = "blender.sock"
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def create_socket_path() -> str:
+    """Path of a new socket in a directory that only the current user can access."""
+    directory = tempfile.mkdtemp(prefix="blender_vscode_")
+    os.chmod(directory, 0o700)
+    return str(Path(directory) / SOCKET_NAME)
+
+
+def remove_socket(path: str):
+    try:
+        os.unlink(path)
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def request(
+    socket_path: str, method: str, path: str = "/", data: Optional[Dict] = None, timeout: Optional[float] = None
+) -> Tuple[int, bytes]:
+    """Send an HTTP request over the socket. Raises `OSError` when the socket is not reachable."""
+    connection = UnixHTTPConnection(socket_path, timeout=timeout)
+    try:
+        if data is None:
+            connection.request(method, path)
+        else:
+            body = json.dumps(data).encode("utf-8")
+            connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def post_json(socket_path: str, data: Dict, timeout: Optional[float] = None) -> Tuple[int, bytes]:
+    return request(socket_path, "POST", "/", data, timeout)
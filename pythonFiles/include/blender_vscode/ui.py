@@ -1,5 +1,7 @@
 import bpy
-from .communication import get_blender_port, get_debugpy_port, get_editor_address
+
+from . import class_timing, debug_control
+from .communication import get_blender_port, get_blender_socket, get_debugpy_port, get_editor_address
 
 
 class DevelopmentPanel(bpy.types.Panel):
@@ -12,8 +14,25 @@ class DevelopmentPanel(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.label(text=f"Blender at Port {get_blender_port()}")
-        layout.label(text=f"debugpy at Port {get_debugpy_port()}")
+        if get_blender_socket() is not None:
+            layout.label(text=f"Socket {get_blender_socket()}")
+        if get_debugpy_port() is None:
+            layout.label(text="debugpy disabled")
+        else:
+            layout.label(text=f"debugpy at Port {get_debugpy_port()} ({debug_control.get_state()})")
         layout.label(text=f"Editor at Address {get_editor_address()}")
+        if class_timing.is_enabled():
+            self.draw_class_timing(layout.box())
+
+    def draw_class_timing(self, layout):
+        layout.label(text="Most time spent (total, mean, calls)")
+        entries = class_timing.get_entries()[: class_timing.PANEL_TOP]
+        if not entries:
+            layout.label(text="No calls yet")
+        for entry in entries:
+            row = layout.row()
+            row.label(text=f"{entry['class'].rsplit('.', 1)[-1]}.{entry['method']}")
+            row.label(text=f"{entry['total'] * 1000:.1f} ms, {entry['mean'] * 1000:.2f} ms, {entry['count']}")
 
 
 classes = (DevelopmentPanel,)
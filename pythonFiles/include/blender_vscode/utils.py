@@ -1,7 +1,12 @@
 import ast
+import heapq
+import itertools
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Tuple
 import bpy
-import queue
 import traceback
 
 
@@ -35,24 +40,162 @@ def redraw_all():
             area.tag_redraw()
 
 
+def purge_modules(module_name: str) -> List[str]:
+    """Remove module and all its submodules from `sys.modules`, so that the next import reloads them.
+
+    The module is removed from its parent package as well, e.g. an extension from `bl_ext.<repository>`.
+    """
+    prefix = module_name + "."
+    purged = [name for name in list(sys.modules.keys()) if name == module_name or name.startswith(prefix)]
+    module = sys.modules.get(module_name)
+    parent_name, _, child_name = module_name.rpartition(".")
+    parent = sys.modules.get(parent_name) if parent_name else None
+    if module is not None and parent is not None and getattr(parent, child_name, None) is module:
+        delattr(parent, child_name)
+    for name in purged:
+        del sys.modules[name]
+    return purged
+
+
 def get_prefixes(all_names, separator):
     return set(name.split(separator)[0] for name in all_names if separator in name)
 
 
-execution_queue = queue.Queue()
+# Lower values are executed first. Entries with the same priority keep FIFO order.
+PRIORITY_STOP = 0
+PRIORITY_RELOAD = 10
+PRIORITY_SCRIPT = 20
+PRIORITY_DEFAULT = PRIORITY_SCRIPT
+
+
+class QueueEntry:
+    __slots__ = ("func", "priority", "sequence", "coalesce_key", "owner", "enqueued_at", "coalesced", "pending")
+
+    def __init__(self, func, priority: int, sequence: int, coalesce_key: Optional[Hashable], owner):
+        self.func = func
+        self.priority = priority
+        self.sequence = sequence
+        self.coalesce_key = coalesce_key
+        self.owner = owner
+        self.enqueued_at = time.perf_counter()
+        self.coalesced = 0
+        self.pending = True
+
+
+class MainThreadQueue:
+    """Thread safe priority queue of callables that are executed by `always` in the main thread.
+
+    Entries submitted with a `coalesce_key` that is already pending are not queued again,
+    the pending entry is returned instead.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, QueueEntry]] = []
+        self._pending_by_key: Dict[Hashable, QueueEntry] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.depth = 0
+        self.max_depth = 0
+        self.enqueued_count = 0
+        self.executed_count = 0
+        self.coalesced_count = 0
+        self.last_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_wait_time = 0.0
+
+    def put(self, func, priority: int = PRIORITY_DEFAULT, coalesce_key: Optional[Hashable] = None, owner=None):
+        with self._lock:
+            if coalesce_key is not None:
+                pending = self._pending_by_key.get(coalesce_key)
+                if pending is not None:
+                    pending.coalesced += 1
+                    self.coalesced_count += 1
+                    return pending
+            entry = QueueEntry(func, priority, next(self._sequence), coalesce_key, owner)
+            heapq.heappush(self._heap, (entry.priority, entry.sequence, entry))
+            if coalesce_key is not None:
+                self._pending_by_key[coalesce_key] = entry
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            self.enqueued_count += 1
+            return entry
+
+    def get(self) -> Optional[QueueEntry]:
+        """Return the next entry to execute or None when the queue is empty."""
+        with self._lock:
+            while self._heap:
+                _, _, entry = heapq.heappop(self._heap)
+                if not entry.pending:
+                    continue
+                self._forget(entry)
+                wait_time = time.perf_counter() - entry.enqueued_at
+                self.last_wait_time = wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+                self.total_wait_time += wait_time
+                self.executed_count += 1
+                return entry
+            return None
+
+    def cancel(self, entry: QueueEntry) -> bool:
+        """Remove a pending entry. Returns False if it was already taken from the queue."""
+        with self._lock:
+            if not entry.pending:
+                return False
+            self._forget(entry)
+            return True
+
+    def empty(self) -> bool:
+        return self.depth == 0
+
+    def qsize(self) -> int:
+        return self.depth
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "depth": self.depth,
+                "maxDepth": self.max_depth,
+                "enqueued": self.enqueued_count,
+                "executed": self.executed_count,
+                "coalesced": self.coalesced_count,
+                "lastWaitTime": self.last_wait_time,
+                "maxWaitTime": self.max_wait_time,
+                "meanWaitTime": self.total_wait_time / self.executed_count if self.executed_count else 0.0,
+            }
+
+    def _forget(self, entry: QueueEntry):
+        entry.pending = False
+        self.depth -= 1
+        if entry.coalesce_key is not None and self._pending_by_key.get(entry.coalesce_key) is entry:
+            del self._pending_by_key[entry.coalesce_key]
+
+
+execution_queue = MainThreadQueue()
+
+
+def run_in_main_thread(func, priority: int = PRIORITY_DEFAULT, coalesce_key: Optional[Hashable] = None, owner=None):
+    return execution_queue.put(func, priority=priority, coalesce_key=coalesce_key, owner=owner)
+
 
+# set by the stop action to end `serve_in_background`
+background_stop = threading.Event()
 
-def run_in_main_thread(func):
-    execution_queue.put(func)
+# updated on every tick of `always`, a late tick means that the main thread is busy, see `watchdog.py`
+last_tick_time = time.perf_counter()
 
 
 def always():
-    while not execution_queue.empty():
-        func = execution_queue.get()
+    global last_tick_time
+    last_tick_time = time.perf_counter()
+    while True:
+        entry = execution_queue.get()
+        if entry is None:
+            break
         try:
-            func()
+            entry.func()
         except Exception:
             traceback.print_exc()
+        last_tick_time = time.perf_counter()
     return 0.1
 
 
@@ -0,0 +1,133 @@
+"""Detection of main thread stalls.
+
+`utils.always` updates `utils.last_tick_time` on every timer tick and after every executed queue entry.
+A background thread samples the main thread's stack while the tick is late and reports the stall
+to the editor once the main thread recovers.
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from . import jobs, log, metrics, utils
+from .communication import send_dict_as_json
+
+LOG = log.getLogger()
+
+CHECK_INTERVAL = 0.1
+MAX_STACK_SAMPLES = 200
+TOP_STACKS = 5
+
+_watchdog: Optional["StallWatchdog"] = None
+
+Stack = Tuple[Tuple[str, int, str], ...]
+
+
+class Stall:
+    def __init__(self, tick_time: float):
+        self.tick_time = tick_time
+        self.detected_at = time.time()
+        self.first_stack: Optional[Stack] = None
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.jobs = [job.to_dict() for job in jobs.get_jobs() if job.state == jobs.RUNNING]
+
+    def add_sample(self, stack: Optional[Stack]):
+        if stack is None:
+            return
+        if self.first_stack is None:
+            self.first_stack = stack
+        if self.sample_count < MAX_STACK_SAMPLES:
+            self.samples[stack] += 1
+            self.sample_count += 1
+
+
+class StallWatchdog(threading.Thread):
+    def __init__(self, threshold: float, interval: float = CHECK_INTERVAL):
+        super().__init__(name="blender_vscode stall watchdog", daemon=True)
+        self.threshold = threshold
+        self.interval = interval
+        self.main_thread_id = threading.main_thread().ident
+        self.stall: Optional[Stall] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                LOG.exception("Stall watchdog failed")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def check(self):
+        tick_time = utils.last_tick_time
+        if self.stall is not None:
+            if tick_time != self.stall.tick_time:
+                stall, self.stall = self.stall, None
+                self.report(stall, tick_time - stall.tick_time)
+            else:
+                self.stall.add_sample(self.capture_main_thread_stack())
+        elif time.perf_counter() - tick_time > self.threshold:
+            self.stall = Stall(tick_time)
+            self.stall.add_sample(self.capture_main_thread_stack())
+            LOG.debug(f"Main thread stalled for more than {self.threshold}s")
+
+    def capture_main_thread_stack(self) -> Optional[Stack]:
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return None
+        return tuple((entry.filename, entry.lineno, entry.name) for entry in traceback.extract_stack(frame))
+
+    def report(self, stall: Stall, duration: float):
+        metrics.STALLS.inc()
+        metrics.STALL_DURATION.observe(duration)
+        report = {
+            "type": "stallReport",
+            "duration": duration,
+            "threshold": self.threshold,
+            "detectedAt": stall.detected_at,
+            "jobs": stall.jobs,
+            "stack": stack_to_list(stall.first_stack),
+            "samples": [
+                {"count": count, "stack": stack_to_list(stack)}
+                for stack, count in stall.samples.most_common(TOP_STACKS)
+            ],
+        }
+        location = stall.first_stack[-1] if stall.first_stack else None
+        LOG.warning(
+            f"Main thread was stalled for {duration:.2f}s"
+            + ("" if location is None else f", at {location[0]}:{location[1]} in {location[2]}")
+        )
+        try:
+            send_dict_as_json(report)
+        except Exception as e:
+            LOG.warning(f"Could not send stall report: {e}")
+
+
+def stack_to_list(stack: Optional[Stack]) -> List[Dict]:
+    if stack is None:
+        return []
+    return [{"file": file, "line": line, "function": function} for file, line, function in stack]
+
+
+def start(threshold: float):
+    """Watch the main thread. Stalls longer than `threshold` seconds are reported."""
+    global _watchdog
+    if _watchdog is not None or threshold <= 0:
+        return
+    utils.last_tick_time = time.perf_counter()
+    _watchdog = StallWatchdog(threshold)
+    _watchdog.start()
+    LOG.debug(f"Stall watchdog started with threshold {threshold}s")
+
+
+def stop():
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
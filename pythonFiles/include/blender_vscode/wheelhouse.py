@@ -0,0 +1,168 @@
+"""Local cache of wheels for the bootstrap dependencies, to install them without network access.
+
+    <wheelhouse>/<abi>/*.whl        wheels usable by every Blender with the same Python ABI and platform
+    <wheelhouse>/<abi>/hashes.json  {wheel file name: sha256}, wheels that are not listed are ignored
+
+The wheels are packed from an existing installation, see `populate_from_directory`.
+"""
+
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import sysconfig
+import zipfile
+from email.parser import HeaderParser
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import log
+
+LOG = log.getLogger()
+
+HASHES_FILE_NAME = "hashes.json"
+
+
+def get_abi_tag() -> str:
+    """For example `cp311-linux_x86_64`."""
+    implementation = {"cpython": "cp", "pypy": "pp"}.get(sys.implementation.name, sys.implementation.name)
+    platform = sysconfig.get_platform().replace("-", "_").replace(".", "_")
+    return f"{implementation}{sys.version_info[0]}{sys.version_info[1]}-{platform}"
+
+
+def get_wheelhouse_directory() -> Optional[Path]:
+    """Directory of the running Python ABI, `None` when no wheelhouse is configured."""
+    root = os.environ.get("VSCODE_WHEELHOUSE", "")
+    if not root:
+        return None
+    return Path(root) / get_abi_tag()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_hashes(directory: Path) -> Dict[str, str]:
+    try:
+        with open(directory / HASHES_FILE_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_verified_wheels(directory: Path) -> List[Path]:
+    """Wheels listed in the hash file. Raises `ValueError` if any of them was modified or is missing."""
+    wheels = []
+    for file_name, expected in sorted(read_hashes(directory).items()):
+        path = directory / file_name
+        if not path.is_file():
+            raise ValueError(f"Wheel listed in {HASHES_FILE_NAME} is missing: {path}")
+        actual = file_sha256(path)
+        if actual != expected:
+            raise ValueError(f"Hash mismatch for {path}: expected {expected}, got {actual}")
+        wheels.append(path)
+    return wheels
+
+
+def write_requirements(wheels: List[Path], path: Path):
+    """Pin every wheel with its hash, pip then refuses anything else (`--require-hashes`)."""
+    hashes = read_hashes(wheels[0].parent) if wheels else {}
+    with open(path, "w") as f:
+        for wheel in wheels:
+            name, version = wheel.name.split("-")[:2]
+            f.write(f"{name}=={version} --hash=sha256:{hashes[wheel.name]}\n")
+
+
+# Populate
+#########################################
+
+
+def populate_from_directory(site_directory: Path, directory: Optional[Path] = None) -> List[Path]:
+    """Pack every distribution installed in `site_directory` (e.g. the `--target` of pip) into a wheel."""
+    if directory is None:
+        directory = get_wheelhouse_directory()
+    if directory is None:
+        raise ValueError("VSCODE_WHEELHOUSE is not set")
+    os.makedirs(directory, exist_ok=True)
+
+    hashes = read_hashes(directory)
+    wheels = []
+    for dist_info in sorted(site_directory.glob("*.dist-info")):
+        try:
+            wheel = pack_distribution(dist_info, directory)
+        except (OSError, ValueError) as e:
+            LOG.warning(f"Can not pack {dist_info.name}: {e}")
+            continue
+        hashes[wheel.name] = file_sha256(wheel)
+        wheels.append(wheel)
+        LOG.info(f"Added {wheel.name} to wheelhouse {directory}")
+
+    with open(directory / HASHES_FILE_NAME, "w") as f:
+        json.dump(dict(sorted(hashes.items())), f, indent=2)
+    return wheels
+
+
+def pack_distribution(dist_info: Path, output_directory: Path) -> Path:
+    """Rebuild the wheel of an installed distribution from the files listed in its RECORD."""
+    site_directory = dist_info.parent
+    with open(dist_info / "METADATA", encoding="utf-8") as f:
+        metadata = HeaderParser().parse(f)
+    with open(dist_info / "WHEEL", encoding="utf-8") as f:
+        tags = HeaderParser().parse(f).get_all("Tag") or []
+    if not tags:
+        raise ValueError("WHEEL file has no tags")
+
+    name = metadata["Name"].replace("-", "_")
+    version = metadata["Version"]
+    wheel_path = output_directory / f"{name}-{version}-{compress_tags(tags)}.whl"
+    new_dist_info = f"{name}-{version}.dist-info"
+
+    records = []
+    with zipfile.ZipFile(wheel_path, "w", zipfile.ZIP_DEFLATED) as wheel:
+        for relative_path in iter_recorded_files(dist_info):
+            if relative_path.startswith(dist_info.name + "/"):
+                if relative_path.split("/", 1)[1] in ("RECORD", "INSTALLER", "REQUESTED", "direct_url.json"):
+                    continue
+                archive_path = new_dist_info + "/" + relative_path.split("/", 1)[1]
+            else:
+                archive_path = relative_path
+            data = (site_directory / relative_path).read_bytes()
+            wheel.writestr(archive_path, data)
+            records.append((archive_path, record_hash(data), str(len(data))))
+
+        record = io.StringIO()
+        writer = csv.writer(record, lineterminator="\n")
+        writer.writerows(records)
+        writer.writerow((new_dist_info + "/RECORD", "", ""))
+        wheel.writestr(new_dist_info + "/RECORD", record.getvalue())
+    return wheel_path
+
+
+def iter_recorded_files(dist_info: Path):
+    with open(dist_info / "RECORD", newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            path = row[0].replace("\\", "/")
+            # scripts end up outside of the site directory, compiled files are created again on import
+            if path.startswith("../") or path.startswith("/") or path.startswith("bin/") or path.endswith(".pyc"):
+                continue
+            yield path
+
+
+def record_hash(data: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=")
+    return "sha256=" + digest.decode()
+
+
+def compress_tags(tags: List[str]) -> str:
+    """`["py2-none-any", "py3-none-any"]` -> `py2.py3-none-any`"""
+    parts = [tag.split("-") for tag in tags]
+    return "-".join(".".join(sorted(set(part[index] for part in parts))) for index in range(3))
@@ -14,21 +14,22 @@ if TYPE_CHECKING:
     from .include import blender_vscode
 else:
     import blender_vscode
+    import blender_vscode.environment
 
 LOG = blender_vscode.log.getLogger()
-LOG.info(f"ADDONS_TO_LOAD {json.loads(os.environ['ADDONS_TO_LOAD'])}")
+STANDBY = blender_vscode.environment.STANDBY
+LOG.info(f"ADDONS_TO_LOAD {json.loads(os.environ.get('ADDONS_TO_LOAD', '[]'))}")
 
 try:
-    addons_to_load = []
-    for info in json.loads(os.environ["ADDONS_TO_LOAD"]):
-        addon_info = blender_vscode.AddonInfo(**info)
-        addon_info.load_dir = Path(addon_info.load_dir)
-        addons_to_load.append(addon_info)
+    addons_to_load = [] if STANDBY else blender_vscode.parse_addons_to_load(json.loads(os.environ["ADDONS_TO_LOAD"]))
 
     blender_vscode.startup(
         editor_address=f"http://localhost:{os.environ['EDITOR_PORT']}",
         addons_to_load=addons_to_load,
+        standby=STANDBY,
     )
+    # returns immediately unless Blender runs in background mode (e.g. as test worker of shard_tests.py)
+    blender_vscode.serve_in_background()
 except Exception as e:
     if type(e) is not SystemExit:
         traceback.print_exc()
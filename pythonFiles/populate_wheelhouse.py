@@ -0,0 +1,19 @@
+import os
+import sys
+from pathlib import Path
+
+include_dir = Path(__file__).parent / "include"
+sys.path.append(str(include_dir))
+
+from blender_vscode import wheelhouse
+from blender_vscode.installation import get_package_install_directory
+
+# usage: blender -b --python populate_wheelhouse.py -- <wheelhouse> [<site directory>]
+# packs the bootstrap dependencies installed for this Blender into <wheelhouse>/<abi>
+script_args = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+if script_args:
+    os.environ["VSCODE_WHEELHOUSE"] = script_args[0]
+site_directory = Path(script_args[1]) if len(script_args) > 1 else Path(get_package_install_directory())
+
+wheels = wheelhouse.populate_from_directory(site_directory)
+print(f"Packed {len(wheels)} wheels from {site_directory} into {wheelhouse.get_wheelhouse_directory()}")
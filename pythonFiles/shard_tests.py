@@ -0,0 +1,268 @@
+"""Run a pytest suite inside several background Blender processes at once.
+
+usage: python shard_tests.py --blender <executable> [--shards N] [--durations FILE] [--addons JSON] -- <pytest args>
+
+Every shard is a Blender started with `--background --python launch.py`. This script plays the editor for
+them: it receives their `setup` message, lets the first shard collect the tests, splits them by the
+durations recorded in previous runs and sends each shard a `runTests` request for its part. Results are
+printed while they are streamed back, the measured durations are written back for the next split.
+Only the standard library is used, the script runs with any Python 3.
+"""
+
+import argparse
+import heapq
+import http.server
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LAUNCH_PATH = Path(__file__).parent / "launch.py"
+DEFAULT_DURATIONS_PATH = ".blender_test_durations.json"
+DEFAULT_DURATION = 1.0
+STARTUP_TIMEOUT = 120.0
+REQUEST_TIMEOUT = 30.0
+
+
+class Shard:
+    def __init__(self, index: int, process: subprocess.Popen):
+        self.index = index
+        self.identifier = f"shard-{index}"
+        self.process = process
+        self.port: Optional[int] = None
+        self.ready = threading.Event()
+        self.node_ids: List[str] = []
+        self.job_id: Optional[str] = None
+
+    def send(self, data: Dict) -> Dict:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.port}/",
+            data=json.dumps(data).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            body = response.read()
+        return json.loads(body) if body.strip().startswith(b"{") else {}
+
+
+class Coordinator:
+    """Receives the messages of all shards, like the editor does for a single Blender."""
+
+    def __init__(self, blender_command: List[str], shard_count: int, pytest_args: List[str], addons: List[Dict]):
+        self.blender_command = blender_command
+        self.shard_count = max(1, shard_count)
+        self.pytest_args = pytest_args
+        self.addons = addons
+        self.shards: Dict[str, Shard] = {}
+        self.results: Dict[str, Dict] = {}
+        # (shard identifier, job), every shard numbers its jobs from 1
+        self.finished_jobs: "queue.Queue[Tuple[str, Dict]]" = queue.Queue()
+        self.lock = threading.Lock()
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+
+    def make_handler(self):
+        coordinator = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                coordinator.handle_message(data)
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"OK")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle_message(self, data: Dict):
+        type = data.get("type")
+        if type == "setup":
+            shard = self.shards.get(data.get("vscodeIdentifier", ""))
+            if shard is not None:
+                shard.port = int(data["blenderPort"])
+                shard.ready.set()
+        elif type == "testResult":
+            with self.lock:
+                self.results[data["nodeid"]] = data
+            print_result(data)
+        elif type == "jobFinished":
+            self.finished_jobs.put((data.get("vscodeIdentifier", ""), data["job"]))
+
+    def start_shards(self, count: int):
+        env = {
+            **os.environ,
+            "EDITOR_PORT": str(self.server.server_address[1]),
+            "ADDONS_TO_LOAD": json.dumps(self.addons),
+            "VSCODE_NO_DEBUG": "1",
+            "VSCODE_STALL_THRESHOLD": "0",
+        }
+        for index in range(count):
+            command = self.blender_command + ["--background", "--python", str(LAUNCH_PATH)]
+            process = subprocess.Popen(command, env={**env, "VSCODE_IDENTIFIER": f"shard-{index}"})
+            shard = Shard(index, process)
+            self.shards[shard.identifier] = shard
+
+    def wait_until_ready(self, shard: Shard, timeout: float = STARTUP_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while not shard.ready.wait(0.1):
+            if shard.process.poll() is not None:
+                raise RuntimeError(f"{shard.identifier} exited with code {shard.process.returncode} during startup")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{shard.identifier} did not start within {timeout}s")
+
+    def wait_for_jobs(self, shards: List[Shard]) -> Dict[str, Dict]:
+        """Wait until the `runTests` jobs of the shards finished, shards that exit are treated as failed."""
+        pending = {(shard.identifier, shard.job_id): shard for shard in shards}
+        finished = {}
+        while pending:
+            try:
+                identifier, job = self.finished_jobs.get(timeout=0.5)
+            except queue.Empty:
+                for key, shard in list(pending.items()):
+                    if shard.process.poll() is not None:
+                        print(f"{shard.identifier} exited with code {shard.process.returncode}")
+                        finished[shard.identifier] = {"state": "failed", "error": "Blender exited", "result": None}
+                        del pending[key]
+                continue
+            shard = pending.pop((identifier, str(job["id"])), None)
+            if shard is not None:
+                finished[shard.identifier] = job
+        return finished
+
+    def run_tests(self, shard: Shard, node_ids: Optional[List[str]], collect_only: bool = False):
+        self.wait_until_ready(shard)
+        request = {"type": "runTests", "args": self.pytest_args, "runId": shard.identifier}
+        if collect_only:
+            request["collectOnly"] = True
+        else:
+            request["nodeIds"] = node_ids
+        shard.job_id = str(shard.send(request)["jobId"])
+
+    def run(self, durations: Dict[str, float]) -> int:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        try:
+            self.start_shards(self.shard_count)
+            shards = list(self.shards.values())
+
+            self.run_tests(shards[0], None, collect_only=True)
+            collected = self.wait_for_jobs([shards[0]])[shards[0].identifier]
+            if collected["state"] != "done":
+                print(f"Collection failed:\n{collected.get('error')}")
+                return 2
+            node_ids = collected["result"]["collected"]
+            print(f"Collected {len(node_ids)} tests, running them in {len(shards)} Blender processes")
+
+            plan = plan_shards(node_ids, durations, len(shards))
+            active = []
+            for shard, shard_node_ids in zip(shards, plan):
+                if shard_node_ids:
+                    shard.node_ids = shard_node_ids
+                    self.run_tests(shard, shard_node_ids)
+                    active.append(shard)
+            jobs = self.wait_for_jobs(active)
+        finally:
+            self.stop_shards()
+            self.server.shutdown()
+
+        missing = [node_id for node_id in node_ids if node_id not in self.results]
+        failed = [node_id for node_id, result in self.results.items() if result["outcome"] in ("failed", "error")]
+        for identifier, job in sorted(jobs.items()):
+            if job["state"] != "done":
+                print(f"{identifier} failed: {job.get('error')}")
+        print_summary(self.results, missing)
+        for node_id in missing:
+            print(f"NO RESULT {node_id}")
+        return 1 if failed or missing else 0
+
+    def stop_shards(self):
+        for shard in self.shards.values():
+            if shard.port is not None and shard.process.poll() is None:
+                try:
+                    shard.send({"type": "stop"})
+                except OSError:
+                    pass
+        for shard in self.shards.values():
+            try:
+                shard.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                shard.process.kill()
+
+
+def plan_shards(node_ids: List[str], durations: Dict[str, float], shard_count: int) -> List[List[str]]:
+    """Split the tests into shards with similar total duration (longest tests first, each into the least busy shard).
+
+    Tests without a recorded duration count with the median of the known durations.
+    Every shard keeps the collection order, so tests of a module stay next to each other.
+    """
+    known = [durations[node_id] for node_id in node_ids if node_id in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    order = {node_id: index for index, node_id in enumerate(node_ids)}
+    heap = [(0.0, index) for index in range(shard_count)]
+    shards: List[List[str]] = [[] for _ in range(shard_count)]
+    for node_id in sorted(node_ids, key=lambda node_id: (-durations.get(node_id, default), order[node_id])):
+        total, index = heapq.heappop(heap)
+        shards[index].append(node_id)
+        heapq.heappush(heap, (total + durations.get(node_id, default), index))
+    return [sorted(shard, key=order.__getitem__) for shard in shards]
+
+
+def read_durations(path: Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_durations(path: Path, durations: Dict[str, float], results: Dict[str, Dict]):
+    durations = {**durations, **{node_id: result["duration"] for node_id, result in results.items()}}
+    with open(path, "w") as f:
+        json.dump(durations, f, indent=1, sort_keys=True)
+
+
+def print_result(result: Dict):
+    print(f"{result['outcome'].upper()} {result['nodeid']} ({result['duration']:.3f}s) [{result.get('runId')}]")
+    if result.get("longrepr"):
+        print(result["longrepr"])
+    sys.stdout.flush()
+
+
+def print_summary(results: Dict[str, Dict], missing: List[str]):
+    counts: Dict[str, int] = {}
+    for result in results.values():
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    if missing:
+        counts["missing"] = len(missing)
+    print(", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())) or "no tests ran")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blender", required=True, help="Blender executable")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--durations", type=Path, default=Path(DEFAULT_DURATIONS_PATH))
+    parser.add_argument("--addons", default="[]", help="ADDONS_TO_LOAD, e.g. [{'load_dir': ..., 'module_name': ...}]")
+    parser.add_argument("pytest_args", nargs="*")
+    args = parser.parse_args(argv)
+
+    durations = read_durations(args.durations)
+    coordinator = Coordinator([args.blender], args.shards, args.pytest_args, json.loads(args.addons))
+    start = time.perf_counter()
+    exit_code = coordinator.run(durations)
+    write_durations(args.durations, durations, coordinator.results)
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,213 @@
+"""Micro-benchmarks for the bootstrap code running against mocked `bpy`.
+
+Not collected by default, run explicitly:
+
+    pytest -s tests/blender_vscode/bench_bootstrap.py
+
+The baselines in `benchmark_baselines.json` are wall-clock times of one machine, so by default the
+medians are only printed. Set `BLENDER_VSCODE_BENCH_COMPARE=1` on the machine that wrote the baselines to
+fail when a median is slower than its baseline by more than `BLENDER_VSCODE_BENCH_TOLERANCE` (fraction,
+default 0.5). Set `BLENDER_VSCODE_BENCH_UPDATE=1` to write the measured medians as new baselines.
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from unittest.mock import Mock, patch
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+BASELINES_PATH = Path(__file__).parent / "benchmark_baselines.json"
+TOLERANCE = float(os.environ.get("BLENDER_VSCODE_BENCH_TOLERANCE", "0.5"))
+UPDATE_BASELINES = os.environ.get("BLENDER_VSCODE_BENCH_UPDATE", "") not in ("", "0")
+COMPARE_BASELINES = os.environ.get("BLENDER_VSCODE_BENCH_COMPARE", "") not in ("", "0")
+
+DIRECTORY_ENTRIES = 3000
+BROKEN_LINKS = 200
+
+_measured: Dict[str, float] = {}
+
+
+def measure(name: str, func: Callable, setup: Optional[Callable] = None, repeat: int = 7) -> float:
+    """Return median run time of `func` in seconds and check it against the stored baseline."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    _measured[name] = median
+
+    baseline = _load_baselines().get(name)
+    print(
+        f"\n{name}: median {median * 1000:.3f} ms (baseline: {'-' if baseline is None else f'{baseline * 1000:.3f} ms'})"
+    )
+    if baseline is not None and COMPARE_BASELINES and not UPDATE_BASELINES:
+        limit = baseline * (1 + TOLERANCE)
+        assert median <= limit, f"{name} regressed: {median * 1000:.3f} ms > {limit * 1000:.3f} ms"
+    return median
+
+
+def _load_baselines() -> Dict[str, float]:
+    if not BASELINES_PATH.exists():
+        return {}
+    with open(BASELINES_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def store_baselines():
+    yield
+    if UPDATE_BASELINES and _measured:
+        baselines = _load_baselines()
+        baselines.update(_measured)
+        with open(BASELINES_PATH, "w") as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write("\n")
+
+
+class ExtensionRepos(list):
+    def new(self, name, module):
+        repo = Mock(enabled=True, use_custom_directory=False, custom_directory="", module=module)
+        self.append(repo)
+        return repo
+
+
+def populate_directory(directory: Path, target: Path, broken_target: Path):
+    """Fill directory with a mix of real directories, files, valid links and broken links."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(DIRECTORY_ENTRIES):
+        kind = i % 3
+        if kind == 0:
+            (directory / f"addon_dir_{i}").mkdir(exist_ok=True)
+        elif kind == 1:
+            (directory / f"addon_file_{i}.py").touch()
+        else:
+            link = directory / f"addon_link_{i}"
+            if not os.path.lexists(link):
+                os.symlink(target, link, target_is_directory=True)
+    add_broken_links(directory, broken_target)
+
+
+def add_broken_links(directory: Path, broken_target: Path):
+    for i in range(BROKEN_LINKS):
+        link = directory / f"broken_link_{i}"
+        if not os.path.lexists(link):
+            os.symlink(broken_target, link, target_is_directory=True)
+
+
+@pytest.fixture
+def addon_environment(tmp_path: Path):
+    addons_dir = tmp_path / "scripts" / "addons"
+    extensions_dir = tmp_path / "extensions" / "user_default"
+    other_addon = tmp_path / "other_addon"
+    other_addon.mkdir()
+    broken_target = tmp_path / "removed_addon"
+
+    populate_directory(addons_dir, other_addon, broken_target)
+    populate_directory(extensions_dir, other_addon, broken_target)
+
+    developed_addon = tmp_path / "project" / "test_addon"
+    developed_addon.mkdir(parents=True)
+    (developed_addon / "__init__.py").write_text("bl_info = {}\n")
+
+    repos = ExtensionRepos()
+    repos.append(
+        Mock(
+            enabled=True,
+            use_custom_directory=False,
+            custom_directory="",
+            directory=str(extensions_dir),
+            module="user_default",
+        )
+    )
+    with patch("bpy.context", **{"preferences.extensions.repos": repos}):
+        import blender_vscode.load_addons as load_addons
+
+        with patch.object(load_addons, "_ADDONS_DEFAULT_DIR", addons_dir), patch.object(
+            load_addons, "_EXTENSIONS_DEFAULT_DIR", extensions_dir
+        ), patch.object(load_addons, "sys", path=[]):
+            yield {
+                "addons_dir": addons_dir,
+                "extensions_dir": extensions_dir,
+                "broken_target": broken_target,
+                "developed_addon": developed_addon,
+            }
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="creating symlinks requires privileges on Windows")
+class TestBenchLoadAddons:
+    def test_bench_setup_addon_links(self, addon_environment):
+        from blender_vscode import AddonInfo
+        from blender_vscode.load_addons import setup_addon_links
+
+        addons_to_load = [AddonInfo(load_dir=addon_environment["developed_addon"], module_name="test_addon")]
+
+        measure(
+            "setup_addon_links",
+            lambda: setup_addon_links(addons_to_load),
+            setup=lambda: add_broken_links(addon_environment["addons_dir"], addon_environment["broken_target"]),
+        )
+
+    def test_bench_remove_broken_addon_links(self, addon_environment):
+        from blender_vscode.load_addons import remove_broken_addon_links
+
+        measure(
+            "remove_broken_addon_links",
+            remove_broken_addon_links,
+            setup=lambda: add_broken_links(addon_environment["addons_dir"], addon_environment["broken_target"]),
+        )
+
+    def test_bench_remove_broken_extension_links(self, addon_environment):
+        from blender_vscode.load_addons import remove_broken_extension_links
+
+        measure(
+            "remove_broken_extension_links",
+            remove_broken_extension_links,
+            setup=lambda: add_broken_links(addon_environment["extensions_dir"], addon_environment["broken_target"]),
+        )
+
+
+class TestBenchUtils:
+    def test_bench_addon_has_bl_info_large_file(self, tmp_path: Path):
+        from blender_vscode.utils import addon_has_bl_info
+
+        lines = []
+        for i in range(5000):
+            lines.append(f"def function_{i}(a, b=1):\n    return a + b * {i}\n\n")
+        lines.append("bl_info = {'name': 'large addon'}\n")
+        (tmp_path / "__init__.py").write_text("".join(lines))
+
+        assert addon_has_bl_info(tmp_path)
+        measure("addon_has_bl_info_large_file", lambda: addon_has_bl_info(tmp_path), repeat=5)
+
+    def test_bench_purge_modules(self):
+        from blender_vscode.utils import purge_modules
+
+        def add_modules():
+            for i in range(2000):
+                sys.modules[f"bench_addon.sub_{i}"] = Mock()
+            sys.modules["bench_addon"] = Mock()
+
+        try:
+            measure("purge_modules", lambda: purge_modules("bench_addon"), setup=add_modules)
+        finally:
+            purge_modules("bench_addon")
+
+    def test_bench_always_queue_draining(self):
+        from blender_vscode import utils
+
+        def fill_queue():
+            for i in range(10000):
+                utils.run_in_main_thread(int, priority=i % 3)
+
+        measure("always_queue_draining", utils.always, setup=fill_queue)
+        assert utils.execution_queue.empty()
@@ -0,0 +1,39 @@
+"""Behaviour of the control plane under load, with a stand-in editor and mocked `bpy`.
+
+Not collected by default, run explicitly:
+
+    pytest -s tests/blender_vscode/bench_control_plane.py
+
+The request mix is configured with `BLENDER_VSCODE_LOAD_MIX` (requests per second, default
+`ping=50,reload=5,script=10`) and `BLENDER_VSCODE_LOAD_DURATION` (seconds, default 5). The time spent in
+the main thread per reload and script is set with `BLENDER_VSCODE_LOAD_RELOAD_COST` and
+`BLENDER_VSCODE_LOAD_SCRIPT_COST`, the number of server workers with `VSCODE_SERVER_WORKERS`.
+The benchmark fails when a ping is not answered or a queued job is never reported as finished.
+"""
+
+import os
+
+from load_generator import DEFAULT_MIX, format_report, parse_mix, run_load
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+MIX = parse_mix(os.environ.get("BLENDER_VSCODE_LOAD_MIX", DEFAULT_MIX))
+DURATION = float(os.environ.get("BLENDER_VSCODE_LOAD_DURATION", "5"))
+RELOAD_COST = float(os.environ.get("BLENDER_VSCODE_LOAD_RELOAD_COST", "0.2"))
+SCRIPT_COST = float(os.environ.get("BLENDER_VSCODE_LOAD_SCRIPT_COST", "0.01"))
+
+
+def test_request_mix():
+    report = run_load(MIX, DURATION, RELOAD_COST, SCRIPT_COST)
+    print("\n" + format_report(report))
+    assert report["unfinishedJobs"] == 0
+    if "ping" in report["requests"]:
+        ping = report["requests"]["ping"]
+        assert ping["ok"] == ping["sent"]
+
+
+def test_reload_storm():
+    # saving many files at once, reloads that wait for the main thread are folded into one
+    report = run_load({"ping": 20, "reload": 200}, min(DURATION, 2.0), RELOAD_COST, SCRIPT_COST)
+    print("\n" + format_report(report))
+    assert report["unfinishedJobs"] == 0
+    assert report["queue"]["coalesced"] > 0
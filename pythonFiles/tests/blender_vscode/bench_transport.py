@@ -0,0 +1,123 @@
+"""Latency of the control traffic over TCP and over Unix domain sockets.
+
+Not collected by default, run explicitly:
+
+    pytest -s tests/blender_vscode/bench_transport.py
+
+Both directions are measured: requests of the editor to Blender's Flask server and messages that
+Blender sends to the editor. A benchmark fails when the Unix socket is slower than TCP by more than
+`BLENDER_VSCODE_BENCH_TOLERANCE` (fraction, default 0.5).
+"""
+
+import http.client
+import http.server
+import os
+import socketserver
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, List
+from unittest.mock import patch
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+TOLERANCE = float(os.environ.get("BLENDER_VSCODE_BENCH_TOLERANCE", "0.5"))
+REQUESTS = 500
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets are not used on Windows")
+
+
+def measure(name: str, func: Callable, count: int = REQUESTS) -> List[float]:
+    for _ in range(20):
+        func()
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(
+        f"\n{name}: median {statistics.median(timings) * 1e6:.0f} us, "
+        f"p95 {timings[int(len(timings) * 0.95)] * 1e6:.0f} us"
+    )
+    return timings
+
+
+def compare(tcp: List[float], unix: List[float]):
+    tcp_median, unix_median = statistics.median(tcp), statistics.median(unix)
+    print(f"Unix socket / TCP: {unix_median / tcp_median:.2f}")
+    assert unix_median <= tcp_median * (1 + TOLERANCE)
+
+
+class EditorHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_editor_to_blender():
+    from blender_vscode import communication, control_server, transport
+
+    tcp_server = serve(control_server.ControlServer("127.0.0.1", 0, communication.SERVER))
+    socket_path = communication.start_own_socket_server()
+    assert socket_path is not None
+
+    def ping_tcp():
+        # a new connection per request, like the editor does
+        connection = http.client.HTTPConnection("127.0.0.1", tcp_server.server_port)
+        connection.request("GET", "/ping")
+        assert connection.getresponse().read() == b"OK"
+        connection.close()
+
+    def ping_unix():
+        assert transport.request(socket_path, "GET", "/ping") == (200, b"OK")
+
+    compare(measure("editor -> Blender, TCP", ping_tcp), measure("editor -> Blender, Unix socket", ping_unix))
+    tcp_server.shutdown()
+
+
+def test_blender_to_editor():
+    from blender_vscode import communication, transport
+
+    tcp_server = serve(http.server.ThreadingHTTPServer(("127.0.0.1", 0), EditorHandler))
+    socket_path = transport.create_socket_path()
+    unix_server = serve(UnixHTTPServer(socket_path, EditorHandler))
+    message = {"type": "jobFinished", "job": {"id": "1", "state": "done", "result": None}}
+
+    def send_tcp():
+        communication.send_dict_as_json(message)
+
+    def send_unix():
+        communication.send_dict_as_json(message)
+
+    address = f"http://127.0.0.1:{tcp_server.server_port}"
+    with patch.object(communication, "EDITOR_ADDRESS", address), patch.object(
+        communication, "EDITOR_SOCKET_PATH", None
+    ):
+        tcp = measure("Blender -> editor, TCP", send_tcp)
+    with patch.object(communication, "EDITOR_ADDRESS", None), patch.object(
+        communication, "EDITOR_SOCKET_PATH", socket_path
+    ):
+        unix = measure("Blender -> editor, Unix socket", send_unix)
+    compare(tcp, unix)
+    tcp_server.shutdown()
+    unix_server.shutdown()
+    transport.remove_socket(socket_path)
@@ -0,0 +1,66 @@
+"""Stand-in for a background Blender started by `shard_tests.py`.
+
+It speaks the same protocol as `launch.py` in Blender: `setup` to the editor, `runTests` and `stop` requests,
+`testResult` and `jobFinished` messages. The suite is read from `FAKE_BLENDER_TESTS`
+(JSON `{nodeid: [outcome, duration]}`), every test only sleeps for its duration.
+"""
+
+import http.server
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+EDITOR_ADDRESS = f"http://127.0.0.1:{os.environ['EDITOR_PORT']}/"
+IDENTIFIER = os.environ["VSCODE_IDENTIFIER"]
+TESTS = json.loads(os.environ["FAKE_BLENDER_TESTS"])
+job_ids = itertools.count(1)
+stop = threading.Event()
+
+
+def send(data):
+    request = urllib.request.Request(
+        EDITOR_ADDRESS, data=json.dumps(data).encode(), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    urllib.request.urlopen(request).read()
+
+
+def run_tests(job_id, data):
+    if data.get("collectOnly"):
+        result = {"collected": list(TESTS)}
+    else:
+        for node_id in data["nodeIds"]:
+            outcome, duration = TESTS[node_id]
+            time.sleep(duration)
+            send({"type": "testResult", "runId": data["runId"], "nodeid": node_id, "outcome": outcome,
+                  "duration": duration, "longrepr": None, "pid": os.getpid()})  # fmt: skip
+        result = {"exitCode": 0}
+    job = {"id": job_id, "state": "done", "result": result, "error": None}
+    send({"type": "jobFinished", "vscodeIdentifier": IDENTIFIER, "job": job})
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        job_id = str(next(job_ids))
+        body = json.dumps({"jobId": job_id}).encode()
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+        if data["type"] == "runTests":
+            threading.Thread(target=run_tests, args=(job_id, data)).start()
+        elif data["type"] == "stop":
+            stop.set()
+
+    def log_message(self, format, *args):
+        pass
+
+
+assert "--background" in sys.argv and "--python" in sys.argv
+server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+send({"type": "setup", "blenderPort": server.server_address[1], "vscodeIdentifier": IDENTIFIER})
+stop.wait(60)
@@ -0,0 +1,300 @@
+"""End-to-end load generator for the control plane, running `communication.py` against mocked `bpy`.
+
+A stand-in editor receives the `setup` message and everything Blender sends with `send_dict_as_json`.
+A thread in place of Blender's main thread drains the execution queue like the `always` timer does.
+The operators cannot be imported without Blender, so `reload` and `script` are stand-in actions that
+are registered like the real ones (priority, coalescing) and spend a configurable time in the main thread.
+
+Requests are sent open loop: each one is scheduled at a fixed rate and its latency is measured from the
+scheduled time, so a slow server is not hidden by a slower sender. Everything runs on loopback
+connections, neither Blender nor network access is needed. Used by `bench_control_plane.py`.
+"""
+
+import http.client
+import http.server
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+# method, path and body of the request kinds that can be mixed
+REQUESTS = {
+    "ping": ("GET", "/ping", None),
+    "reload": ("POST", "/", {"type": "reload", "names": ["load_test_addon"], "dirs": ["/load_test_addon"]}),
+    "script": ("POST", "/", {"type": "script", "path": "/load_test_script.py"}),
+}
+DEFAULT_MIX = "ping=50,reload=5,script=10"
+PERCENTILES = (50, 90, 99)
+CLIENT_TIMEOUT = 30.0
+QUEUE_SAMPLE_INTERVAL = 0.01
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse request rates per second, e.g. `ping=50,reload=5,script=10`."""
+    mix = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        kind, _, rate = item.partition("=")
+        kind = kind.strip()
+        if kind not in REQUESTS:
+            raise ValueError(f"Unknown request kind {kind!r}, expected one of: {', '.join(REQUESTS)}")
+        mix[kind] = float(rate)
+    return mix
+
+
+class EditorHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.receive(data)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInEditor(http.server.ThreadingHTTPServer):
+    """Receives the messages of Blender and remembers when jobs finished."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), EditorHandler)
+        self.setup: Optional[Dict] = None
+        self.message_counts: Counter = Counter()
+        self.job_finish_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def receive(self, data: Dict):
+        now = time.perf_counter()
+        with self._lock:
+            self.message_counts[data["type"]] += 1
+            if data["type"] == "setup":
+                self.setup = data
+            elif data["type"] == "jobFinished":
+                self.job_finish_times[data["job"]["id"]] = now
+
+
+class MainThread:
+    """Drains the execution queue like the `always` timer in Blender's main thread."""
+
+    def __init__(self, interval: Optional[float] = None):
+        # None uses the interval returned by `always`, like Blender's timer does
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        from blender_vscode import utils
+
+        while not self._stop.is_set():
+            next_interval = utils.always()
+            self._stop.wait(next_interval if self.interval is None else self.interval)
+
+
+def register_stand_in_actions(reload_cost: float, script_cost: float):
+    from blender_vscode import communication
+    from blender_vscode.utils import PRIORITY_RELOAD, PRIORITY_SCRIPT
+
+    def reload_action(data):
+        time.sleep(reload_cost)
+        return data["names"]
+
+    def script_action(data):
+        time.sleep(script_cost)
+
+    communication.register_post_action(
+        "reload",
+        reload_action,
+        priority=PRIORITY_RELOAD,
+        coalesce=lambda data: frozenset(data["names"]),
+        merge=lambda pending, data: data,
+    )
+    communication.register_post_action("script", script_action, priority=PRIORITY_SCRIPT)
+
+
+def connect(editor: StandInEditor) -> int:
+    """Run `communication.setup` without debugger and return the port of Blender's server from `setup`."""
+    from blender_vscode import communication
+
+    with patch.object(communication, "NO_DEBUG", True), patch.object(communication, "UNIX_SOCKETS", False):
+        communication.setup(editor.address, [], standby=True)
+    assert editor.setup is not None, "setup message did not arrive"
+    return editor.setup["blenderPort"]
+
+
+def send(port: int, kind: str) -> Tuple[int, Optional[str]]:
+    """Send one request. Returns the status (0 when the connection failed) and the id of a queued job."""
+    method, path, data = REQUESTS[kind]
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=CLIENT_TIMEOUT)
+    try:
+        if data is None:
+            connection.request(method, path)
+        else:
+            connection.request(method, path, body=json.dumps(data), headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        body = response.read()
+    except OSError:
+        return 0, None
+    finally:
+        connection.close()
+    job_id = json.loads(body).get("jobId") if response.status == 200 and data is not None else None
+    return response.status, job_id
+
+
+def get_schedule(mix: Dict[str, float], duration: float) -> List[Tuple[float, str]]:
+    """Offsets in seconds at which requests of each kind are sent, evenly spaced per kind."""
+    schedule = []
+    for kind, rate in mix.items():
+        if rate > 0:
+            schedule.extend((i / rate, kind) for i in range(int(duration * rate)))
+    return sorted(schedule)
+
+
+def get_percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    result = {f"p{p}": values[min(len(values) - 1, len(values) * p // 100)] for p in PERCENTILES}
+    result["max"] = values[-1]
+    return result
+
+
+def run_load(
+    mix: Dict[str, float],
+    duration: float = 5.0,
+    reload_cost: float = 0.2,
+    script_cost: float = 0.01,
+    tick_interval: Optional[float] = None,
+    clients: int = 64,
+    drain_timeout: float = 30.0,
+) -> Dict:
+    """Send the request mix for `duration` seconds and wait until the queued jobs are reported as finished.
+
+    `clients` limits the requests in flight, like the connection limit of the editor.
+    """
+    from blender_vscode import metrics
+    from blender_vscode.utils import execution_queue
+
+    editor = StandInEditor()
+    threading.Thread(target=editor.serve_forever, daemon=True).start()
+    register_stand_in_actions(reload_cost, script_cost)
+    port = connect(editor)
+    main_thread = MainThread(tick_interval)
+    main_thread.start()
+
+    depths = []
+    sampling_stopped = threading.Event()
+
+    def sample_queue():
+        while not sampling_stopped.wait(QUEUE_SAMPLE_INTERVAL):
+            depths.append(execution_queue.depth)
+
+    sampler = threading.Thread(target=sample_queue, daemon=True)
+    sampler.start()
+
+    # kind, scheduled time, latency, status, job id
+    samples: List[Tuple[str, float, float, int, Optional[str]]] = []
+    samples_lock = threading.Lock()
+
+    def measure(kind: str, scheduled: float):
+        status, job_id = send(port, kind)
+        latency = time.perf_counter() - scheduled
+        with samples_lock:
+            samples.append((kind, scheduled, latency, status, job_id))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for offset, kind in get_schedule(mix, duration):
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(measure, kind, scheduled)
+    load_end = time.perf_counter()
+
+    job_ids = {job_id for *_, job_id in samples if job_id is not None}
+    deadline = load_end + drain_timeout
+    while not job_ids.issubset(editor.job_finish_times) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    drain_time = time.perf_counter() - load_end
+
+    sampling_stopped.set()
+    sampler.join()
+    main_thread.stop()
+    editor.shutdown()
+    editor.server_close()
+
+    requests = {}
+    for kind in mix:
+        kind_samples = [sample for sample in samples if sample[0] == kind]
+        statuses = Counter(status for _, _, _, status, _ in kind_samples)
+        completions = [
+            editor.job_finish_times[job_id] - scheduled
+            for _, scheduled, _, _, job_id in kind_samples
+            if job_id in editor.job_finish_times
+        ]
+        requests[kind] = {
+            "sent": len(kind_samples),
+            "ok": statuses[200],
+            "rejected": statuses[503],
+            "failed": len(kind_samples) - statuses[200] - statuses[503],
+            "throughput": statuses[200] / (load_end - start),
+            "latency": get_percentiles([latency for _, _, latency, status, _ in kind_samples if status == 200]),
+            # until the editor got `jobFinished`, coalesced requests share the job of the first one
+            "completion": get_percentiles(completions),
+        }
+
+    return {
+        "duration": load_end - start,
+        "requests": requests,
+        "queue": {
+            **execution_queue.get_stats(),
+            "meanDepth": statistics.mean(depths) if depths else 0.0,
+        },
+        "rejectedByServer": metrics.REJECTED_REQUESTS.get(),
+        "drainTime": drain_time,
+        "unfinishedJobs": len(job_ids - set(editor.job_finish_times)),
+        "editorMessages": dict(editor.message_counts),
+    }
+
+
+def format_report(report: Dict) -> str:
+    def format_times(times: Dict[str, float]) -> str:
+        return " ".join(f"{name} {value * 1000:.1f}ms" for name, value in times.items()) or "-"
+
+    lines = [f"load: {report['duration']:.1f}s, drained after {report['drainTime']:.2f}s"]
+    for kind, stats in report["requests"].items():
+        lines.append(
+            f"{kind:>7}: {stats['sent']} sent, {stats['ok']} ok, {stats['rejected']} rejected, "
+            f"{stats['failed']} failed, {stats['throughput']:.1f}/s"
+        )
+        lines.append(f"         latency    {format_times(stats['latency'])}")
+        if stats["completion"]:
+            lines.append(f"         completion {format_times(stats['completion'])}")
+    queue = report["queue"]
+    lines.append(
+        f"  queue: max depth {queue['maxDepth']}, mean depth {queue['meanDepth']:.1f}, "
+        f"{queue['enqueued']} enqueued, {queue['coalesced']} coalesced, "
+        f"max wait {queue['maxWaitTime'] * 1000:.1f}ms, mean wait {queue['meanWaitTime'] * 1000:.1f}ms"
+    )
+    lines.append(f" editor: {report['editorMessages']}, unfinished jobs {report['unfinishedJobs']}")
+    return "\n".join(lines)
@@ -0,0 +1,43 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+ADDONS = [{"load_dir": "/project/my_addon", "module_name": "my_addon"}]
+PATH_MAPPINGS = [{"src": "/project/my_addon", "load": "/4.2/scripts/addons/my_addon"}]
+
+
+class TestAssignAddons:
+    @patch("blender_vscode.load_addons.load")
+    @patch("blender_vscode.load_addons.setup_addon_links", return_value=PATH_MAPPINGS)
+    def test_assign_addons_links_and_loads(self, setup_addon_links, load):
+        import blender_vscode
+
+        addons = blender_vscode.parse_addons_to_load(ADDONS)
+        assert blender_vscode.assign_addons(addons) == PATH_MAPPINGS
+        setup_addon_links.assert_called_once_with(addons)
+        load.assert_called_once_with(addons)
+        assert addons[0].load_dir == Path("/project/my_addon")
+
+    @patch("blender_vscode.load_addons.load")
+    @patch("blender_vscode.load_addons.setup_addon_links", return_value=PATH_MAPPINGS)
+    def test_assign_addons_request(self, setup_addon_links, load):
+        from blender_vscode import communication, jobs, utils
+        from blender_vscode.operators import addon_assign
+
+        addon_assign.register()
+        with patch.object(addon_assign, "send_dict_as_json") as send, patch.object(
+            addon_assign, "VSCODE_IDENTIFIER", "instance-1"
+        ), patch.object(communication, "send_job_finished"):
+            response = communication.SERVER.test_client().post("/", json={"type": "assignAddons", "addons": ADDONS})
+            assert response.status_code == 200
+            job = jobs.get_job(response.get_json()["jobId"])
+            # addons are loaded in the main thread
+            load.assert_not_called()
+            utils.always()
+
+        assert job.state == jobs.DONE
+        assert [addon.module_name for addon in load.call_args.args[0]] == ["my_addon"]
+        send.assert_called_once_with(
+            {"type": "addonsAssigned", "addonPathMappings": PATH_MAPPINGS, "vscodeIdentifier": "instance-1"}
+        )
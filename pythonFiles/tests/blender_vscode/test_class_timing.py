@@ -0,0 +1,52 @@
+import sys
+import types
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class Panel:
+    @classmethod
+    def poll(cls, context):
+        return context is not None
+
+    def draw(self, context):
+        return "drawn"
+
+
+def make_auto_load_addon(module_name: str):
+    auto_load = types.ModuleType(module_name + ".auto_load")
+    Panel.__module__ = module_name + ".ui"
+    auto_load.ordered_classes = [Panel]
+    sys.modules[auto_load.__name__] = auto_load
+
+
+class TestClassTiming:
+    def test_wrap_and_restore(self):
+        from blender_vscode import class_timing
+
+        make_auto_load_addon("timed_addon")
+        draw, poll = Panel.__dict__["draw"], Panel.__dict__["poll"]
+
+        class_timing.enable(["timed_addon"])
+        assert Panel.__dict__["draw"] is not draw
+        assert isinstance(Panel.__dict__["poll"], classmethod)
+        assert Panel.poll(object())
+        for _ in range(3):
+            assert Panel().draw(None) == "drawn"
+
+        entries = {entry["method"]: entry for entry in class_timing.get_entries()}
+        assert entries["draw"]["count"] == 3
+        assert entries["draw"]["class"] == "timed_addon.ui.Panel"
+        assert entries["poll"]["count"] == 1
+
+        class_timing.unwrap_addon("timed_addon")
+        assert Panel.__dict__["draw"] is draw
+        # wrapped again after the addon is enabled
+        class_timing.wrap_addon("timed_addon")
+        assert Panel.__dict__["draw"] is not draw
+
+        class_timing.disable()
+        assert Panel.__dict__["draw"] is draw
+        assert Panel.__dict__["poll"] is poll
+        class_timing.reset()
+        assert class_timing.get_entries() == []
@@ -0,0 +1,154 @@
+import http.client
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+@pytest.fixture
+def server():
+    from blender_vscode import communication, control_server
+
+    httpd = control_server.ControlServer("127.0.0.1", 0, communication.SERVER, workers=1, backlog=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(server, method: str, path: str, data=None, timeout: float = 5.0):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=timeout)
+    body = None if data is None else json.dumps(data)
+    connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    result = response.status, response.read()
+    connection.close()
+    return result
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+
+
+class TestControlServer:
+    def test_ping_while_workers_are_busy(self, server):
+        from blender_vscode import communication
+
+        release = threading.Event()
+        communication.register_post_handler("blockingTest", lambda data: "OK" if release.wait(5) else "timeout")
+        blocked = threading.Thread(target=request, args=(server, "POST", "/", {"type": "blockingTest"}))
+        blocked.start()
+        wait_for(lambda: server.active == 1)
+
+        start = time.perf_counter()
+        assert request(server, "GET", "/ping") == (200, b"OK")
+        assert time.perf_counter() - start < 0.5
+        status, body = request(server, "POST", "/", {"type": "cancelJob", "jobId": "1"})
+        assert status == 503 and b"busy" in body
+
+        release.set()
+        blocked.join()
+        wait_for(lambda: server.active == 0)
+        assert request(server, "POST", "/", {"type": "cancelJob", "jobId": "unknown"})[0] == 404
+
+    def test_handler_timeout(self, server):
+        from blender_vscode import communication, metrics
+
+        communication.register_post_handler("slowTest", lambda data: time.sleep(0.5) or "OK", timeout=0.05)
+        status, body = request(server, "POST", "/", {"type": "slowTest"})
+        assert status == 504 and b"0.05s" in body
+        assert metrics.HANDLER_TIMEOUTS.get("slowTest") == 1
+
+    def test_request_size_limit(self, server):
+        from blender_vscode import communication
+
+        with patch.dict(communication.SERVER.config, MAX_CONTENT_LENGTH=1024):
+            status, _ = request(server, "POST", "/", {"type": "scriptContent", "source": "x" * 2048})
+        assert status == 413
+
+    def test_silent_client_does_not_block_accepting(self, server):
+        import socket
+
+        from blender_vscode import communication
+
+        release = threading.Event()
+        communication.register_post_handler("blockingTest", lambda data: "OK" if release.wait(5) else "timeout")
+        blocked = threading.Thread(target=request, args=(server, "POST", "/", {"type": "blockingTest"}))
+        blocked.start()
+        wait_for(lambda: server.active == 1)
+
+        # connects but sends nothing, its request is peeked at until PEEK_TIMEOUT_WHEN_BUSY
+        silent = socket.create_connection(("127.0.0.1", server.server_port))
+        try:
+            time.sleep(0.05)
+            start = time.perf_counter()
+            assert request(server, "GET", "/ping") == (200, b"OK")
+            assert time.perf_counter() - start < 0.5
+        finally:
+            silent.close()
+            release.set()
+            blocked.join()
+
+    def test_idle_connections_beyond_triage_backlog_are_rejected(self, server):
+        import socket
+
+        from blender_vscode import control_server, metrics
+
+        rejected = metrics.REJECTED_REQUESTS.get()
+        # each idle connection keeps a triage thread for PEEK_TIMEOUT_WHEN_BUSY and more
+        idle = [
+            socket.create_connection(("127.0.0.1", server.server_port))
+            for _ in range(control_server.TRIAGE_WORKERS + control_server.TRIAGE_BACKLOG)
+        ]
+        try:
+            wait_for(lambda: server.triage_slots._value == 0)
+            start = time.perf_counter()
+            status, body = request(server, "POST", "/", {"type": "cancelJob", "jobId": "1"})
+            assert status == 503 and b"busy" in body
+            assert time.perf_counter() - start < 0.5
+            assert metrics.REJECTED_REQUESTS.get() == rejected + 1
+        finally:
+            for connection in idle:
+                connection.close()
+        # the triage slots are free again once the idle connections are handled
+        wait_for(lambda: server.triage_slots._value == control_server.TRIAGE_WORKERS + control_server.TRIAGE_BACKLOG)
+        assert request(server, "GET", "/ping") == (200, b"OK")
+
+
+class TestHandlerPool:
+    def test_timed_out_handlers_count_against_capacity(self):
+        from blender_vscode import control_server
+
+        pool = control_server.HandlerPool(1)
+        release = threading.Event()
+        with pytest.raises(TimeoutError):
+            pool.run(lambda: release.wait(5), timeout=0.01)
+        assert pool.overdue == 1
+        # the stuck handler still occupies the only thread
+        with pytest.raises(control_server.HandlersBusy, match="1 of them with timed out handlers"):
+            pool.run(lambda: "OK", timeout=1.0)
+
+        release.set()
+        wait_for(lambda: pool.overdue == 0)
+        assert pool.run(lambda: "OK", timeout=1.0) == "OK"
+
+    def test_busy_handlers_are_answered_with_503(self):
+        from blender_vscode import communication, control_server
+
+        release = threading.Event()
+        communication.register_post_handler("stuckTest", lambda data: "OK" if release.wait(5) else "timeout", 0.01)
+        client = communication.SERVER.test_client()
+        with patch.object(control_server, "_handler_pool", control_server.HandlerPool(1)):
+            assert client.post("/", json={"type": "stuckTest"}).status_code == 504
+            response = client.post("/", json={"type": "stuckTest"})
+            release.set()
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert "blender_vscode_overdue_handlers" in communication.SERVER.test_client().get("/metrics").get_data(True)
@@ -0,0 +1,155 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class Collection(list):
+    pass
+
+
+class Object(SimpleNamespace):
+    pass
+
+
+class Mesh(SimpleNamespace):
+    pass
+
+
+def make_bpy():
+    objects = Collection(
+        Object(name=f"Cube.{index:03}", users=1, type="MESH", data=SimpleNamespace(name="Cube")) for index in range(5)
+    )
+    return SimpleNamespace(
+        data=SimpleNamespace(objects=objects, meshes={"Cube": Mesh(name="Cube", attributes={})}, filepath=""),
+        types=SimpleNamespace(bpy_prop_collection=Collection, Object=Object, Mesh=Mesh),
+    )
+
+
+def post(data):
+    from blender_vscode import communication
+
+    response = communication.SERVER.test_client().post("/", json=data)
+    return response.status_code, response.get_json()
+
+
+class TestListCollection:
+    def test_pages(self):
+        from blender_vscode.operators import data_query
+
+        with patch("blender_vscode.operators.data_query.bpy", make_bpy()):
+            page = data_query.list_collection("objects", 3, 10)
+        assert page["total"] == 5
+        assert [item["name"] for item in page["items"]] == ["Cube.003", "Cube.004"]
+        assert page["items"][0] == {"name": "Cube.003", "users": 1, "type": "MESH", "data": "Cube"}
+
+    def test_invalid_arguments(self):
+        from blender_vscode.operators import data_query
+
+        with patch("blender_vscode.operators.data_query.bpy", make_bpy()):
+            with pytest.raises(ValueError):
+                data_query.list_collection("filepath", 0, 10)
+            with pytest.raises(ValueError):
+                data_query.list_collection("objects", -5, 10)
+            with pytest.raises(ValueError):
+                data_query.list_collection("objects", 0, 0)
+
+    @pytest.mark.parametrize(
+        "page", [{"offset": -5}, {"limit": 0}, {"offset": "first"}, {"offset": None}, {"limit": True}]
+    )
+    def test_invalid_page_is_rejected_without_job(self, page):
+        from blender_vscode import jobs
+        from blender_vscode.operators import data_query
+
+        data_query.register()
+        status, body = post({"type": "query", "query": "list", "collection": "objects", **page})
+        assert status == 400
+        assert "error" in body
+        assert jobs.get_jobs() == []
+
+
+class TestValidateQuery:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"query": "tables"},
+            {},
+            {"query": "list"},
+            {"query": "attributeSummary", "mesh": 3},
+            {"query": "attributeSummary", "mesh": "Cube", "attributes": "position"},
+            {"query": "attributeData", "mesh": "Cube"},
+        ],
+    )
+    def test_rejected(self, data):
+        from blender_vscode.operators import data_query
+
+        with pytest.raises(ValueError):
+            data_query.validate_query(data)
+
+    def test_accepted(self):
+        from blender_vscode.operators import data_query
+
+        data_query.validate_query({"query": "list", "collection": "objects", "offset": "2"})
+        data_query.validate_query({"query": "attributeSummary", "mesh": "Cube", "attributes": ["position"]})
+        data_query.validate_query({"query": "attributeData", "mesh": "Cube", "attribute": "position"})
+
+
+class TestMissingData:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"query": "attributeSummary", "mesh": "Sphere"},
+            {"query": "attributeData", "mesh": "Sphere", "attribute": "position"},
+            {"query": "attributeData", "mesh": "Cube", "attribute": "position"},
+        ],
+    )
+    def test_unknown_mesh_or_attribute_is_not_found(self, data):
+        from blender_vscode import utils
+        from blender_vscode.operators import data_query
+
+        data_query.register()
+        with patch("blender_vscode.operators.data_query.bpy", make_bpy()):
+            main_thread = threading.Timer(0.05, utils.always)
+            main_thread.start()
+            status, body = post({"type": "query", **data})
+            main_thread.join()
+        assert status == 404
+        assert "Unknown" in body["error"]
+
+
+class TestRegisterPostQuery:
+    def test_result(self):
+        from blender_vscode import communication, utils
+
+        communication.register_post_query("echoQuery", lambda data: {"echo": data["value"]}, timeout=5)
+        # the main thread drains the queue while the server waits for the result
+        timer = threading.Timer(0.05, utils.always)
+        timer.start()
+        assert post({"type": "echoQuery", "value": 3}) == (200, {"echo": 3})
+        timer.join()
+
+    def test_timeout_before_start_cancels_job(self):
+        from blender_vscode import communication, jobs
+
+        calls = []
+        communication.register_post_query("idleQuery", calls.append, timeout=0.05)
+        status, body = post({"type": "idleQuery"})
+        assert status == 504
+        assert body["job"]["state"] == jobs.CANCELLED
+        assert calls == []
+
+    def test_timeout_while_running_returns_job_id(self):
+        from blender_vscode import communication, jobs, utils
+
+        release = threading.Event()
+        communication.register_post_query("slowQuery", lambda data: release.wait(5), timeout=0.05)
+        main_thread = threading.Timer(0.01, utils.always)
+        main_thread.start()
+        status, body = post({"type": "slowQuery"})
+        release.set()
+        main_thread.join()
+        assert status == 504
+        assert jobs.get_job(body["jobId"]).state == jobs.DONE
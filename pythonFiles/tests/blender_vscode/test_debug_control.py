@@ -0,0 +1,35 @@
+import sys
+from unittest.mock import Mock, patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class TestDebugControl:
+    def test_listen_suspend_and_resume(self):
+        from blender_vscode import communication, debug_control
+
+        debugpy = Mock(**{"is_client_connected.return_value": False})
+        with patch.dict(sys.modules, debugpy=debugpy), patch.object(
+            communication, "start_debug_server", return_value=5678
+        ) as start_debug_server, patch("blender_vscode.installation.ensure_packages_are_installed") as ensure_installed:
+            assert debug_control.get_state() == debug_control.DISABLED
+
+            assert debug_control.listen() == 5678
+            # not installed when Blender was started without debugger
+            ensure_installed.assert_called_once_with(["debugpy"])
+            assert debug_control.get_state() == debug_control.LISTENING
+            debugpy.is_client_connected.return_value = True
+            assert debug_control.get_state() == debug_control.ATTACHED
+
+            debug_control.suspend()
+            debugpy.trace_this_thread.assert_called_with(False)
+            assert debug_control.to_dict() == {"state": "suspended", "port": 5678, "mainThreadTracing": False}
+            debug_control.resume()
+            debugpy.trace_this_thread.assert_called_with(True)
+            assert debug_control.get_state() == debug_control.ATTACHED
+
+            # debugpy listens only once per process, the editor attaches to the same port again
+            assert debug_control.listen() == 5678
+            start_debug_server.assert_called_once()
+            ensure_installed.assert_called_once()
+            assert debug_control.get_state() == debug_control.ATTACHED
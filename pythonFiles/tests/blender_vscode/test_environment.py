@@ -0,0 +1,25 @@
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class TestEnvironment:
+    def test_malformed_numbers_fall_back_to_defaults(self, monkeypatch, caplog):
+        monkeypatch.setenv("VSCODE_STALL_THRESHOLD", "2.5")
+        monkeypatch.setenv("VSCODE_SERVER_WORKERS", "eight")
+        monkeypatch.setenv("VSCODE_MAX_REQUEST_SIZE", "1.5")
+        monkeypatch.setenv("VSCODE_HANDLER_TIMEOUT", "")
+
+        from blender_vscode import environment
+
+        assert environment.STALL_THRESHOLD == 2.5
+        assert environment.SERVER_WORKERS == 8
+        assert environment.MAX_REQUEST_SIZE == 64 * 1024 * 1024
+        assert environment.HANDLER_TIMEOUT == 30.0
+        assert "Invalid value for VSCODE_SERVER_WORKERS: 'eight'" in caplog.text
+        assert "Invalid value for VSCODE_MAX_REQUEST_SIZE: '1.5'" in caplog.text
+
+    def test_standby_flag(self, monkeypatch):
+        monkeypatch.setenv("VSCODE_STANDBY", "false")
+
+        from blender_vscode import environment
+
+        assert environment.STANDBY is False
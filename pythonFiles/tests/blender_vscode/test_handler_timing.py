@@ -0,0 +1,84 @@
+import sys
+import types
+from unittest.mock import Mock, patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def make_addon_callback(module_name: str):
+    module = types.ModuleType(module_name)
+    exec("def on_frame_change(scene):\n    return scene\n", module.__dict__)
+    module.on_frame_change._bpy_persistent = None
+    sys.modules[module_name] = module
+    return module.on_frame_change
+
+
+class TestHandlerTiming:
+    @patch("blender_vscode.handler_timing.bpy")
+    def test_wrap_and_unwrap(self, bpy):
+        from blender_vscode import handler_timing
+
+        callback = make_addon_callback("timed_addon")
+        other = make_addon_callback("other_addon")
+        bpy.app.handlers = Mock(
+            spec=["frame_change_pre", "load_pre", "load_post"],
+            frame_change_pre=[callback, other],
+            load_pre=[],
+            load_post=[],
+        )
+        handlers = bpy.app.handlers.frame_change_pre
+
+        handler_timing.enable(["timed_addon"])
+        assert handlers[0] is not callback
+        assert handlers[0].__wrapped__ is callback
+        assert handlers[0].__qualname__ == "on_frame_change"
+        assert handlers[1] is other
+
+        for _ in range(3):
+            assert handlers[0]("scene") == "scene"
+        report = handler_timing.get_report()
+        assert report["callbacks"][0]["callback"] == "timed_addon.on_frame_change"
+        assert report["callbacks"][0]["count"] == 3
+
+        handler_timing.disable()
+        assert handlers[0] is callback and handlers[1] is other
+        assert bpy.app.handlers.load_pre == [] and bpy.app.handlers.load_post == []
+        handler_timing.reset()
+
+    @patch("blender_vscode.handler_timing.bpy")
+    def test_addon_removes_its_wrapped_callback(self, bpy):
+        from blender_vscode import handler_timing
+
+        callback = make_addon_callback("timed_addon")
+        bpy.app.handlers = Mock(
+            spec=["frame_change_pre", "load_pre", "load_post"], frame_change_pre=[callback], load_pre=[], load_post=[]
+        )
+        handlers = bpy.app.handlers.frame_change_pre
+
+        handler_timing.enable(["timed_addon"])
+        assert handlers[0] is not callback
+        # what an addon does in its unregister
+        assert callback in handlers
+        handlers.remove(callback)
+        assert handlers == []
+        handler_timing.disable()
+
+    @patch("blender_vscode.handler_timing.bpy")
+    def test_callbacks_are_unwrapped_while_a_file_loads(self, bpy):
+        from blender_vscode import handler_timing
+
+        callback = make_addon_callback("timed_addon")
+        bpy.app.handlers = Mock(
+            spec=["frame_change_pre", "load_pre", "load_post"], frame_change_pre=[callback], load_pre=[], load_post=[]
+        )
+        handlers = bpy.app.handlers
+
+        handler_timing.enable(["timed_addon"])
+        # Blender keeps only functions with the mark of @persistent, the load handlers have it
+        assert "_bpy_persistent" in handlers.load_pre[0].__dict__
+        assert "_bpy_persistent" in handlers.load_post[0].__dict__
+        handlers.load_pre[0](None)
+        assert handlers.frame_change_pre[0] is callback
+        handlers.load_post[0](None)
+        assert handler_timing.is_timed(handlers.frame_change_pre[0])
+        handler_timing.disable()
@@ -0,0 +1,145 @@
+import functools
+import importlib
+import sys
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+SOURCE = """
+import functools
+
+counter = []
+
+
+def decorate(function):
+    @functools.wraps(function)
+    def wrapper(*args):
+        return function(*args)
+
+    return wrapper
+
+
+def greet(name):
+    counter.append(name)
+    return "Hello " + name
+
+
+@decorate
+def shout(name):
+    return name.upper()
+
+
+class Operator:
+    label = "Greet"
+
+    def execute(self, context):
+        return greet(context)
+
+    @staticmethod
+    def poll(context):
+        return True
+"""
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch):
+    from blender_vscode import hot_patch
+
+    package = tmp_path / "hot_patch_addon"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "ops.py").write_text(SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("hot_patch_addon.ops")
+    hot_patch.enable()
+    hot_patch.remember_addon("hot_patch_addon")
+    yield module, package / "ops.py"
+    hot_patch.disable()
+    for name in ("hot_patch_addon", "hot_patch_addon.ops"):
+        sys.modules.pop(name, None)
+
+
+def change(path, old: str, new: str):
+    source = path.read_text()
+    assert old in source
+    path.write_text(source.replace(old, new))
+
+
+class TestHotPatch:
+    def test_function_bodies_are_patched_in_place(self, addon):
+        from blender_vscode import hot_patch
+
+        module, path = addon
+        greet, operator = module.greet, module.Operator()
+        assert operator.execute("Blender") == "Hello Blender"
+
+        change(path, '"Hello " + name', '"Hi " + name')
+        change(path, "return name.upper()", "return name.lower()")
+        change(path, "return True", "return False")
+        assert hot_patch.try_patch([str(path)]) == [
+            "hot_patch_addon.ops.greet",
+            "hot_patch_addon.ops.shout",
+            "hot_patch_addon.ops.Operator.poll",
+        ]
+        # same objects, new behaviour, module state kept
+        assert module.greet is greet
+        assert operator.execute("Blender") == "Hi Blender"
+        assert module.shout("Blender") == "blender"
+        assert module.Operator.poll(None) is False
+        assert module.counter == ["Blender", "Blender"]
+
+    def test_moved_functions_get_new_line_numbers(self, addon):
+        from blender_vscode import hot_patch
+
+        module, path = addon
+        line = module.Operator.execute.__code__.co_firstlineno
+        change(path, "    counter.append(name)\n", "    counter.append(name)\n    counter.append(name)\n")
+        assert hot_patch.try_patch([str(path)]) == ["hot_patch_addon.ops.greet"]
+        assert module.Operator.execute.__code__.co_firstlineno == line + 1
+
+    def test_wrapped_methods_are_found(self, addon):
+        from blender_vscode import hot_patch
+
+        module, path = addon
+        original = module.Operator.execute
+
+        @functools.wraps(original)
+        def timed(*args):
+            return original(*args)
+
+        module.Operator.execute = timed
+        change(path, "return greet(context)", "return greet(context) + '!'")
+        assert hot_patch.try_patch([str(path)]) == ["hot_patch_addon.ops.Operator.execute"]
+        assert module.Operator().execute("Blender") == "Hello Blender!"
+
+    @pytest.mark.parametrize(
+        "old, new",
+        [
+            ("def greet(name):", "def greet(name, suffix=''):"),
+            ("counter = []", "counter = [1]"),
+            ('label = "Greet"', 'label = "Hello"'),
+            ("    @staticmethod\n", ""),
+            ("class Operator:", "def added():\n    pass\n\n\nclass Operator:"),
+            ("return True", "return True +"),
+        ],
+    )
+    def test_other_changes_need_a_reload(self, addon, old, new):
+        from blender_vscode import hot_patch
+
+        module, path = addon
+        greet_code = module.greet.__code__
+        change(path, '"Hello " + name', '"Hi " + name')
+        change(path, old, new)
+        with pytest.raises(hot_patch.PatchNotPossible):
+            hot_patch.try_patch([str(path)])
+        # all or nothing
+        assert module.greet.__code__ is greet_code
+
+    def test_unknown_file_needs_a_reload(self, addon, tmp_path):
+        from blender_vscode import hot_patch
+
+        other = tmp_path / "other.py"
+        other.write_text("def f():\n    pass\n")
+        with pytest.raises(hot_patch.PatchNotPossible, match="not a module of a loaded addon"):
+            hot_patch.try_patch([str(other)])
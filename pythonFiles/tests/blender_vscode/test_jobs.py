@@ -0,0 +1,139 @@
+import time
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def drain_main_thread_queue():
+    from blender_vscode import utils
+
+    utils.always()
+
+
+class TestJobs:
+    def test_job_runs_in_main_thread_tick(self):
+        from blender_vscode import jobs
+
+        finished = []
+        job = jobs.submit("reload", {"names": ["a"]}, lambda data: data["names"], on_finish=finished.append)
+        assert job.state == jobs.QUEUED
+
+        drain_main_thread_queue()
+
+        assert job.state == jobs.DONE
+        assert job.result == ["a"]
+        assert finished == [job]
+        info = job.to_dict()
+        assert info["waitTime"] >= 0
+        assert info["runTime"] >= 0
+
+    def test_failed_job_reports_error(self):
+        from blender_vscode import jobs
+
+        def handler(data):
+            raise ValueError("broken script")
+
+        job = jobs.submit("script", {}, handler)
+        drain_main_thread_queue()
+
+        assert job.state == jobs.FAILED
+        assert "broken script" in job.error
+
+    def test_cancel_only_while_queued(self):
+        from blender_vscode import jobs
+
+        calls = []
+        job = jobs.submit("script", {}, calls.append)
+        assert jobs.cancel_job(job.id)
+        drain_main_thread_queue()
+
+        assert job.state == jobs.CANCELLED
+        assert calls == []
+        assert not job.cancel()
+
+    def test_request_after_cancel_is_not_coalesced_into_cancelled_job(self):
+        from blender_vscode import jobs
+
+        calls = []
+        cancelled = jobs.submit("reload", {"n": 1}, calls.append, coalesce_key="reload")
+        assert cancelled.cancel()
+        job = jobs.submit("reload", {"n": 2}, calls.append, coalesce_key="reload")
+        assert job is not cancelled
+        drain_main_thread_queue()
+
+        assert job.state == jobs.DONE
+        assert calls == [{"n": 2}]
+
+    def test_finished_jobs_are_evicted_after_ttl(self):
+        from blender_vscode import jobs
+
+        job = jobs.submit("script", {}, lambda data: None)
+        drain_main_thread_queue()
+        assert jobs.get_job(job.id) is job
+
+        job.finished_at = time.time() - jobs.JOB_TTL_SECONDS - 1
+        assert jobs.get_job(job.id) is None
+
+    def test_coalesced_job_uses_latest_data(self):
+        from blender_vscode import jobs
+
+        seen = []
+        first = jobs.submit("reload", {"n": 1}, lambda data: seen.append(data["n"]), coalesce_key="addon")
+        second = jobs.submit("reload", {"n": 2}, lambda data: seen.append(data["n"]), coalesce_key="addon")
+        assert second is first
+        assert first.coalesced == 1
+
+        drain_main_thread_queue()
+        assert seen == [2]
+
+    def test_coalesced_request_does_not_use_up_an_id(self):
+        from blender_vscode import jobs
+
+        first = jobs.submit("reload", {}, lambda data: None, coalesce_key="addon")
+        jobs.submit("reload", {}, lambda data: None, coalesce_key="addon")
+        other = jobs.submit("script", {}, lambda data: None)
+        assert int(other.id) == int(first.id) + 1
+        drain_main_thread_queue()
+
+
+class TestMainThreadQueue:
+    def test_priorities_run_before_fifo_order(self):
+        from blender_vscode import utils
+
+        calls = []
+        utils.run_in_main_thread(lambda: calls.append("script"), priority=utils.PRIORITY_SCRIPT)
+        utils.run_in_main_thread(lambda: calls.append("reload"), priority=utils.PRIORITY_RELOAD)
+        utils.run_in_main_thread(lambda: calls.append("stop"), priority=utils.PRIORITY_STOP)
+        utils.run_in_main_thread(lambda: calls.append("script2"), priority=utils.PRIORITY_SCRIPT)
+
+        utils.always()
+        assert calls == ["stop", "reload", "script", "script2"]
+
+    def test_coalescing_and_stats(self):
+        from blender_vscode import utils
+
+        calls = []
+        for _ in range(5):
+            utils.run_in_main_thread(lambda: calls.append("reload"), coalesce_key=("reload", "addon"))
+        assert utils.execution_queue.qsize() == 1
+
+        utils.always()
+        assert calls == ["reload"]
+        stats = utils.execution_queue.get_stats()
+        assert stats["depth"] == 0
+        assert stats["coalesced"] == 4
+        assert stats["executed"] == 1
+
+        # once the entry left the queue, the key can be queued again
+        utils.run_in_main_thread(lambda: calls.append("reload"), coalesce_key=("reload", "addon"))
+        assert utils.execution_queue.qsize() == 1
+
+    def test_cancelled_entry_is_skipped(self):
+        from blender_vscode import utils
+
+        calls = []
+        entry = utils.run_in_main_thread(lambda: calls.append("script"))
+        assert utils.execution_queue.cancel(entry)
+        assert not utils.execution_queue.cancel(entry)
+
+        utils.always()
+        assert calls == []
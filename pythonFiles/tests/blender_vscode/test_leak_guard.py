@@ -0,0 +1,110 @@
+import sys
+import types
+from unittest.mock import Mock, patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def make_addon_module(name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    exec("def on_depsgraph_update(scene):\n    pass\n\ndef on_timer():\n    return 1.0\n", module.__dict__)
+    sys.modules[name] = module
+    return module
+
+
+class FakeTimers:
+    def __init__(self):
+        self.registered = []
+
+    def register(self, function, first_interval=0):
+        self.registered.append(function)
+
+    def unregister(self, function):
+        self.registered.remove(function)
+
+    def is_registered(self, function):
+        return function in self.registered
+
+
+class TestLeakGuard:
+    @patch("blender_vscode.leak_guard.bpy")
+    def test_stale_handler_and_timer_are_found_and_removed(self, bpy):
+        from blender_vscode import leak_guard
+        from blender_vscode.utils import purge_modules
+
+        timers = FakeTimers()
+        bpy.app.timers = timers
+        bpy.app.handlers = Mock(spec=["depsgraph_update_post"], depsgraph_update_post=[])
+        leak_guard.install_timers()
+
+        module = make_addon_module("leaky_addon")
+        bpy.app.handlers.depsgraph_update_post.append(module.on_depsgraph_update)
+        bpy.app.timers.register(module.on_timer)
+
+        module_refs = leak_guard.watch_modules("leaky_addon")
+        purge_modules("leaky_addon")
+        del module
+
+        report = leak_guard.check("leaky_addon", module_refs, remove=False)
+        kinds = sorted(callback["kind"] for callback in report["staleCallbacks"])
+        assert kinds == ["handler:depsgraph_update_post", "timer"]
+        assert not report["removed"]
+
+        report = leak_guard.check("leaky_addon", module_refs, remove=True)
+        assert report["removed"]
+        assert bpy.app.handlers.depsgraph_update_post == []
+        assert timers.registered == []
+        assert leak_guard.check("leaky_addon", module_refs)["staleCallbacks"] == []
+
+    @patch("blender_vscode.leak_guard.bpy")
+    def test_collected_module_is_not_reported(self, bpy):
+        from blender_vscode import leak_guard
+        from blender_vscode.utils import purge_modules
+
+        bpy.app.handlers = Mock(spec=[])
+        make_addon_module("clean_addon")
+        module_refs = leak_guard.watch_modules("clean_addon")
+        purge_modules("clean_addon")
+
+        report = leak_guard.check("clean_addon", module_refs)
+        assert report["staleModules"] == []
+        assert report["staleCallbacks"] == []
+
+    @patch("blender_vscode.leak_guard.bpy")
+    def test_purged_extension_is_not_kept_by_its_repository(self, bpy):
+        from blender_vscode import leak_guard
+        from blender_vscode.utils import purge_modules
+
+        bpy.app.handlers = Mock(spec=[])
+        repository = types.ModuleType("bl_ext.user_default")
+        sys.modules["bl_ext.user_default"] = repository
+        try:
+            # the import system sets the submodule as attribute of its package
+            repository.my_extension = make_addon_module("bl_ext.user_default.my_extension")
+            module_refs = leak_guard.watch_modules("bl_ext.user_default.my_extension")
+            purge_modules("bl_ext.user_default.my_extension")
+
+            report = leak_guard.check("bl_ext.user_default.my_extension", module_refs)
+            assert report["staleModules"] == []
+            assert not hasattr(repository, "my_extension")
+        finally:
+            del sys.modules["bl_ext.user_default"]
+
+    @patch("blender_vscode.leak_guard.bpy")
+    def test_registration_functions_are_wrapped_only_while_enabled(self, bpy):
+        from blender_vscode import leak_guard
+
+        timers = FakeTimers()
+        bpy.app.timers = timers
+        register = timers.register
+        assert not leak_guard.is_enabled()
+
+        leak_guard.enable()
+        assert timers.register is not register
+        timers.register(make_addon_module("tracked_addon").on_timer)
+        assert len(leak_guard._registrations) == 1
+
+        leak_guard.disable()
+        assert timers.register == register
+        assert leak_guard._registrations == []
+        del sys.modules["tracked_addon"]
@@ -1,6 +1,7 @@
 import contextlib
 import os.path
 import sys
+import types
 from pathlib import Path
 from typing import Dict
 from unittest.mock import MagicMock, patch, Mock, PropertyMock
@@ -14,6 +15,7 @@ def bpy_global_defaults(request: pytest.FixtureRequest):
     # when fake-bpy-module is installed: override it
     # when bpy is not available: provide Mock for further patching
     sys.modules["bpy"] = Mock()
+    sys.modules["bpy.props"] = bpy_props_module()
     sys.modules["addon_utils"] = Mock()
     # DANGER: patching imports with global scope. Use returned patches to modify those values.
     # those defaults are required by global variables in blender_vscode.environment
@@ -51,6 +53,15 @@ def bpy_global_defaults(request: pytest.FixtureRequest):
                 pass
 
 
+def bpy_props_module() -> types.ModuleType:
+    # operators use `from bpy.props import *`
+    module = types.ModuleType("bpy.props")
+    module.__all__ = ["BoolProperty", "FloatProperty", "IntProperty", "StringProperty", "EnumProperty"]
+    for name in module.__all__:
+        setattr(module, name, Mock(name=name))
+    return module
+
+
 def bpy_utils_user_resource(resource_type, path=None):
     if resource_type == "SCRIPTS":
         return os.path.sep.join(("", "4.2", "scripts", path))
@@ -430,3 +441,80 @@ class TestLoad:
         is_addon_legacy.assert_called_once()
         addon_refresh.assert_called_once()
         repo_refresh_all.assert_not_called()
+
+
+class TestFindAffectedAddons:
+    @pytest.fixture
+    def addon_index(self, tmp_path: Path):
+        import types
+
+        from blender_vscode import load_addons
+
+        load_addons._ADDON_DIRECTORY_INDEX.clear()
+        for name in ("addon_a", "addon_b", "addon_c"):
+            load_addons._ADDON_DIRECTORY_INDEX[load_addons._normalize_path(tmp_path / name)] = name
+
+        shared = types.ModuleType("shared_lib")
+        shared.__file__ = str(tmp_path / "libs" / "shared_lib.py")
+        addon_a = types.ModuleType("addon_a")
+        addon_b = types.ModuleType("addon_b")
+        addon_b.shared_lib = shared
+        addon_c = types.ModuleType("addon_c")
+        addon_c.addon_a = addon_a
+        modules = {"shared_lib": shared, "addon_a": addon_a, "addon_b": addon_b, "addon_c": addon_c}
+        with patch.dict(sys.modules, modules):
+            yield tmp_path
+        load_addons._ADDON_DIRECTORY_INDEX.clear()
+
+    def test_file_in_addon_reloads_addon_and_importers(self, addon_index: Path):
+        from blender_vscode.load_addons import find_affected_addons
+
+        addon_modules = {"addon_a": "addon_a", "addon_b": "addon_b", "addon_c": "addon_c"}
+        affected, changed_modules = find_affected_addons([str(addon_index / "addon_a" / "ops.py")], addon_modules)
+
+        assert affected == ["addon_a", "addon_c"]
+        assert changed_modules == []
+
+    def test_shared_module_outside_of_addons(self, addon_index: Path):
+        from blender_vscode.load_addons import find_affected_addons
+
+        addon_modules = {"addon_a": "addon_a", "addon_b": "addon_b", "addon_c": "addon_c"}
+        affected, changed_modules = find_affected_addons([str(addon_index / "libs" / "shared_lib.py")], addon_modules)
+
+        assert affected == ["addon_b"]
+        assert changed_modules == ["shared_lib"]
+
+    def test_unrelated_file(self, addon_index: Path):
+        from blender_vscode.load_addons import find_affected_addons
+
+        affected, changed_modules = find_affected_addons([str(addon_index / "README.md")], {"addon_a": "addon_a"})
+
+        assert affected == []
+        assert changed_modules == []
+
+    def test_imported_addons_reload_first(self, addon_index: Path):
+        from blender_vscode.load_addons import find_affected_addons
+
+        # addon_c imports addon_a, both changed
+        addon_modules = {"addon_c": "addon_c", "addon_a": "addon_a", "addon_b": "addon_b"}
+        files = [str(addon_index / "addon_c" / "ui.py"), str(addon_index / "addon_a" / "ops.py")]
+        affected, _ = find_affected_addons(files, addon_modules)
+
+        assert affected == ["addon_a", "addon_c"]
+
+    @patch("blender_vscode.operators.addon_update.is_addon_legacy", return_value=True)
+    def test_source_directory_differs_from_load_directory(self, is_addon_legacy, tmp_path: Path):
+        import bpy
+
+        from blender_vscode import load_addons
+        from blender_vscode.operators import addon_update
+
+        load_addons._ADDON_DIRECTORY_INDEX.clear()
+        load_addons.index_addon_directory(tmp_path / "addons" / "my_addon", "my_addon")
+        source_dir = tmp_path / "src" / "my_addon"
+        data = {"names": ["my_addon"], "dirs": [str(source_dir)], "files": [str(source_dir / "ops.py")]}
+        try:
+            assert addon_update.reload_addon_action(data) == ["my_addon"]
+        finally:
+            load_addons._ADDON_DIRECTORY_INDEX.clear()
+        bpy.ops.dev.update_addon.assert_called_once_with(module_name="my_addon")
@@ -0,0 +1,33 @@
+import pytest
+
+from load_generator import format_report, get_percentiles, get_schedule, parse_mix, run_load
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class TestLoadGenerator:
+    def test_parse_mix(self):
+        assert parse_mix("ping=50, reload=2.5,") == {"ping": 50.0, "reload": 2.5}
+        with pytest.raises(ValueError):
+            parse_mix("render=1")
+
+    def test_schedule_and_percentiles(self):
+        assert get_schedule({"ping": 2, "reload": 1, "script": 0}, 1.5) == [
+            (0.0, "ping"),
+            (0.0, "reload"),
+            (0.5, "ping"),
+            (1.0, "ping"),
+        ]
+        assert get_percentiles([0.3, 0.1, 0.2]) == {"p50": 0.2, "p90": 0.3, "p99": 0.3, "max": 0.3}
+        assert get_percentiles([]) == {}
+
+    def test_run_load(self):
+        report = run_load({"ping": 20, "reload": 100, "script": 10}, duration=0.5, reload_cost=0.05, tick_interval=0.02)
+        assert report["editorMessages"]["setup"] == 1
+        assert report["unfinishedJobs"] == 0
+        for kind, sent in (("ping", 10), ("reload", 50), ("script", 5)):
+            assert report["requests"][kind]["sent"] == sent
+            assert report["requests"][kind]["ok"] == sent
+        assert report["requests"]["reload"]["completion"]
+        # reloads arrive faster than they run
+        assert report["queue"]["coalesced"] > 0
+        assert "coalesced" in format_report(report)
@@ -0,0 +1,42 @@
+import tracemalloc
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class LeakedObject:
+    def __init__(self):
+        self.data = bytearray(1024)
+
+
+class TestMemoryReport:
+    def test_reload_report(self):
+        from blender_vscode import memory_report
+
+        memory_report.enable()
+        try:
+            state = memory_report.before_reload()
+            leaked = [LeakedObject() for _ in range(100)]
+            report = memory_report.after_reload(state, "my_addon")
+        finally:
+            memory_report.disable()
+        assert report["module"] == "my_addon" and report["reloadCount"] == 1
+        assert report["reload"]["sizeDiff"] >= 100 * 1024
+        assert {"type": "LeakedObject", "delta": 100} in report["reload"]["objectTypeDeltas"]
+        assert leaked
+
+    def test_disable_stops_only_own_tracing(self):
+        from blender_vscode import memory_report
+
+        assert not tracemalloc.is_tracing()
+        memory_report.enable()
+        memory_report.disable()
+        assert not tracemalloc.is_tracing()
+
+        tracemalloc.start()
+        try:
+            memory_report.enable()
+            memory_report.disable()
+            # tracing of someone else keeps running
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
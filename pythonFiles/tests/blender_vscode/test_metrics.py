@@ -0,0 +1,53 @@
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+@pytest.fixture
+def histogram():
+    from blender_vscode import metrics
+
+    histogram = metrics.Histogram("test_duration_seconds", "Test.", ["type"], buckets=(0.1, 1.0))
+    yield histogram
+    metrics.unregister(histogram)
+    assert "test_duration_seconds" not in metrics.to_dict()
+
+
+class TestMetrics:
+    def test_histogram_buckets_are_cumulative(self, histogram):
+        from blender_vscode import metrics
+
+        histogram.observe(0.05, "reload")
+        histogram.observe(0.5, "reload")
+        histogram.observe(5.0, "reload")
+
+        text = metrics.render_prometheus()
+        assert 'test_duration_seconds_bucket{type="reload",le="0.1"} 1\n' in text
+        assert 'test_duration_seconds_bucket{type="reload",le="1"} 2\n' in text
+        assert 'test_duration_seconds_bucket{type="reload",le="+Inf"} 3\n' in text
+        assert 'test_duration_seconds_count{type="reload"} 3\n' in text
+        assert metrics.to_dict()["test_duration_seconds"]["values"][0]["counts"] == [1, 1, 1]
+
+    def test_jobs_and_queue_are_recorded(self):
+        from blender_vscode import jobs, metrics, utils
+
+        jobs.submit("script", {}, lambda data: None)
+        utils.always()
+
+        assert metrics.to_dict()["blender_vscode_job_duration_seconds"]["values"][0]["labels"] == {"type": "script"}
+        assert "blender_vscode_queue_depth 0\n" in metrics.render_prometheus()
+
+    def test_label_values_are_escaped(self):
+        from blender_vscode import metrics
+
+        assert metrics.format_labels({"type": 'a"b\\c'}) == '{type="a\\"b\\\\c"}'
+
+    def test_metrics_must_implement_samples(self):
+        from blender_vscode import metrics
+
+        class Incomplete(metrics.Metric):
+            def to_dict(self):
+                return {}
+
+        with pytest.raises(TypeError):
+            Incomplete("incomplete", "Test.")
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def busy_main_thread(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSamplingProfiler:
+    def test_folded_stacks_and_top_functions(self):
+        from blender_vscode import profiler
+
+        assert profiler.start(rate=500)
+        assert not profiler.start()
+        busy_main_thread(0.3)
+        result = profiler.stop(top=5)
+
+        assert not profiler.is_running()
+        assert result["samples"] > 0
+        lines = result["folded"].splitlines()
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("busy_main_thread" in line for line in lines)
+        assert len(result["top"]) <= 5
+        busy = [entry for entry in result["top"] if entry["function"].startswith("busy_main_thread ")]
+        assert busy and busy[0]["totalPercent"] > 50
+
+    def test_stop_without_start(self):
+        from blender_vscode import profiler
+
+        assert profiler.stop() is None
+
+
+class TestProfilerHandlers:
+    @pytest.fixture(autouse=True)
+    def handlers(self):
+        from blender_vscode.operators import sampling_profiler
+
+        sampling_profiler.register()
+
+    def post(self, type, **data):
+        from blender_vscode import communication
+
+        response = communication.SERVER.test_client().post("/", json={"type": type, **data})
+        return response.status_code, response.get_json()
+
+    def test_invalid_rate(self):
+        from blender_vscode import profiler
+
+        for rate in ["fast", -10, 0, None]:
+            status, body = self.post("profilerStart", rate=rate)
+            assert status == 400
+            assert "rate" in body["error"]
+        assert not profiler.is_running()
+
+    def test_unwritable_path_still_returns_profile(self, tmp_path):
+        status, _ = self.post("profilerStart", rate=100)
+        assert status == 200
+        status, body = self.post("profilerStop", path=str(tmp_path / "missing" / "profile.folded"))
+        assert status == 200
+        assert "samples" in body
+        assert "Could not write profile" in body["error"]
@@ -0,0 +1,53 @@
+import contextlib
+from unittest.mock import patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def steps():
+    try:
+        while True:
+            yield
+    finally:
+        steps.closed_before_read.append(not steps.read_homefile.called)
+
+
+class TestResetBlender:
+    @patch("blender_vscode.stepped_scripts.redraw_all")
+    @patch("blender_vscode.stepped_scripts.send_dict_as_json")
+    def test_reset_stops_scripts_and_reloads_addons(self, send_script, redraw_script):
+        import bpy
+
+        from blender_vscode import stepped_scripts
+        from blender_vscode.operators import reset_blender
+
+        script = stepped_scripts.start("script.py", steps, budget=0.001)
+        assert script.tick() is not None
+        steps.closed_before_read = []
+        steps.read_homefile = bpy.ops.wm.read_homefile
+
+        addons = ["addon_info"]
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(patch.object(reset_blender, "LOADED_ADDONS", addons))
+            stack.enter_context(patch.object(reset_blender, "get_addon_module_name", return_value="my_addon"))
+            stack.enter_context(patch.object(reset_blender, "setup_addon_links", return_value=[]))
+            stack.enter_context(patch.object(reset_blender, "handler_timing"))
+            stack.enter_context(patch.object(reset_blender, "class_timing"))
+            stack.enter_context(patch.object(reset_blender, "redraw_all"))
+            purge_modules = stack.enter_context(patch.object(reset_blender, "purge_modules"))
+            load = stack.enter_context(patch.object(reset_blender, "load"))
+            send = stack.enter_context(patch.object(reset_blender, "send_dict_as_json"))
+            timings = reset_blender.reset_action({"factory": False})
+
+        bpy.ops.preferences.addon_disable.assert_called_once_with(module="my_addon")
+        purge_modules.assert_called_once_with("my_addon")
+        bpy.ops.wm.read_homefile.assert_called_once_with(use_factory_startup=False)
+        load.assert_called_once_with(addons)
+        assert send.call_args[0][0]["type"] == "resetFinished"
+        assert {"stopScripts", "readHomefile", "loadAddons", "total"} <= set(timings)
+
+        # the script was stopped before its data was replaced, its timer is gone
+        assert steps.closed_before_read == [True]
+        assert script.state == stepped_scripts.CANCELLED
+        assert stepped_scripts.get_running() == []
+        bpy.app.timers.unregister.assert_called_once_with(script.timer)
@@ -0,0 +1,105 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def make_property(identifier: str, type: str = "FLOAT", **kwargs):
+    values = dict(
+        identifier=identifier,
+        name=identifier.title(),
+        description=f"{identifier} description",
+        type=type,
+        subtype="NONE",
+        is_readonly=False,
+        array_length=0,
+        is_enum_flag=False,
+        is_required=False,
+        is_output=False,
+    )
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+def make_bpy(build_hash: bytes = b"abc123"):
+    mode = make_property(
+        "mode", "ENUM", enum_items=[SimpleNamespace(identifier="OBJECT", name="Object", description="")]
+    )
+    object_rna = SimpleNamespace(
+        name="Object",
+        description="Object data-block",
+        base=SimpleNamespace(identifier="ID"),
+        properties=[make_property("rna_type", "POINTER"), make_property("location", array_length=3), mode],
+        functions=[],
+    )
+    operator_rna = SimpleNamespace(
+        name="Select All", description="", properties=[make_property("action", "ENUM", enum_items=[])]
+    )
+    return SimpleNamespace(
+        app=SimpleNamespace(version=(4, 2, 0), build_hash=build_hash),
+        types=SimpleNamespace(Object=SimpleNamespace(bl_rna=object_rna), Operator=SimpleNamespace()),
+        ops=SimpleNamespace(object=SimpleNamespace(select_all=SimpleNamespace(get_rna_type=lambda: operator_rna))),
+    )
+
+
+class TestRnaExport:
+    def test_export_format(self, tmp_path):
+        from blender_vscode import rna_export
+
+        with patch("blender_vscode.rna_export.bpy", make_bpy()):
+            rna_export.export(tmp_path)
+
+        version_dir = tmp_path / "4.2.0"
+        meta = json.loads((version_dir / "meta.json").read_text())
+        assert meta == {
+            "formatVersion": rna_export.FORMAT_VERSION,
+            "version": "4.2.0",
+            "buildHash": "abc123",
+            "typeCount": 1,
+            "operatorCount": 1,
+        }
+        assert sorted(json.loads((version_dir / "index.json").read_text())["types"]) == ["Object"]
+        assert not (tmp_path / "4.2.0.tmp").exists()
+
+        entry = rna_export.read_entry(version_dir, "types", "Object")
+        assert entry["base"] == "ID"
+        assert [prop["identifier"] for prop in entry["properties"]] == ["location", "mode"]
+        assert entry["properties"][0]["arrayLength"] == 3
+        assert entry["properties"][1]["enumItems"] == [{"identifier": "OBJECT", "name": "Object", "description": ""}]
+        assert rna_export.read_entry(version_dir, "operators", "object.select_all")["label"] == "Select All"
+        assert rna_export.read_entry(version_dir, "types", "Mesh") is None
+
+    def test_is_export_outdated(self, tmp_path):
+        from blender_vscode import rna_export
+
+        with patch("blender_vscode.rna_export.bpy", make_bpy()):
+            assert rna_export.is_export_outdated(tmp_path)
+            assert rna_export.export_if_outdated(tmp_path)
+            assert not rna_export.is_export_outdated(tmp_path)
+            assert not rna_export.export_if_outdated(tmp_path)
+        # a new build of the same version is exported again
+        with patch("blender_vscode.rna_export.bpy", make_bpy(b"def456")):
+            assert rna_export.is_export_outdated(tmp_path)
+        (tmp_path / "4.2.0" / "meta.json").write_text("{broken")
+        with patch("blender_vscode.rna_export.bpy", make_bpy()):
+            assert rna_export.is_export_outdated(tmp_path)
+
+    def test_read_entry_caches_index(self, tmp_path):
+        from blender_vscode import rna_export
+
+        with patch("blender_vscode.rna_export.bpy", make_bpy()):
+            rna_export.export(tmp_path)
+        version_dir = tmp_path / "4.2.0"
+        assert rna_export.read_entry(version_dir, "types", "Object") is not None
+        with patch("blender_vscode.rna_export.json.load", wraps=json.load) as load:
+            assert rna_export.read_entry(version_dir, "types", "Object") is not None
+        # only meta.json is read again
+        assert load.call_count == 1
+
+        # a re-export for a new build invalidates the cached index
+        with patch("blender_vscode.rna_export.bpy", make_bpy(b"def456")):
+            rna_export.export(tmp_path)
+        with patch("blender_vscode.rna_export.json.load", wraps=json.load) as load:
+            assert rna_export.read_entry(version_dir, "types", "Object") is not None
+        assert load.call_count == 2
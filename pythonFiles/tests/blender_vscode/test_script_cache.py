@@ -0,0 +1,73 @@
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class TestScriptCache:
+    def test_compiled_once_per_content(self):
+        from blender_vscode import script_cache
+
+        source = "result = CTX * 2\n"
+        script = script_cache.put(source, "Untitled-1")
+        assert script.hash == script_cache.get_hash(source)
+        assert script_cache.get(script.hash) is script
+        assert script_cache.put(source, "Untitled-1", script.hash) is script
+        assert script.run({"CTX": 21})["result"] == 42
+        assert script_cache.get("0" * 64) is None
+
+    def test_hash_mismatch(self):
+        from blender_vscode import script_cache
+
+        with pytest.raises(ValueError):
+            script_cache.put("x = 1\n", "script.py", "0" * 64)
+
+    def test_traceback_points_to_buffer(self):
+        from blender_vscode import script_cache
+
+        script = script_cache.put("x = 1\nraise RuntimeError()\n", "/tmp/unsaved.py")
+        with pytest.raises(RuntimeError) as info:
+            script.run()
+        traceback = info.value.__traceback__
+        while traceback.tb_next is not None:
+            traceback = traceback.tb_next
+        assert traceback.tb_frame.f_code.co_filename == "/tmp/unsaved.py"
+        assert traceback.tb_lineno == 2
+
+    def test_least_recently_used_is_evicted(self):
+        from blender_vscode import script_cache
+
+        first = script_cache.put("x = 0\n", "script.py")
+        scripts = [script_cache.put(f"x = {i}\n", "script.py") for i in range(1, script_cache.MAX_ENTRIES)]
+        assert script_cache.get(first.hash) is first
+        script_cache.put("x = -1\n", "script.py")
+        assert script_cache.get(first.hash) is first
+        assert script_cache.get(scripts[0].hash) is None
+
+
+@pytest.fixture
+def post():
+    from blender_vscode import communication
+    from blender_vscode.operators import script_runner
+
+    communication.register_post_handler("scriptContent", script_runner.script_content_handler)
+    client = communication.SERVER.test_client()
+    return lambda data: client.post("/", json={"type": "scriptContent", **data})
+
+
+class TestScriptContentHandler:
+    def test_syntax_error_is_logged_and_returned(self, post, caplog):
+        response = post({"path": "/tmp/broken.py", "source": "def broken(:\n"})
+        assert response.status_code == 400
+        assert "SyntaxError" in response.get_json()["error"]
+        assert "Script /tmp/broken.py can not be run" in caplog.text
+
+    def test_hash_only_request_uses_its_path(self, post):
+        from blender_vscode import script_cache
+
+        source = "x = 1\n"
+        assert post({"path": "/tmp/first.py", "source": source}).status_code == 200
+        response = post({"path": "/tmp/second.py", "hash": script_cache.get_hash(source)})
+        assert response.status_code == 200
+        script = script_cache.get(response.get_json()["hash"])
+        assert script.path == "/tmp/second.py"
+        assert script.code.co_filename == "/tmp/second.py"
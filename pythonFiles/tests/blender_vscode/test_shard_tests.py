@@ -0,0 +1,110 @@
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+TESTS_DIR = Path(__file__).parent
+FAKE_BLENDER = TESTS_DIR / "fake_blender.py"
+
+
+def import_shard_tests():
+    spec = importlib.util.spec_from_file_location("shard_tests", TESTS_DIR.parent.parent / "shard_tests.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestPlanShards:
+    def test_balanced_by_duration(self):
+        shard_tests = import_shard_tests()
+        durations = {"a": 4.0, "b": 3.0, "c": 2.0, "d": 2.0, "e": 1.0}
+        plan = shard_tests.plan_shards(list("abcdef"), durations, 2)
+        totals = [sum(durations.get(node_id, 2.0) for node_id in shard) for shard in plan]
+        assert sorted(node_id for shard in plan for node_id in shard) == list("abcdef")
+        assert abs(totals[0] - totals[1]) <= 1.0
+        # collection order is kept within a shard
+        assert all(shard == sorted(shard) for shard in plan)
+
+    def test_more_shards_than_tests(self):
+        shard_tests = import_shard_tests()
+        assert sorted(map(len, shard_tests.plan_shards(["a"], {}, 3))) == [0, 0, 1]
+
+
+class TestCoordinator:
+    def test_run_with_stand_in_blender(self, tmp_path, monkeypatch, capsys):
+        shard_tests = import_shard_tests()
+        tests = {f"test_mod.py::test_{i}": ["passed", 0.25] for i in range(12)}
+        tests["test_mod.py::test_broken"] = ["failed", 0.25]
+        monkeypatch.setenv("FAKE_BLENDER_TESTS", json.dumps(tests))
+        durations_path = tmp_path / "durations.json"
+
+        coordinator = shard_tests.Coordinator([sys.executable, str(FAKE_BLENDER)], 3, ["tests"], [])
+        start = time.perf_counter()
+        exit_code = coordinator.run({})
+        elapsed = time.perf_counter() - start
+        shard_tests.write_durations(durations_path, {}, coordinator.results)
+
+        assert exit_code == 1
+        assert set(coordinator.results) == set(tests)
+        assert coordinator.results["test_mod.py::test_broken"]["outcome"] == "failed"
+        assert {result["runId"] for result in coordinator.results.values()} == {"shard-0", "shard-1", "shard-2"}
+        # 3.25s of tests in 3 processes, including their startup
+        assert elapsed < 3.25
+        assert json.loads(durations_path.read_text())["test_mod.py::test_0"] == 0.25
+        assert "PASSED test_mod.py::test_0" in capsys.readouterr().out
+        assert all(shard.process.returncode == 0 for shard in coordinator.shards.values())
+
+    def test_same_job_id_in_two_shards(self):
+        shard_tests = import_shard_tests()
+        coordinator = shard_tests.Coordinator([sys.executable], 2, [], [])
+        shards = []
+        for index in range(2):
+            shard = shard_tests.Shard(index, Mock(**{"poll.return_value": None}))
+            # every process numbers its jobs from 1
+            shard.job_id = "1"
+            shards.append(shard)
+
+        for identifier in ("shard-1", "shard-0"):
+            job = {"id": "1", "state": "done", "result": {"shard": identifier}, "error": None}
+            coordinator.handle_message({"type": "jobFinished", "vscodeIdentifier": identifier, "job": job})
+        finished = coordinator.wait_for_jobs(shards)
+        coordinator.server.server_close()
+
+        assert {identifier: job["result"]["shard"] for identifier, job in finished.items()} == {
+            "shard-0": "shard-0",
+            "shard-1": "shard-1",
+        }
+
+
+class TestPytestRunner:
+    @patch("blender_vscode.pytest_runner.send_dict_as_json")
+    def test_streamed_results(self, send, tmp_path):
+        from blender_vscode import pytest_runner
+
+        (tmp_path / "test_sample.py").write_text(
+            "import pytest\n"
+            "def test_ok(): pass\n"
+            "def test_fails(): assert False\n"
+            "@pytest.mark.skip\n"
+            "def test_skipped(): pass\n"
+        )
+        with patch("blender_vscode.installation.ensure_packages_are_installed"):
+            collected = pytest_runner.run_tests([str(tmp_path), "-p", "no:cacheprovider"], collect_only=True)
+            assert len(collected["collected"]) == 3
+            assert "test_sample" not in sys.modules
+
+            ok = next(node_id for node_id in collected["collected"] if node_id.endswith("test_ok"))
+            fails = next(node_id for node_id in collected["collected"] if node_id.endswith("test_fails"))
+            result = pytest_runner.run_tests(
+                [str(tmp_path), "-p", "no:cacheprovider"], node_ids=[ok, fails], run_id="run"
+            )
+
+        assert result["counts"] == {"passed": 1, "failed": 1}
+        messages = [call[0][0] for call in send.call_args_list]
+        assert [message["outcome"] for message in messages] == ["passed", "failed"]
+        assert all(message["type"] == "testResult" and message["runId"] == "run" for message in messages)
+        assert "assert False" in messages[1]["longrepr"]
@@ -0,0 +1,126 @@
+import time
+from unittest.mock import patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def steps():
+    for i in range(10):
+        time.sleep(0.005)
+        yield (i + 1) / 10
+
+
+def plain():
+    return None
+
+
+def failing_cleanup():
+    try:
+        while True:
+            yield
+    finally:
+        raise RuntimeError("cleanup failed")
+
+
+class TestSteppedScripts:
+    @patch("blender_vscode.stepped_scripts.redraw_all")
+    @patch("blender_vscode.stepped_scripts.send_dict_as_json")
+    def test_budget_and_progress(self, send, redraw):
+        import bpy
+
+        from blender_vscode import stepped_scripts
+
+        assert stepped_scripts.get_entry_point({"steps": steps}) is steps
+        assert stepped_scripts.get_entry_point({"steps": plain}) is None
+
+        script = stepped_scripts.start("script.py", steps, budget=0.012)
+        # a file load must not drop the timer
+        assert bpy.app.timers.register.call_args[1]["persistent"] is True
+        assert stepped_scripts.get_running()[0]["id"] == script.id
+        while script.tick() is not None:
+            pass
+        # ticks stop once the budget is used up, 50ms of steps do not fit into one tick
+        assert script.ticks >= 3
+        assert script.state == stepped_scripts.DONE
+        assert script.steps == 10 and script.progress == 1.0
+        assert stepped_scripts.get_running() == []
+        assert send.call_args[0][0]["type"] == "scriptFinished"
+
+    @patch("blender_vscode.stepped_scripts.redraw_all")
+    @patch("blender_vscode.stepped_scripts.send_dict_as_json")
+    def test_cancel_between_steps(self, send, redraw):
+        from blender_vscode import stepped_scripts
+
+        script = stepped_scripts.start("script.py", steps, budget=0.001)
+        assert script.tick() is not None
+        assert stepped_scripts.cancel() == [script.id]
+        assert script.tick() is None
+        assert script.state == stepped_scripts.CANCELLED
+        assert script.steps == 1
+        assert send.call_args[0][0]["state"] == stepped_scripts.CANCELLED
+
+    @patch("blender_vscode.stepped_scripts.redraw_all")
+    @patch("blender_vscode.stepped_scripts.send_dict_as_json")
+    def test_failing_close_finishes_script(self, send, redraw):
+        from blender_vscode import stepped_scripts
+
+        script = stepped_scripts.start("script.py", failing_cleanup, budget=0.001)
+        assert script.tick() is not None
+        script.cancel()
+        assert script.tick() is None
+        assert script.state == stepped_scripts.FAILED
+        assert "cleanup failed" in script.error
+        assert stepped_scripts.get_running() == []
+
+    @patch("blender_vscode.stepped_scripts.redraw_all")
+    @patch("blender_vscode.stepped_scripts.send_dict_as_json")
+    def test_job_finishes_with_script(self, send, redraw):
+        from blender_vscode import jobs, stepped_scripts, utils
+
+        scripts = []
+
+        def handler(data):
+            with stepped_scripts.collect_started() as started:
+                scripts.append(stepped_scripts.start("script.py", steps, budget=0.001))
+            return stepped_scripts.wait_for(started)
+
+        job = jobs.submit("script", {}, handler)
+        utils.always()
+        assert job.state == jobs.RUNNING
+        while scripts[0].tick() is not None:
+            assert job.state == jobs.RUNNING
+        assert job.state == jobs.DONE
+        assert job.result[0]["state"] == stepped_scripts.DONE
+
+    @patch("blender_vscode.stepped_scripts.redraw_all")
+    @patch("blender_vscode.stepped_scripts.send_dict_as_json")
+    def test_cancelled_script_cancels_job(self, send, redraw):
+        import bpy
+
+        from blender_vscode import jobs, stepped_scripts, utils
+
+        def handler(data):
+            with stepped_scripts.collect_started() as started:
+                stepped_scripts.start("script.py", steps, budget=0.001)
+            return stepped_scripts.wait_for(started)
+
+        job = jobs.submit("script", {}, handler)
+        utils.always()
+        script_id = stepped_scripts.get_running()[0]["id"]
+        stepped_scripts.cancel(script_id)
+        assert job.state == jobs.RUNNING
+        tick = bpy.app.timers.register.call_args[0][0]
+        assert tick() is None
+        assert job.state == jobs.CANCELLED
+
+    def test_job_without_scripts_finishes_immediately(self):
+        from blender_vscode import jobs, stepped_scripts, utils
+
+        def handler(data):
+            with stepped_scripts.collect_started() as started:
+                pass
+            return stepped_scripts.wait_for(started)
+
+        job = jobs.submit("script", {}, handler)
+        utils.always()
+        assert job.state == jobs.DONE and job.result is None
@@ -0,0 +1,64 @@
+import http.server
+import json
+import socketserver
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets are not used on Windows")
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TestUnixSocketTransport:
+    def test_control_server_on_socket(self):
+        from blender_vscode import communication, transport
+
+        socket_path = communication.start_own_socket_server()
+        assert socket_path is not None
+        assert transport.request(socket_path, "GET", "/ping") == (200, b"OK")
+        status, body = transport.post_json(socket_path, {"type": "cancelJob", "jobId": "unknown"})
+        assert status == 404 and b"Unknown job" in body
+        transport.remove_socket(socket_path)
+
+    def test_send_to_editor_socket(self):
+        from blender_vscode import communication, transport
+
+        received = []
+
+        class EditorHandler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        socket_path = transport.create_socket_path()
+        server = UnixHTTPServer(socket_path, EditorHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        with patch.object(communication, "EDITOR_SOCKET_PATH", socket_path), patch.object(
+            communication.requests, "post"
+        ) as post:
+            communication.send_dict_as_json({"type": "addonUpdated"})
+            post.assert_not_called()
+        assert received == [{"type": "addonUpdated"}]
+        server.shutdown()
+        transport.remove_socket(socket_path)
+
+    def test_fallback_to_tcp(self, tmp_path):
+        from blender_vscode import communication
+
+        with patch.object(communication, "EDITOR_SOCKET_PATH", str(tmp_path / "missing.sock")), patch.object(
+            communication.requests, "post"
+        ) as post:
+            communication.send_dict_as_json({"type": "addonUpdated"})
+            assert communication.EDITOR_SOCKET_PATH is None
+        post.assert_called_once()
@@ -0,0 +1,39 @@
+import time
+from unittest.mock import patch
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+class TestStallWatchdog:
+    @patch("blender_vscode.watchdog.send_dict_as_json")
+    def test_stall_is_reported_after_recovery(self, send_dict_as_json):
+        from blender_vscode import utils, watchdog
+
+        detector = watchdog.StallWatchdog(threshold=1.0)
+        utils.last_tick_time = time.perf_counter() - 2.0
+        detector.check()
+        assert detector.stall is not None
+        # the stack of the main thread is the one running this test
+        assert detector.stall.first_stack[-1][2] == "capture_main_thread_stack"
+        detector.check()
+        send_dict_as_json.assert_not_called()
+
+        utils.last_tick_time = time.perf_counter()
+        detector.check()
+
+        assert detector.stall is None
+        report = send_dict_as_json.call_args[0][0]
+        assert report["type"] == "stallReport"
+        assert report["duration"] >= 2.0
+        assert sum(sample["count"] for sample in report["samples"]) == 2
+
+    @patch("blender_vscode.watchdog.send_dict_as_json")
+    def test_no_report_while_ticking(self, send_dict_as_json):
+        from blender_vscode import utils, watchdog
+
+        detector = watchdog.StallWatchdog(threshold=1.0)
+        utils.always()
+        detector.check()
+
+        assert detector.stall is None
+        send_dict_as_json.assert_not_called()
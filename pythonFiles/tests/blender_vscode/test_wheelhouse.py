@@ -0,0 +1,61 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from test_load_addons import bpy_global_defaults  # noqa: F401 shared bpy mocks
+
+
+def install_fake_distribution(site_directory: Path):
+    package = site_directory / "fake_pkg"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("VALUE = 1\n")
+    dist_info = site_directory / "fake_pkg-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: fake-pkg\nVersion: 1.0\n")
+    (dist_info / "WHEEL").write_text("Wheel-Version: 1.0\nTag: py2-none-any\nTag: py3-none-any\n")
+    (dist_info / "INSTALLER").write_text("pip\n")
+    (dist_info / "RECORD").write_text(
+        "fake_pkg/__init__.py,,\n"
+        "fake_pkg/__pycache__/__init__.cpython-311.pyc,,\n"
+        "../../bin/fake,,\n"
+        "fake_pkg-1.0.dist-info/METADATA,,\n"
+        "fake_pkg-1.0.dist-info/WHEEL,,\n"
+        "fake_pkg-1.0.dist-info/INSTALLER,,\n"
+        "fake_pkg-1.0.dist-info/RECORD,,\n"
+    )
+
+
+class TestWheelhouse:
+    def test_populate_and_verify(self, tmp_path: Path):
+        from blender_vscode import wheelhouse
+
+        install_fake_distribution(tmp_path / "site")
+        directory = tmp_path / "wheelhouse" / wheelhouse.get_abi_tag()
+        wheels = wheelhouse.populate_from_directory(tmp_path / "site", directory)
+
+        assert [wheel.name for wheel in wheels] == ["fake_pkg-1.0-py2.py3-none-any.whl"]
+        with zipfile.ZipFile(wheels[0]) as wheel:
+            assert sorted(wheel.namelist()) == [
+                "fake_pkg-1.0.dist-info/METADATA",
+                "fake_pkg-1.0.dist-info/RECORD",
+                "fake_pkg-1.0.dist-info/WHEEL",
+                "fake_pkg/__init__.py",
+            ]
+        assert wheelhouse.get_verified_wheels(directory) == wheels
+
+        requirements = tmp_path / "requirements.txt"
+        wheelhouse.write_requirements(wheels, requirements)
+        assert requirements.read_text().startswith("fake_pkg==1.0 --hash=sha256:")
+
+    def test_modified_wheel_is_rejected(self, tmp_path: Path):
+        from blender_vscode import wheelhouse
+
+        install_fake_distribution(tmp_path / "site")
+        directory = tmp_path / "wheelhouse"
+        wheel = wheelhouse.populate_from_directory(tmp_path / "site", directory)[0]
+        with open(wheel, "ab") as f:
+            f.write(b"tampered")
+
+        with pytest.raises(ValueError, match="Hash mismatch"):
+            wheelhouse.get_verified_wheels(directory)
@@ -5,7 +5,7 @@ import * as child_process from 'child_process';
 import * as fs from 'fs';
 
 import { launchPath } from './paths';
-import { getServerPort, RunningBlenders } from './communication';
+import { getServerPort, RunningBlenders, startSocketServer } from './communication';
 import { letUserPickItem, PickItem } from './select_utils';
 import { getConfig, cancel, runTask, getAnyWorkspaceFolder, getRandomString } from './utils';
 import { AddonWorkspaceFolder } from './addon_folder';
@@ -13,7 +13,8 @@ import { outputChannel, showNotificationAddDefault } from './extension';
 import { getBlenderWindows } from './blender_executable_windows';
 import { deduplicateSameHardLinks } from './blender_executable_linux';
 
-export async function LaunchAnyInteractive(blend_filepaths?: string[], script?: string) {
+/** With `standby`, Blender starts without addons, they are assigned later with `Blender: Assign Addons`. */
+export async function LaunchAnyInteractive(blend_filepaths?: string[], script?: string, standby: boolean = false) {
     const executable = await getFilteredBlenderPath({
         label: 'Blender Executable',
         selectNewLabel: 'Choose a new Blender executable...',
@@ -21,16 +22,16 @@ export async function LaunchAnyInteractive(blend_filepaths?: string[], script?:
         setSettings: () => { }
     });
     showNotificationAddDefault(executable);
-    return await LaunchAny(executable, blend_filepaths, script);
+    return await LaunchAny(executable, blend_filepaths, script, standby);
 }
 
-export async function LaunchAny(executable: BlenderExecutableData, blend_filepaths?: string[], script?: string) {
+export async function LaunchAny(executable: BlenderExecutableData, blend_filepaths?: string[], script?: string, standby: boolean = false) {
     if (blend_filepaths === undefined || !blend_filepaths.length) {
-        await launch(executable, undefined, script);
+        await launch(executable, undefined, script, standby);
         return;
     }
     for (const blend_filepath of blend_filepaths) {
-        await launch(executable, blend_filepath, script);
+        await launch(executable, blend_filepath, script, standby);
     }
 }
 
@@ -52,12 +53,12 @@ export class BlenderTask {
     }
 }
 
-export async function launch(data: BlenderExecutableData, blend_filepath?: string, script?: string) {
+export async function launch(data: BlenderExecutableData, blend_filepath?: string, script?: string, standby: boolean = false) {
     const blenderArgs = getBlenderLaunchArgs(blend_filepath);
     const execution = new vscode.ProcessExecution(
         data.path,
         blenderArgs,
-        { env: await getBlenderLaunchEnv() }
+        { env: await getBlenderLaunchEnv(standby) }
     );
 
     outputChannel.appendLine(`Running custom build tasks (if any).`);
@@ -274,16 +275,32 @@ function getBlenderLaunchArgs(blend_filepath?: string) {
     return args;
 }
 
-async function getBlenderLaunchEnv() {
+async function getBlenderLaunchEnv(standby: boolean = false) {
     const config = getConfig();
     const addons = await AddonWorkspaceFolder.All();
     const loadDirsWithNames = await Promise.all(addons.map(a => a.getLoadDirectoryAndModuleName()));
 
+    const useUnixSockets = Boolean(config.get('addon.unixSockets', false));
+    const editorSocket = useUnixSockets ? startSocketServer() : undefined;
+
     return {
         ADDONS_TO_LOAD: JSON.stringify(loadDirsWithNames),
         VSCODE_EXTENSIONS_REPOSITORY: <string>config.get('addon.extensionsRepository'),
         VSCODE_LOG_LEVEL: <string>config.get('addon.logLevel'),
+        // without debugger Blender never imports debugpy, e.g. for performance measurements
+        VSCODE_NO_DEBUG: config.get('addon.debugger', true) ? '0' : '1',
         EDITOR_PORT: getServerPort().toString(),
+        // both sides fall back to TCP when a socket does not work
+        VSCODE_UNIX_SOCKETS: editorSocket !== undefined ? '1' : '0',
+        EDITOR_SOCKET: editorSocket ?? '',
+        // changed function bodies are patched in place instead of reloading the addon
+        VSCODE_HOT_PATCH: config.get('addon.hotPatch', false) ? '1' : '0',
+        // registration functions of Blender are only wrapped when leftovers of reloads are checked
+        VSCODE_RELOAD_LEAK_GUARD: config.get('addon.leakGuard', false) ? '1' : '0',
+        // opt-in, the export takes a few seconds of Blender's main thread after every Blender update
+        VSCODE_RNA_EXPORT_DIR: <string>config.get('addon.rnaExportDirectory', ''),
+        // Blender boots and serves requests, addons are linked and enabled by `assignAddons`
+        VSCODE_STANDBY: standby ? '1' : '0',
         ...<object>config.get('environmentVariables', {})
     };
 }
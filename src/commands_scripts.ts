@@ -40,6 +40,12 @@ export async function COMMAND_runScript(args?: RunScriptCommandArguments): Promi
         }
 
         const { document } = editor;
+        if (RunningBlenders.getAlive().length > 0) {
+            // running instances get the buffer content, it does not have to be saved
+            outputChannel.appendLine(`Blender: Run Script: ${document.fileName}`);
+            await RunningBlenders.runScriptContentOnResponsive(document.fileName, document.getText());
+            return;
+        }
         await document.save();
         outputChannel.appendLine(`Blender: Run Script: ${document.uri.fsPath}`);
         scriptPath = document.uri.fsPath;
@@ -1,10 +1,15 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
 import * as http from 'http';
+import * as os from 'os';
+import * as path from 'path';
 import type { IncomingMessage, ServerResponse } from 'http';
 import * as vscode from 'vscode';
 import axios from 'axios';
 import { getConfig } from './utils';
 import { attachPythonDebuggerToBlender } from './python_debugging';
 import { BlenderTask } from './blender_executable';
+import { outputChannel } from './extension';
 
 const RESPONSIVE_LIMIT_MS = 1000;
 
@@ -18,13 +23,17 @@ export type AddonPathMapping = { src: string, load: string };
 
 export class BlenderInstance {
     public readonly blenderPort: number;
-    public readonly debugpyPort: number;
+    public debugpyPort: number; // changes when Blender starts debugpy at runtime
     public readonly justMyCode: boolean;
     public readonly path: string;
     public readonly scriptsFolder: string;
-    public readonly addonPathMappings: AddonPathMapping[];
+    public addonPathMappings: AddonPathMapping[];
     public readonly connectionErrors: Error[];
     public readonly vscodeIdentifier: string; // can identify VS Code task and in HTTP communication
+    public noDebug: boolean = false; // started without debugpy, there is nothing to attach to
+    public blenderSocket: string | undefined = undefined; // Unix domain socket of the control server, TCP is the fallback
+    public standby: boolean = false; // started without addons, waiting for `assignAddons`
+    private readonly knownScriptHashes = new Set<string>(); // scripts compiled by this instance
 
     constructor(blenderPort: number, debugpyPort: number, justMyCode: boolean, path: string,
         scriptsFolder: string, addonPathMappings: AddonPathMapping[], vscodeIdentifier: string) {
@@ -39,9 +48,48 @@ export class BlenderInstance {
     }
 
     async post(data: JsonPayload): Promise<void> {
+        if (this.blenderSocket !== undefined) {
+            try {
+                await axios.post('http://localhost/', data, { socketPath: this.blenderSocket });
+                return;
+            } catch (error) {
+                if (!isSocketUnavailable(error)) {
+                    throw error;
+                }
+                outputChannel.appendLine(`Socket ${this.blenderSocket} is not available, using TCP.`);
+                this.blenderSocket = undefined;
+            }
+        }
         await axios.post(this.address, data);
     }
 
+    /** Load addons into an instance that was started with `VSCODE_STANDBY`.
+     * Blender answers with `addonsAssigned`, the debugger is attached afterwards.
+     */
+    async assignAddons(addons: { load_dir: string, module_name: string }[]): Promise<void> {
+        await this.post({ type: 'assignAddons', addons: addons });
+    }
+
+    /** Run the content of an editor buffer without saving it.
+     * The source is only sent when this instance did not compile the same content before.
+     */
+    async runScriptContent(path: string, source: string, hash: string): Promise<void> {
+        if (this.knownScriptHashes.has(hash)) {
+            try {
+                await this.post({ type: 'scriptContent', path: path, hash: hash });
+                return;
+            } catch (error) {
+                // Blender was restarted or dropped the script from its cache
+                if (!axios.isAxiosError(error) || error.response?.status !== 404) {
+                    throw error;
+                }
+                this.knownScriptHashes.delete(hash);
+            }
+        }
+        await this.post({ type: 'scriptContent', path: path, hash: hash, source: source });
+        this.knownScriptHashes.add(hash);
+    }
+
     async ping(): Promise<void> {
         try {
             await axios.get(`${this.address}/ping`);
@@ -143,6 +191,21 @@ export class RunningBlenderInstances {
         await Promise.all(pending);
     }
 
+    async runScriptContentOnResponsive(path: string, source: string, timeout: number = RESPONSIVE_LIMIT_MS): Promise<void> {
+        const hash = crypto.createHash('sha256').update(source, 'utf8').digest('hex');
+        const responsive = await this.getResponsive(timeout);
+        await Promise.all(responsive.map(instance => instance.runScriptContent(path, source, hash).catch((error) => {
+            if (axios.isAxiosError(error) && error.response?.status === 400) {
+                // e.g. a SyntaxError, Blender did not run the script
+                const message = String(error.response.data?.error ?? error.message).trim();
+                outputChannel.appendLine(`Script ${path} can not be run:\n${message}`);
+                vscode.window.showErrorMessage(`Script ${path} can not be run: ${message.split('\n').pop()}`);
+                return;
+            }
+            instance.connectionErrors.push(error instanceof Error ? error : new Error(String(error)));
+        })));
+    }
+
     sendToAll(data: JsonPayload): void {
         for (const instance of this.instances) {
             try {
@@ -170,6 +233,7 @@ export function startServer(): void {
 }
 
 export function stopServer(): void {
+    stopSocketServer();
     if (!server) {
         return;
     }
@@ -178,6 +242,37 @@ export function stopServer(): void {
     server = undefined;
 }
 
+/** Serve on a Unix domain socket in a new private directory, next to the TCP server.
+ * Returns the socket path or undefined on Windows.
+ */
+export function startSocketServer(): string | undefined {
+    if (process.platform === 'win32') {
+        return undefined;
+    }
+    if (socketServer === undefined) {
+        // mkdtemp creates the directory with mode 0700, other users cannot connect
+        const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'blender_vscode_'));
+        socketPath = path.join(directory, 'editor.sock');
+        socketServer = http.createServer(handleRequest);
+        socketServer.listen(socketPath);
+    }
+    return socketPath;
+}
+
+function stopSocketServer(): void {
+    if (socketServer === undefined || socketPath === undefined) {
+        return;
+    }
+    socketServer.close();
+    fs.rmSync(path.dirname(socketPath), { recursive: true, force: true });
+    socketServer = undefined;
+    socketPath = undefined;
+}
+
+function isSocketUnavailable(error: unknown): boolean {
+    return axios.isAxiosError(error) && (error.code === 'ENOENT' || error.code === 'ECONNREFUSED');
+}
+
 export function getServerPort(): number {
     if (!server) {
         throw new Error('Server has not been started.');
@@ -226,8 +321,9 @@ function handleRequest(request: IncomingMessage, response: ServerResponse): void
         switch (type) {
             case 'setup': {
                 const config = getConfig();
+                const noDebug = payload.noDebug === true;
                 const blenderPort = Number(payload.blenderPort);
-                const debugpyPort = Number(payload.debugpyPort);
+                const debugpyPort = noDebug ? 0 : Number(payload.debugpyPort);
                 const blenderPath = typeof payload.blenderPath === 'string' ? payload.blenderPath : '';
                 const scriptsFolder = typeof payload.scriptsFolder === 'string' ? payload.scriptsFolder : '';
                 const vscodeIdentifier = typeof payload.vscodeIdentifier === 'string' ? payload.vscodeIdentifier : '';
@@ -242,8 +338,25 @@ function handleRequest(request: IncomingMessage, response: ServerResponse): void
                     : [];
                 const justMyCode = Boolean(config.get('addon.justMyCode'));
                 const instance = new BlenderInstance(blenderPort, debugpyPort, justMyCode, blenderPath, scriptsFolder, addonPathMappings, vscodeIdentifier);
+                instance.noDebug = noDebug;
+                if (typeof payload.blenderSocket === 'string') {
+                    instance.blenderSocket = payload.blenderSocket;
+                }
                 response.end('OK');
 
+                if (noDebug) {
+                    RunningBlenders.registerInstance(instance);
+                    RunningBlenders.getTask(instance.vscodeIdentifier)?.onStartDebugging();
+                    break;
+                }
+
+                if (payload.standby === true) {
+                    // The debugger is attached when addons are assigned and path mappings are known.
+                    instance.standby = true;
+                    RunningBlenders.registerInstance(instance);
+                    break;
+                }
+
                 const attachResult = instance.attachDebugger();
                 Promise.resolve(attachResult)
                     .then(() => {
@@ -270,6 +383,124 @@ function handleRequest(request: IncomingMessage, response: ServerResponse): void
                 response.end('OK');
                 break;
             }
+            case 'hotPatch': {
+                if (payload.applied === true) {
+                    const functions = Array.isArray(payload.functions) ? payload.functions.length : 0;
+                    vscode.window.setStatusBarMessage(`Blender: hot patched ${functions} function(s)`, 5000);
+                } else {
+                    vscode.window.setStatusBarMessage(`Blender: reloading addon (${String(payload.reason)})`, 5000);
+                }
+                response.end('OK');
+                break;
+            }
+            case 'addonsAssigned': {
+                const vscodeIdentifier = typeof payload.vscodeIdentifier === 'string' ? payload.vscodeIdentifier : '';
+                const instance = RunningBlenders.getInstance(vscodeIdentifier);
+                if (instance === undefined) {
+                    response.writeHead(400).end('Unknown instance');
+                    return;
+                }
+                instance.addonPathMappings = Array.isArray(payload.addonPathMappings)
+                    ? (payload.addonPathMappings as AddonPathMapping[]).filter(item => typeof item?.src === 'string' && typeof item?.load === 'string')
+                    : [];
+                instance.standby = false;
+                response.end('OK');
+
+                if (instance.noDebug) {
+                    RunningBlenders.getTask(instance.vscodeIdentifier)?.onStartDebugging();
+                    break;
+                }
+
+                Promise.resolve(instance.attachDebugger())
+                    .then(() => RunningBlenders.getTask(instance.vscodeIdentifier)?.onStartDebugging())
+                    .catch((error: unknown) => {
+                        instance.connectionErrors.push(error instanceof Error ? error : new Error(String(error)));
+                        vscode.window.showErrorMessage('Failed to attach debugger to Blender instance.');
+                    });
+                break;
+            }
+            case 'resetFinished': {
+                response.end('OK');
+                break;
+            }
+            case 'memoryReport': {
+                const kib = (value: unknown) => typeof value === 'number' ? `${(value / 1024).toFixed(1)} KiB` : '?';
+                const reload = (payload.reload ?? {}) as JsonPayload;
+                const session = (payload.session ?? {}) as JsonPayload;
+                outputChannel.appendLine(
+                    `Memory after reload ${String(payload.reloadCount)} of ${String(payload.module)}: ` +
+                    `${kib(reload.sizeDiff)} (${String(reload.moduleCountDiff)} modules), session total ${kib(session.sizeDiff)}`);
+                const topGrowth = Array.isArray(reload.topGrowth) ? reload.topGrowth as { file: string, line: number, sizeDiff: number }[] : [];
+                for (const entry of topGrowth.slice(0, 5)) {
+                    outputChannel.appendLine(`    ${kib(entry.sizeDiff)} ${entry.file}:${entry.line}`);
+                }
+                response.end('OK');
+                break;
+            }
+            case 'scriptProgress': {
+                const progress = typeof payload.progress === 'number' ? ` ${Math.round(payload.progress * 100)}%` : '';
+                vscode.window.setStatusBarMessage(`Blender script${progress} (${String(payload.steps)} steps)`, 2000);
+                response.end('OK');
+                break;
+            }
+            case 'scriptFinished': {
+                if (payload.state === 'failed') {
+                    vscode.window.showWarningMessage(`Script ${String(payload.path)} failed. See console.`);
+                } else {
+                    vscode.window.setStatusBarMessage(`Blender script ${String(payload.state)} after ${String(payload.steps)} steps`, 5000);
+                }
+                response.end('OK');
+                break;
+            }
+            case 'testResult': {
+                outputChannel.appendLine(`${String(payload.outcome).toUpperCase()} ${String(payload.nodeid)}`);
+                if (typeof payload.longrepr === 'string') {
+                    outputChannel.appendLine(payload.longrepr);
+                }
+                response.end('OK');
+                break;
+            }
+            case 'debuggerState': {
+                const vscodeIdentifier = typeof payload.vscodeIdentifier === 'string' ? payload.vscodeIdentifier : '';
+                const instance = RunningBlenders.getInstance(vscodeIdentifier);
+                const state = String(payload.state);
+                vscode.window.setStatusBarMessage(`Blender debugger: ${state}`, 5000);
+                response.end('OK');
+                if (instance !== undefined && payload.attach === true && typeof payload.port === 'number') {
+                    // Blender listens now, e.g. when it was started without debugger
+                    instance.debugpyPort = payload.port;
+                    instance.noDebug = false;
+                    Promise.resolve(instance.attachDebugger()).catch((error: unknown) => {
+                        instance.connectionErrors.push(error instanceof Error ? error : new Error(String(error)));
+                        vscode.window.showErrorMessage('Failed to attach debugger to Blender instance.');
+                    });
+                }
+                break;
+            }
+            case 'stallReport': {
+                const duration = typeof payload.duration === 'number' ? payload.duration.toFixed(2) : '?';
+                outputChannel.appendLine(`Blender main thread was stalled for ${duration}s:`);
+                const stack = Array.isArray(payload.stack) ? payload.stack as { file: string, line: number, function: string }[] : [];
+                for (const frame of stack) {
+                    outputChannel.appendLine(`    ${frame.file}:${frame.line} in ${frame.function}`);
+                }
+                response.end('OK');
+                break;
+            }
+            case 'leakReport': {
+                const staleCallbacks = Array.isArray(payload.staleCallbacks) ? payload.staleCallbacks.length : 0;
+                const staleModules = Array.isArray(payload.staleModules) ? payload.staleModules.length : 0;
+                const action = payload.removed === true ? 'removed' : 'found';
+                vscode.window.showWarningMessage(
+                    `Reload of ${String(payload.module)}: ${action} ${staleCallbacks} stale callback(s), ${staleModules} module(s) still alive. See console.`);
+                response.end('OK');
+                break;
+            }
+            case 'jobFinished': {
+                // Actions are acknowledged with a job id, completion is reported here.
+                response.end('OK');
+                break;
+            }
             default: {
                 response.writeHead(400).end('Unknown type');
             }
@@ -278,4 +509,6 @@ function handleRequest(request: IncomingMessage, response: ServerResponse): void
 }
 
 let server: http.Server | undefined;
+let socketServer: http.Server | undefined;
+let socketPath: string | undefined;
 export const RunningBlenders = new RunningBlenderInstances();
\ No newline at end of file
@@ -34,6 +34,8 @@ export function activate(context: vscode.ExtensionContext) {
         ['blender.start', COMMAND_start],
         ['blender.stop', COMMAND_stop],
         ['blender.reloadAddons', COMMAND_reloadAddons],
+        ['blender.startStandby', COMMAND_startStandby],
+        ['blender.assignAddons', COMMAND_assignAddons],
         ['blender.newAddon', COMMAND_newAddon],
         ['blender.newScript', COMMAND_newScript],
         ['blender.openScriptsFolder', COMMAND_openScriptsFolder],
@@ -96,6 +98,39 @@ export async function COMMAND_start(args?: StartCommandArguments) {
     }
 }
 
+/** Start Blender without addons, so that it is ready when `Blender: Assign Addons` hands it over. */
+async function COMMAND_startStandby() {
+    const blenderToRun = getDefaultBlenderSettings();
+    if (blenderToRun === undefined) {
+        await LaunchAnyInteractive(undefined, undefined, true);
+    } else {
+        await LaunchAny(blenderToRun, undefined, undefined, true);
+    }
+}
+
+/** Link and enable the workspace addons in a Blender instance started in standby. */
+async function COMMAND_assignAddons() {
+    const instances = (await RunningBlenders.getResponsive()).filter(instance => instance.standby);
+    if (instances.length === 0) {
+        vscode.window.showInformationMessage('No Blender instance is waiting in standby. Use "Blender: Start in Standby" first.');
+        return;
+    }
+    const addons = await AddonWorkspaceFolder.All();
+    await rebuildAddons(addons);
+    const addonsToLoad = await Promise.all(addons.map(a => a.getLoadDirectoryAndModuleName()));
+    // one instance is handed over, others stay ready for the next assignment
+    const instance = instances[0];
+    // taken out of standby right away so a second assignment does not pick the same instance
+    instance.standby = false;
+    try {
+        await instance.assignAddons(addonsToLoad);
+    } catch (error) {
+        // still waiting for addons, the assignment can be retried
+        instance.standby = true;
+        throw error;
+    }
+}
+
 async function COMMAND_openWithBlender(resource: vscode.Uri) {
     const args: StartCommandArguments = {
         blendFilepaths: [resource.fsPath]
@@ -133,7 +168,8 @@ async function COMMAND_reloadAddons() {
     await reloadAddons(await AddonWorkspaceFolder.All());
 }
 
-async function reloadAddons(addons: AddonWorkspaceFolder[]) {
+/** With `files`, Blender reloads only the addons that contain or import one of them. */
+async function reloadAddons(addons: AddonWorkspaceFolder[], files?: string[]) {
     if (addons.length === 0) return;
     let instances = await RunningBlenders.getResponsive();
     if (instances.length === 0) return;
@@ -143,7 +179,7 @@ async function reloadAddons(addons: AddonWorkspaceFolder[]) {
     // Send source dirs so that the python script can determine if each addon is an extension or not.
     let dirs = await Promise.all(addons.map(a => a.getSourceDirectory()));
     instances.forEach((instance) => {
-        void instance.post({ type: 'reload', names: names, dirs: dirs }).catch((error) => {
+        void instance.post({ type: 'reload', names: names, dirs: dirs, files: files ?? null }).catch((error) => {
             instance.connectionErrors.push(error instanceof Error ? error : new Error(String(error)));
         });
     });
@@ -160,5 +196,5 @@ async function rebuildAddons(addons: AddonWorkspaceFolder[]) {
 async function HANDLER_updateOnSave(document: vscode.TextDocument) {
     if (isSavingForReload) return;
     let addons = await AddonWorkspaceFolder.All();
-    await reloadAddons(addons.filter(a => a.reloadOnSave));
+    await reloadAddons(addons.filter(a => a.reloadOnSave), [document.uri.fsPath]);
 }